@@ -0,0 +1,82 @@
+"""
+Benchmark: INSERT IGNORE (executemany) vs LOAD DATA LOCAL INFILE for raw ingest.
+
+Loads the same synthetic, normalized rows through both write paths of
+tasks/gdrive_task/etl_tasks.py into a scratch copy of raw_google_map_drive_data
+and prints rows/sec for each. The scratch table is dropped afterwards.
+
+Usage: python benchmark_bulk_load.py [rows]
+Requires local_infile=ON on the MySQL server for the LOAD DATA half.
+"""
+import sys
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from config import config
+from model.normalizer import UniversalNormalizer
+from tasks.gdrive_task import etl_tasks
+
+BENCH_TABLE = "raw_google_map_drive_data_bench"
+
+
+def make_rows(n):
+    rows = []
+    for i in range(n):
+        rows.append(UniversalNormalizer.normalize_row_raw({
+            "name": f"Bench Shop {i}", "address": f"{i} Market Road\tBlock {i % 50}",
+            "phone": f"98{i:08d}", "website": f"shop{i}.example.com",
+            "reviews": str(i % 900), "rating": f"{(i % 50) / 10:.1f}",
+            "category": "Cafe", "subcategory": "Coffee", "city": "Ahmedabad", "state": "gj", "area": "Navrangpura",
+            "drive_file_id": "bench", "drive_file_name": "bench.csv", "drive_file_path": "ROOT/bench",
+            "drive_uploaded_time": "2026-01-01T00:00:00Z",
+        }))
+    etl_tasks.prepare_batch(rows, task_id="benchmark")
+    for row in rows:
+        row['file_hash'] = "bench"
+    return rows
+
+
+def run_path(label, write, rows, batch_size):
+    with etl_tasks.engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE TABLE {BENCH_TABLE}"))
+    start = time.perf_counter()
+    written = 0
+    for i in range(0, len(rows), batch_size):
+        written += write(rows[i:i + batch_size], table=BENCH_TABLE)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {written:>9,} rows in {elapsed:7.2f}s  -> {written / elapsed:>10,.0f} rows/sec")
+    return written / elapsed if elapsed else 0.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    # Both paths share one engine with the LOCAL INFILE client flag enabled
+    etl_tasks.engine = create_engine(config.DATABASE_URI, poolclass=NullPool, connect_args={"local_infile": True})
+
+    rows = make_rows(n)
+    with etl_tasks.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(f"CREATE TABLE {BENCH_TABLE} LIKE {etl_tasks.RAW_TABLE}"))
+        local_infile = int(conn.execute(text("SELECT @@GLOBAL.local_infile")).scalar() or 0)
+
+    print("=" * 80)
+    print(f"RAW INGEST WRITE BENCHMARK ({n:,} rows)")
+    print("=" * 80)
+    try:
+        insert_rate = run_path(f"INSERT IGNORE (batch {etl_tasks.BATCH_SIZE})", etl_tasks.insert_batch,
+                               rows, etl_tasks.BATCH_SIZE)
+        if local_infile:
+            load_rate = run_path(f"LOAD DATA (batch {etl_tasks.BULK_LOAD_BATCH_SIZE})", etl_tasks.load_batch_infile,
+                                 rows, etl_tasks.BULK_LOAD_BATCH_SIZE)
+            if insert_rate:
+                print(f"\n  Speed-up: {load_rate / insert_rate:.1f}x")
+        else:
+            print("  LOAD DATA skipped: server has local_infile=OFF")
+    finally:
+        with etl_tasks.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -125,6 +125,10 @@ celery.conf.beat_schedule = {
         'task': 'tasks.gdrive.refresh_stats',
         'schedule': 300.0,
     },
+    'queue-health-every-30-secs': {
+        'task': 'tasks.queue_health',
+        'schedule': 30.0,
+    },
 }
 
 celery.autodiscover_tasks(["tasks"])
@@ -164,32 +168,41 @@ def start_metrics_on_worker_ready(**kwargs):
 
 
 # SECTION 7: Queue Backlog Monitor
+@celery.task(name="tasks.queue_health", ignore_result=True)
 def check_queue_health():
     """
-    Checks the default Celery queue length dynamically.
-    Returns: int (queue length)
+    Checks the default Celery queue and the size-routed ETL queues.
+    Publishes per-queue depth to Prometheus and alerts on any backed-up queue.
+    Returns: int (total queue length)
     """
     try:
+        from utils.metrics import queue_depth
+        from tasks.gdrive_task.etl_tasks import ETL_QUEUES
+
         broker_url = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
         r = redis.from_url(broker_url)
         
         # Dynamic queue name detection
         default_queue = celery.conf.task_default_queue or 'celery'
         
-        length = r.llen(default_queue)
+        total = 0
+        for queue_name in (default_queue,) + tuple(ETL_QUEUES):
+            length = int(r.llen(queue_name))
+            queue_depth.labels(queue=queue_name).set(length)
+            total += length
         
-        if length > 100:
-            logging.warning(f"[ALERT] High Queue Depth: {length} pending tasks in '{default_queue}'!")
-            
-            # Slack Webhook Integration (set SLACK_WEBHOOK_URL in .env)
-            slack_url = os.getenv('SLACK_WEBHOOK_URL')
-            if slack_url:
-                try:
-                    requests.post(slack_url, json={"text": f"Queue Alert: {length} tasks pending!"}, timeout=5)
-                except Exception:
-                    pass
+            if length > 100:
+                logging.warning(f"[ALERT] High Queue Depth: {length} pending tasks in '{queue_name}'!")
+                
+                # Slack Webhook Integration (set SLACK_WEBHOOK_URL in .env)
+                slack_url = os.getenv('SLACK_WEBHOOK_URL')
+                if slack_url:
+                    try:
+                        requests.post(slack_url, json={"text": f"Queue Alert: {length} tasks pending in '{queue_name}'!"}, timeout=5)
+                    except Exception:
+                        pass
                 
-        return int(length)
+        return total
     except Exception as e:
         logging.warning(f"Failed to check queue health: {e}")
-        return 0
\ No newline at end of file
+        return 0
@@ -57,11 +57,91 @@ class Config:
         "SERVICE_ACCOUNT_FILE",
         os.path.join(os.path.dirname(__file__), "model", "honey-bee-digital-d96daf6e6faf.json")
     )
+    # Drive client: static v3 discovery document (default: the one bundled with google-api-python-client),
+    # base URL override for a local Drive stand-in (e.g. http://localhost:8089/drive/v3/), and how long
+    # before expiry the shared OAuth token is refreshed
+    DRIVE_DISCOVERY_FILE = os.getenv("DRIVE_DISCOVERY_FILE")
+    DRIVE_API_ENDPOINT = os.getenv("DRIVE_API_ENDPOINT")
+    DRIVE_TOKEN_REFRESH_MARGIN = int(os.getenv("DRIVE_TOKEN_REFRESH_MARGIN", "300"))
+    # Opt-in local cache of downloaded CSVs (retries / reprocessing read disk instead of Drive), keyed by
+    # md5Checksum else file_id + modifiedTime, LRU-evicted to DOWNLOAD_CACHE_MAX_MB; gzip | zstd | none
+    DOWNLOAD_CACHE_DIR = os.getenv("DOWNLOAD_CACHE_DIR", "")
+    DOWNLOAD_CACHE_MAX_MB = int(os.getenv("DOWNLOAD_CACHE_MAX_MB", "2048"))
+    DOWNLOAD_CACHE_COMPRESSION = os.getenv("DOWNLOAD_CACHE_COMPRESSION", "gzip").lower()
     # Define a single source for the database URI to avoid confusion and errors
     DATABASE_URI = SQLALCHEMY_DATABASE_URI
     MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "100"))
     ETL_VERSION = os.getenv("ETL_VERSION", "2.0.0")
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", "2000"))
+    # ETL worker DB pool: max MySQL connections per Celery worker (shared by its processes under prefork).
+    # Several workers on one node each need their own share: ecosystem.config.js splits the node's budget.
+    ETL_DB_CONNECTION_BUDGET = int(os.getenv("ETL_DB_CONNECTION_BUDGET", "20"))
+    ETL_DB_POOL_TIMEOUT = int(os.getenv("ETL_DB_POOL_TIMEOUT", "30"))
+    ETL_DB_POOL_RECYCLE = int(os.getenv("ETL_DB_POOL_RECYCLE", "280"))
+    # Drive tree walker: scanner threads, and folders listed per files().list query
+    SCAN_THREADS = int(os.getenv("SCAN_THREADS", "8"))
+    SCAN_PARENTS_PER_QUERY = int(os.getenv("SCAN_PARENTS_PER_QUERY", "20"))
+    # Reconciliation pass: re-list folders/CSVs modified since the last pass, catches what the change feed missed (0 disables)
+    FOLDER_RECONCILE_MINUTES = int(os.getenv("FOLDER_RECONCILE_MINUTES", "360"))
+    # Scanner change detection: 'memory' keeps processed file_registry rows in RAM, 'query' = one IN query per folder
+    SCANNER_FILE_INDEX = os.getenv("SCANNER_FILE_INDEX", "memory").lower()
+    # Several gdrive-orchestrator instances: Redis-lease leader election + consistent-hash folder shards
+    ORCHESTRATOR_CLUSTER = os.getenv("ORCHESTRATOR_CLUSTER", "false").lower() in ("1", "true", "yes")
+    ORCHESTRATOR_LEASE_SECONDS = int(os.getenv("ORCHESTRATOR_LEASE_SECONDS", "60"))
+    # Cluster-wide Drive API token buckets in Redis, per service account and method (calls/s, 0 = unlimited)
+    DRIVE_RATE_LIMIT = os.getenv("DRIVE_RATE_LIMIT", "true").lower() in ("1", "true", "yes")
+    DRIVE_RATE_REDIS_URL = os.getenv("DRIVE_RATE_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    DRIVE_LIST_QPS = float(os.getenv("DRIVE_LIST_QPS", "20"))
+    # get_media: file downloads started per second (one token per file, whatever its size or chunk count)
+    DRIVE_GET_MEDIA_QPS = float(os.getenv("DRIVE_GET_MEDIA_QPS", "50"))
+    DRIVE_CHANGES_QPS = float(os.getenv("DRIVE_CHANGES_QPS", "2"))
+    DRIVE_RATE_BURST_SECONDS = float(os.getenv("DRIVE_RATE_BURST_SECONDS", "2"))
+    # Size-aware queue routing: gdrive_small / gdrive_medium / gdrive_large, each served by its own worker
+    ETL_QUEUE_ROUTING = os.getenv("ETL_QUEUE_ROUTING", "true").lower() in ("1", "true", "yes")
+    ETL_MEDIUM_FILE_MB = int(os.getenv("ETL_MEDIUM_FILE_MB", "10"))
+    ETL_LARGE_FILE_MB = int(os.getenv("ETL_LARGE_FILE_MB", "200"))
+    # Hard time limit (seconds) per queue; the soft limit fires at 90% and the retry resumes from the checkpoint
+    ETL_SMALL_TIME_LIMIT = int(os.getenv("ETL_SMALL_TIME_LIMIT", "300"))
+    ETL_MEDIUM_TIME_LIMIT = int(os.getenv("ETL_MEDIUM_TIME_LIMIT", "1800"))
+    ETL_LARGE_TIME_LIMIT = int(os.getenv("ETL_LARGE_TIME_LIMIT", "7200"))
+    # Per-file Redis lease (heartbeat-renewed): a second task for a file already being ingested exits at once
+    ETL_FILE_LEASE = os.getenv("ETL_FILE_LEASE", "true").lower() in ("1", "true", "yes")
+    ETL_FILE_LEASE_SECONDS = int(os.getenv("ETL_FILE_LEASE_SECONDS", "120"))
+    # Validation: 1 = one cursor thread (cluster leader only); N > 1 = N id-range workers per orchestrator node;
+    # 0 = none in the orchestrator (run worker_validation.py processes instead)
+    VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", "1"))
+    VALIDATION_RANGE_IDS = int(os.getenv("VALIDATION_RANGE_IDS", "2000"))
+    VALIDATION_LEASE_SECONDS = int(os.getenv("VALIDATION_LEASE_SECONDS", "300"))
+    # Normalize/validate each batch column by column (NumPy); false = the original row-by-row loop
+    VALIDATION_COLUMNAR = os.getenv("VALIDATION_COLUMNAR", "true").lower() in ("1", "true", "yes")
+    # Scanner bulk publish: tasks go to the broker in batches of ETL_PUBLISH_BATCH or every ETL_PUBLISH_FLUSH_SECONDS
+    ETL_PUBLISH_BATCH = int(os.getenv("ETL_PUBLISH_BATCH", "500"))
+    ETL_PUBLISH_FLUSH_SECONDS = float(os.getenv("ETL_PUBLISH_FLUSH_SECONDS", "2"))
+    # Scanner backpressure: pause publishing above any high-water mark, resume once all are below the low ones
+    BACKPRESSURE_ENABLED = os.getenv("BACKPRESSURE_ENABLED", "true").lower() in ("1", "true", "yes")
+    BACKPRESSURE_QUEUE_HIGH = int(os.getenv("BACKPRESSURE_QUEUE_HIGH", "20000"))
+    BACKPRESSURE_QUEUE_LOW = int(os.getenv("BACKPRESSURE_QUEUE_LOW", "5000"))
+    BACKPRESSURE_REDIS_MEM_HIGH = float(os.getenv("BACKPRESSURE_REDIS_MEM_HIGH", "0.75"))  # of maxmemory
+    BACKPRESSURE_REDIS_MEM_LOW = float(os.getenv("BACKPRESSURE_REDIS_MEM_LOW", "0.5"))
+    BACKPRESSURE_LAG_HIGH_SECONDS = int(os.getenv("BACKPRESSURE_LAG_HIGH_SECONDS", "1800"))
+    BACKPRESSURE_LAG_LOW_SECONDS = int(os.getenv("BACKPRESSURE_LAG_LOW_SECONDS", "300"))
+    BACKPRESSURE_POLL_SECONDS = float(os.getenv("BACKPRESSURE_POLL_SECONDS", "5"))
+    # Small-file packing: CSVs up to SMALL_FILE_MAX_KB go to multi-file tasks (SMALL_FILE_PACK_FILES=1 disables)
+    SMALL_FILE_MAX_KB = int(os.getenv("SMALL_FILE_MAX_KB", "512"))
+    SMALL_FILE_PACK_FILES = int(os.getenv("SMALL_FILE_PACK_FILES", "50"))
+    SMALL_FILE_PACK_MB = int(os.getenv("SMALL_FILE_PACK_MB", "8"))
+    # In-task ingest pipeline: batches in flight between stages, Drive chunks downloaded ahead
+    PIPELINE_QUEUE_DEPTH = int(os.getenv("PIPELINE_QUEUE_DEPTH", "2"))
+    DOWNLOAD_PREFETCH_CHUNKS = int(os.getenv("DOWNLOAD_PREFETCH_CHUNKS", "4"))
+    # Raw ingest bulk mode: LOAD DATA LOCAL INFILE instead of INSERT IGNORE (needs local_infile=ON)
+    RAW_BULK_LOAD = os.getenv("RAW_BULK_LOAD", "false").lower() in ("1", "true", "yes")
+    BULK_LOAD_BATCH_SIZE = int(os.getenv("BULK_LOAD_BATCH_SIZE", "5000"))
+    BULK_LOAD_SPOOL_DIR = os.getenv("BULK_LOAD_SPOOL_DIR")
+    # Row dedup Bloom filter (two generations live at once: ~2x the size below)
+    DEDUP_REDIS_URL = os.getenv("DEDUP_REDIS_URL") or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    DEDUP_BLOOM_CAPACITY = int(os.getenv("DEDUP_BLOOM_CAPACITY", "10000000"))
+    DEDUP_BLOOM_ERROR_RATE = float(os.getenv("DEDUP_BLOOM_ERROR_RATE", "0.001"))
+    DEDUP_WINDOW_HOURS = int(os.getenv("DEDUP_WINDOW_HOURS", "36"))
 
 # Instantiate config for import convenience
 config = Config()
\ No newline at end of file
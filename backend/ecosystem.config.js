@@ -15,19 +15,65 @@ export const apps = [
     {
         name: "celery-worker",
         script: "venv/bin/celery",
-        args: "-A celery_app worker --loglevel=info -P gevent -c 100", // 100 greenlets for high concurrency I/O
+        // Default queue + small Drive CSVs: 100 greenlets for high concurrency I/O
+        args: "-A celery_app worker --loglevel=info -P gevent -c 100 -Q celery,gdrive_small -n small@%h",
         interpreter: "none",
         watch: false,
         max_memory_restart: "1G", // Kills & Restarts worker if it exceeds 1GB RAM
         env: {
             NODE_ENV: "production",
+            // MySQL connections per ETL worker: 12 + 6 + 2 = 20 for the node (plus orchestrator and validators).
+            // Keep ETL_DB_CONNECTION_BUDGET out of backend/.env: it is loaded with override and would win
+            ETL_DB_CONNECTION_BUDGET: "12",
+        }
+    },
+    {
+        name: "celery-worker-medium",
+        script: "venv/bin/celery",
+        args: "-A celery_app worker --loglevel=info -P gevent -c 20 -Q gdrive_medium -n medium@%h",
+        interpreter: "none",
+        watch: false,
+        max_memory_restart: "1G",
+        env: {
+            NODE_ENV: "production",
+            ETL_DB_CONNECTION_BUDGET: "6",
+        }
+    },
+    {
+        name: "celery-worker-large",
+        script: "venv/bin/celery",
+        // Few slots: multi-GB files stream in bounded memory but hold a slot for a long time
+        args: "-A celery_app worker --loglevel=info -P gevent -c 4 -Q gdrive_large -n large@%h",
+        interpreter: "none",
+        watch: false,
+        max_memory_restart: "1G",
+        env: {
+            NODE_ENV: "production",
+            ETL_DB_CONNECTION_BUDGET: "2",
         }
     },
     {
         name: "gdrive-orchestrator",
         script: "worker_etl.py",
         interpreter: "python3",
-        instances: 1, // MUST BE 1. Do not scale this, it scans the drive
+        instances: 1, // Keep 1 per node. To run on several nodes set ORCHESTRATOR_CLUSTER=true on all of them:
+                      // they elect a leader (change feed, reconciliation, validation) and shard the Drive folders.
+                      // VALIDATION_WORKERS=N (> 1) validates id ranges in N threads on every node instead of
+                      // the leader's single cursor; VALIDATION_WORKERS=0 leaves it to "gdrive-validator" below
+        watch: false,
+        max_memory_restart: "500M",
+        env: {
+            NODE_ENV: "production",
+        }
+    },
+    {
+        name: "gdrive-validator",
+        script: "worker_validation.py",
+        interpreter: "python3",
+        args: "--threads 2",
+        instances: 2, // Any number, on any nodes: each process leases its own id ranges.
+                      // Only with VALIDATION_WORKERS=0 on the orchestrators (it idles otherwise)
+        autorestart: true,
         watch: false,
         max_memory_restart: "500M",
         env: {
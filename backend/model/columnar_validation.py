@@ -0,0 +1,194 @@
+"""
+Columnar twin of ValidationQualityProcessor's row-by-row normalize/validate loop.
+
+A whole batch is split into one NumPy object array per column. Each field is then
+normalized by a single element kernel mapped over its column (np.frompyfunc) instead
+of normalize_row_full -> safe_str/safe_int/safe_float per row, and validate_row's
+checks, the status rules and the counters are boolean array operations. Results
+match the row path exactly; the output is the two INSERT parameter lists, ready for
+executemany.
+"""
+import re
+import unicodedata
+from itertools import repeat
+
+import numpy as np
+
+from .normalizer import STATE_MAP, UniversalNormalizer
+
+SENTINELS = ('nan', 'none', 'nat', '')
+MANDATORY_FIELDS = ("name", "address", "phone_number", "city", "state", "category")
+DUPLICATE_REASON = "Exact match (Phone, Name, Address, City)"
+
+CLEAN_KEYS = ("raw_id", "name", "address", "website", "phone", "reviews", "avg", "cat", "sub", "city",
+              "state", "area", "created", "val_status", "clean_status", "missing", "invalid",
+              "duplicate_reason", "processed_at")
+MASTER_KEYS = ("name", "address", "website", "phone_number", "reviews_count", "reviews_avg", "category",
+               "subcategory", "city", "state", "area", "created_at")
+
+_NON_DIGIT = re.compile(r'\D')
+_NON_ALNUM = re.compile(r'[^a-z0-9]')
+# ^https?:// then ^www\. (the second applies to what the first leaves)
+_URL_PREFIX = re.compile(r'^(?:https?://)?(?:www\.)?')
+_FLOAT = re.compile(r'[-+]?\d*\.?\d+')
+
+
+# ── Element kernels ──────────────────────────────────────────────────────────
+# Each is the UniversalNormalizer function followed by the safe_str pass the row path
+# applies. Their own sentinel checks run on values the later steps leave unchanged
+# ('nan' stays 'nan'), so one check at the end covers both. ' '.join(s.split()) is
+# re.sub(r'\s+', ' ', s).strip(): str.split and re's \s use the same whitespace set.
+
+def _text(v):
+    """clean_text."""
+    if v is None:
+        return ''
+    v = ' '.join(unicodedata.normalize('NFKC', str(v).strip()).split())
+    return '' if v.lower() in SENTINELS else v
+
+
+def _category(v):
+    """normalize_category: clean_text for str values only."""
+    return _text(v) if v and isinstance(v, str) else ''
+
+
+def _website(v):
+    if not v or not isinstance(v, str):
+        return ''
+    v = _URL_PREFIX.sub('', v.strip().lower()).rstrip('/').strip()
+    return '' if v in SENTINELS else v
+
+
+def _phone(v):
+    """Digits only: never a sentinel, nothing left to strip."""
+    return _NON_DIGIT.sub('', str(v)) if v else ''
+
+
+def _state(v):
+    if not v or not isinstance(v, str):
+        return ''
+    v = v.strip()
+    key = v.lower()
+    if key in SENTINELS:
+        return ''
+    return STATE_MAP.get(_NON_ALNUM.sub('', key), v)
+
+
+def _reparse_float(x):
+    """safe_float(x) for a float: the first number in str(x)."""
+    m = _FLOAT.search(str(x))
+    return float(m.group()) if m else 0.0
+
+
+_text_column = np.frompyfunc(_text, 1, 1)
+_category_column = np.frompyfunc(_category, 1, 1)
+_website_column = np.frompyfunc(_website, 1, 1)
+_phone_column = np.frompyfunc(_phone, 1, 1)
+_state_column = np.frompyfunc(_state, 1, 1)
+_int_column = np.frompyfunc(UniversalNormalizer.normalize_int, 1, 1)  # safe_int of a non-negative int is a no-op
+_float_column = np.frompyfunc(UniversalNormalizer.normalize_float, 1, 1)
+_lower_column = np.frompyfunc(str.lower, 1, 1)
+_len_column = np.frompyfunc(len, 1, 1)
+_no_dot_column = np.frompyfunc(lambda w: '.' not in w, 1, 1)
+
+
+def _floats(column):
+    """
+    normalize_float, then safe_float twice as the row path does. Those re-parse str(x),
+    which only changes x where repr() uses an exponent (|x| < 1e-4 or >= 1e16) or for
+    inf/nan, so just those values take the scalar round trip.
+    """
+    floats = _float_column(column).astype(np.float64)
+    a = np.abs(floats)
+    with np.errstate(invalid='ignore'):
+        lossy = ~np.isfinite(a) | (a >= 1e16) | ((a != 0) & (a < 1e-4))
+    for i in np.flatnonzero(lossy):
+        floats[i] = _reparse_float(_reparse_float(floats[i]))
+    return floats
+
+
+def _join_flags(flags):
+    """Object array: ','-joined names of the flagged fields per row, None where none is flagged."""
+    joined = None
+    for field, mask in flags:
+        part = np.where(mask, field + ',', '')
+        joined = part if joined is None else np.char.add(joined, part)
+    joined = np.char.rstrip(joined, ',').astype(object)
+    joined[joined == ''] = None
+    return joined
+
+
+class ColumnarBatch:
+    """One raw batch, normalized and checked column by column."""
+
+    def __init__(self, rows):
+        fields = list(rows[0]._mapping.keys())
+        plan = UniversalNormalizer.compile_header_plan(fields)  # the columns get_fuzzy would read
+        n = len(rows)
+        columns = np.empty((len(fields), n), dtype=object)
+        columns[:] = list(zip(*rows))
+
+        def col(key):
+            idx = plan[key]
+            return columns[idx] if idx is not None else np.full(n, None, dtype=object)
+
+        self.ids = columns[fields.index('id')]
+        self.max_id = max(self.ids)
+        self.name = _text_column(col("name"))
+        self.address = _text_column(col("address"))
+        self.website = _website_column(col("website"))
+        self.phone = _phone_column(col("phone_number"))
+        self.reviews = _int_column(col("reviews_count"))
+        self.avg = _floats(col("reviews_average"))
+        self.category = _category_column(col("category"))
+        self.subcategory = _text_column(col("subcategory"))
+        self.city = _text_column(col("city"))
+        self.state = _state_column(col("state"))
+        self.area = _text_column(col("area"))
+
+        # validate_row: missing mandatory fields (in field order), bad phone/website formats.
+        # Phones are digits only by now, so ^\d{8,18}$ is a length check.
+        values = {"name": self.name, "address": self.address, "phone_number": self.phone,
+                  "city": self.city, "state": self.state, "category": self.category}
+        self.missing = _join_flags([(f, values[f] == '') for f in MANDATORY_FIELDS])
+        phone_len = _len_column(self.phone).astype(np.int64)
+        bad_phone = (phone_len > 0) & ((phone_len < 8) | (phone_len > 18))
+        bad_website = (self.website != '') & _no_dot_column(self.website).astype(bool)
+        self.invalid = _join_flags([("phone_number", bad_phone), ("website", bad_website)])
+        self.structured = np.equal(self.missing, None)
+        self.valid = self.structured & np.equal(self.invalid, None)
+
+        self.signatures = list(zip(self.phone.tolist(), _lower_column(self.name).tolist(),
+                                   _lower_column(self.address).tolist(), _lower_column(self.city).tolist()))
+
+    def insert_params(self, existing_sigs, now):
+        """(validation_raw_google_map params, g_map_master_table params, batch_summary)."""
+        n = len(self.ids)
+        duplicate = self.structured & np.fromiter((sig in existing_sigs for sig in self.signatures),
+                                                  dtype=bool, count=n)
+        status = np.select([~self.structured, duplicate, ~self.valid], ["MISSING", "DUPLICATE", "INVALID"], "VALID")
+        is_valid = status == "VALID"
+        clean_status = np.select([is_valid, duplicate], ["CLEANED", "DUPLICATE_FOUND"], "FAILED_VALIDATION")
+        duplicate_reason = np.where(duplicate, DUPLICATE_REASON, None)
+
+        name, address, website, phone = (self.name.tolist(), self.address.tolist(),
+                                         self.website.tolist(), self.phone.tolist())
+        reviews, avg = self.reviews.tolist(), self.avg.tolist()
+        category, subcategory = self.category.tolist(), self.subcategory.tolist()
+        city, state, area = self.city.tolist(), self.state.tolist(), self.area.tolist()
+
+        clean_data_batch = [dict(zip(CLEAN_KEYS, values)) for values in zip(
+            self.ids.tolist(), name, address, website, phone, reviews, avg, category, subcategory, city,
+            state, area, repeat(now), status.tolist(), clean_status.tolist(), self.missing.tolist(),
+            self.invalid.tolist(), duplicate_reason.tolist(), repeat(now))]
+
+        picked = np.flatnonzero(is_valid).tolist()
+        master_data_batch = [dict(zip(MASTER_KEYS, (
+            name[i], address[i], website[i], phone[i], reviews[i], avg[i], category[i], subcategory[i],
+            city[i], state[i], area[i], now))) for i in picked]
+
+        batch_summary = {
+            "total": n, "missing": int((~self.structured).sum()), "valid": len(picked),
+            "duplicate": int(duplicate.sum()), "cleaned": len(picked)
+        }
+        return clean_data_batch, master_data_batch, batch_summary
@@ -69,6 +69,20 @@ class UniversalNormalizer:
     Zero data loss — only trims whitespace and normalizes Unicode form.
     """
 
+    # Common variations for Indian data headers
+    HEADER_MAPPINGS = {
+        "name": ["name", "business name", "company name", "naam", "नाम", "નામ", "பெயர்", "పేరు", "ಹೆಸರು", "പേര്", "নাম"],
+        "address": ["address", "location", "full address", "पता", "સરનામું", "மேகவரி", "చిరునామా", "ವಿಳಾಸ", "മേൽವിലാസം", "ঠিকানা"],
+        "phone_number": ["phone", "phone number", "contact", "mobile", "tel", "फोन", "ફોન", "தொலைபேசி", "ఫోన్", "ಫೋನ್", "ഫോൺ", "ফোন"],
+        "city": ["city", "town", "location city", "शहर", "શહેર", "நகரம்", "నగరం", "ನಗರ", "നഗരം", "শহর"],
+        "state": ["state", "province", "region", "राज्य", "રાજ્ય", "மாநிலம்", "రాష్ట్రం", "ರಾಜ್ಯ", "സംസ്ഥാനം", "রাজ্য"],
+        "category": ["category", "type", "business type", "श्रेणी", "શ્રેણી", "வகை", "ವರ್ಗ", "వర్గం", "വിഭാഗം", "বিভাগ"],
+        "subcategory": ["subcategory", "sub-category", "उपश्रेणी", "ઉપશ્રેણી"],
+        "website": ["website", "url", "link", "वेबसाइट", "વેબસાઇટ"],
+        "reviews_count": ["reviews_count", "reviews", "total reviews", "समीक्षाएं"],
+        "reviews_average": ["reviews_average", "rating", "avg rating", "रेटिंग"],
+    }
+
     @staticmethod
     def clean_text(val):
         """Preserve original text as-is. Only trim whitespace & normalize Unicode."""
@@ -160,24 +174,10 @@ class UniversalNormalizer:
             val_str = val_str.replace('T', ' ').replace('Z', '').split('.')[0]
         return val_str
 
-    @staticmethod
-    def get_fuzzy(row, canonical_key):
+    @classmethod
+    def get_fuzzy(cls, row, canonical_key):
         """🔍 Smart header mapping for multilingual CSVs."""
-        # Common variations for Indian data headers
-        MAPPINGS = {
-            "name": ["name", "business name", "company name", "naam", "नाम", "નામ", "பெயர்", "పేరు", "ಹೆಸರು", "പേര്", "নাম"],
-            "address": ["address", "location", "full address", "पता", "સરનામું", "மேகவரி", "చిరునామా", "ವಿಳಾಸ", "മേൽವിലാസം", "ঠিকানা"],
-            "phone_number": ["phone", "phone number", "contact", "mobile", "tel", "फोन", "ફોન", "தொலைபேசி", "ఫోన్", "ಫೋನ್", "ഫോൺ", "ফোন"],
-            "city": ["city", "town", "location city", "शहर", "શહેર", "நகரம்", "నగరం", "ನಗರ", "നഗരം", "শহর"],
-            "state": ["state", "province", "region", "राज्य", "રાજ્ય", "மாநிலம்", "రాష్ట్రం", "ರಾಜ್ಯ", "സംസ്ഥാനം", "রাজ্য"],
-            "category": ["category", "type", "business type", "श्रेणी", "શ્રેણી", "வகை", "ವರ್ಗ", "వర్గం", "വിഭാഗം", "বিভাগ"],
-            "subcategory": ["subcategory", "sub-category", "उपश्रेणी", "ઉપશ્રેણી"],
-            "website": ["website", "url", "link", "वेबसाइट", "વેબસાઇટ"],
-            "reviews_count": ["reviews_count", "reviews", "total reviews", "समीक्षाएं"],
-            "reviews_average": ["reviews_average", "rating", "avg rating", "रेटिंग"],
-        }
-        
-        candidates = MAPPINGS.get(canonical_key, [canonical_key])
+        candidates = cls.HEADER_MAPPINGS.get(canonical_key, [canonical_key])
         
         # 1. Exact match
         for c in candidates:
@@ -191,6 +191,68 @@ class UniversalNormalizer:
             
         return row.get(canonical_key)
 
+    # ── Per-file compiled header plan ────────────────────────────────────────
+    # get_fuzzy re-resolves headers on every row. For a whole CSV the headers are
+    # fixed, so resolve them ONCE into column indexes and map plain csv.reader
+    # tuples by index. Resolution follows get_fuzzy's exact precedence.
+    RAW_FUZZY_FIELDS = ("name", "address", "website", "phone_number", "reviews_count",
+                        "reviews_average", "category", "subcategory", "city", "state")
+
+    @classmethod
+    def resolve_header(cls, fieldnames, canonical_key):
+        """Column index get_fuzzy would read for `canonical_key`, or None."""
+        # DictReader keeps the LAST column for duplicate header names
+        last_index = {name: i for i, name in enumerate(fieldnames)}
+        candidates = cls.HEADER_MAPPINGS.get(canonical_key, [canonical_key])
+        for c in candidates:
+            if c in last_index: return last_index[c]
+        row_keys = {str(k).strip().lower(): k for k in dict.fromkeys(fieldnames)}
+        for c in candidates:
+            cl = c.lower()
+            if cl in row_keys: return last_index[row_keys[cl]]
+        return last_index.get(canonical_key)
+
+    @classmethod
+    def compile_header_plan(cls, fieldnames):
+        """Resolve a CSV header once. Returns {canonical_key: column index or None}."""
+        fieldnames = list(fieldnames or [])
+        plan = {key: cls.resolve_header(fieldnames, key) for key in cls.RAW_FUZZY_FIELDS}
+        # `area` is read with a plain row.get() — exact header only
+        plan["area"] = {name: i for i, name in enumerate(fieldnames)}.get("area")
+        return plan
+
+    @classmethod
+    def normalize_values_raw(cls, values, plan, meta):
+        """
+        Tier 1 normalization of a csv.reader tuple through a compiled header plan.
+        Returns exactly what normalize_row_raw({**dict_row, **meta}) returns.
+        """
+        n = len(values)
+
+        def col(key):
+            idx = plan[key]
+            return values[idx] if idx is not None and idx < n else None
+
+        return {
+            "name": col("name"),
+            "address": col("address"),
+            "website": col("website"),
+            "phone_number": col("phone_number"),
+            "reviews_count": cls.normalize_int(col("reviews_count")),
+            "reviews_average": cls.normalize_float(col("reviews_average")),
+            "category": col("category"),
+            "subcategory": col("subcategory"),
+            "city": col("city"),
+            "state": col("state"),
+            "area": col("area"),
+            "drive_folder_id": meta.get("drive_folder_id"),
+            "drive_folder_name": meta.get("drive_folder_name"),
+            "drive_file_id": meta.get("drive_file_id"),
+            "drive_file_name": meta.get("drive_file_name"),
+            "drive_file_path": meta.get("drive_file_path"),
+            "drive_uploaded_time": cls.normalize_date(meta.get("drive_uploaded_time")),
+        }
+
     @classmethod
     def normalize_row_raw(cls, row):
         """Tier 1: Minimal normalization for raw storage. Only trims whitespace."""
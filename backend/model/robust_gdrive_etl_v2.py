@@ -7,19 +7,25 @@ import random
 import hashlib
 import logging
 import threading
+import socket
 import queue
 import redis
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from datetime import datetime, timedelta
 from googleapiclient.http import MediaIoBaseDownload
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
 from .normalizer import UniversalNormalizer
+from .columnar_validation import ColumnarBatch
 from utils.circuit_breaker import CircuitBreaker, CircuitBreakerOpenError
+from utils.drive_rate_limit import acquire_drive_quota
+from utils.backpressure import BrokerBackpressure
+from utils.cluster import ClusterMembership, HashRing
+from utils.redis_pool import get_redis
+from utils import drive_service
+from utils.csv_archive import NAME_TOKENS, is_ingestible
+from utils.id_range_lease import IdRangeLeases
 from config import config
 
 load_dotenv()
@@ -38,15 +44,228 @@ ROOT_FOLDER_ID = os.getenv('GDRIVE_ROOT_FOLDER_ID', '1ltTYjekxZsk2CdF20tSk1B2FnR
 SERVICE_ACCOUNT_FILE = config.SERVICE_ACCOUNT_FILE
 DATABASE_URI = config.DATABASE_URI
 
+class TreeWalk:
+    """
+    State of one breadth-first Drive scan: the frontier shared by all scanner threads
+    plus subtree-completion tracking. A folder's on_complete callback (registering it
+    as DONE) only runs once the folder AND every subfolder under it were listed, so a
+    crash or API failure mid-walk never marks a partly scanned subtree as done.
+    """
+    def __init__(self):
+        self.frontier = queue.Queue()
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._parent = {}
+        self._open_children = {}
+        self._on_complete = {}
+        self.listed_ids = set()
+
+    def add(self, folder_id, folder_name, path, parent_id=None, modified_at=None, force=False):
+        """
+        Queue a folder once (multi-parent folders are reached through several parents).
+        `modified_at` is the folder's Drive modifiedTime as seen in its parent's listing;
+        `force` lists it even if that time did not move.
+        """
+        with self._lock:
+            if folder_id in self._seen:
+                return False
+            self._seen.add(folder_id)
+            self._parent[folder_id] = parent_id
+            if parent_id is not None:
+                self._open_children[parent_id] = self._open_children.get(parent_id, 0) + 1
+        self.frontier.put((folder_id, folder_name, path, modified_at, force))
+        return True
+
+    def parent_of(self, folder_id):
+        with self._lock:
+            return self._parent.get(folder_id)
+
+    def listed(self, folder_id, on_complete=None):
+        """Mark a folder as listed (its subfolders already added); runs every callback that became ready."""
+        with self._lock:
+            self._on_complete[folder_id] = on_complete
+            ready = []
+            while folder_id is not None and not self._open_children.get(folder_id) and folder_id in self._on_complete:
+                ready.append(self._on_complete.pop(folder_id))
+                self._open_children.pop(folder_id, None)
+                parent_id = self._parent.pop(folder_id)
+                if parent_id is not None:
+                    self._open_children[parent_id] -= 1
+                folder_id = parent_id
+        for callback in ready:
+            if callback:
+                callback()
+
+
+class ProcessedFileIndex:
+    """
+    Compact in-memory view of PROCESSED rows in file_registry for scanner change detection:
+    drive_file_id -> file_hash (md5 hex digests stored as 16 raw bytes) plus the set of
+    content checksums already ingested. Built with one streamed query, then kept in step
+    by re-reading only rows whose processed_at moved since the last sync.
+    """
+    def __init__(self):
+        self._files = {}
+        self._checksums = set()
+        self.synced_at = None
+
+    @staticmethod
+    def _pack(digest):
+        if digest and len(digest) == 32:
+            try:
+                return bytes.fromhex(digest)
+            except ValueError:
+                pass
+        return digest
+
+    def apply(self, rows):
+        """Apply (drive_file_id, file_hash, status, md5_checksum) rows; non-PROCESSED rows drop out."""
+        count = 0
+        for file_id, file_hash, status, md5_checksum in rows:
+            count += 1
+            if status == 'PROCESSED':
+                self._files[file_id] = self._pack(file_hash)
+                if md5_checksum:
+                    self._checksums.add(self._pack(md5_checksum))
+            else:
+                self._files.pop(file_id, None)
+        return count
+
+    def is_processed(self, file_id, file_hash, md5_checksum=None):
+        if file_id in self._files and self._files[file_id] == self._pack(file_hash):
+            return True
+        return bool(md5_checksum) and self._pack(md5_checksum) in self._checksums
+
+    def __len__(self):
+        return len(self._files)
+
+
+class FolderPathCache:
+    """
+    folder_id -> (name, parent_id) for folders under ROOT_FOLDER_ID, so Drive change events
+    can be dispatched with their real folder name and path without listing anything.
+    Filled by the tree walk (persisted via drive_folder_registry.folder_name/parent_id);
+    folders never walked are fetched lazily from their `parents`.
+    """
+    def __init__(self, root_id, root_path="ROOT"):
+        self.root_id = root_id
+        self.root_path = root_path
+        self._lock = threading.Lock()
+        self._nodes = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def put(self, folder_id, name, parent_id):
+        if folder_id and name:
+            with self._lock:
+                self._nodes[folder_id] = (name, parent_id)
+
+    def name(self, folder_id):
+        if folder_id == self.root_id:
+            return self.root_path
+        node = self._nodes.get(folder_id)
+        return node[0] if node else None
+
+    def _chain(self, folder_id):
+        """(names from folder up to ROOT, first uncached ancestor). Both None if outside ROOT."""
+        names, seen = [], set()
+        with self._lock:
+            while folder_id != self.root_id:
+                if folder_id is None or folder_id in seen:
+                    return None, None  # Top of someone else's tree, or a cycle
+                node = self._nodes.get(folder_id)
+                if node is None:
+                    return names, folder_id
+                seen.add(folder_id)
+                names.append(node[0])
+                folder_id = node[1]
+        return names, None
+
+    def missing_ancestor(self, folder_id):
+        return self._chain(folder_id)[1]
+
+    def path(self, folder_id):
+        """Path as the walk builds it ('ROOT/a/b'), or None if the lineage is unknown / outside ROOT."""
+        names, missing = self._chain(folder_id)
+        if names is None or missing is not None:
+            return None
+        return "/".join([self.root_path] + names[::-1])
+
+
+class SmallFilePacker:
+    """
+    Collects small CSVs and dispatches them as multi-file Celery tasks.
+    A pack is sent once it holds `max_files` files or `max_bytes` of CSV; call flush()
+    at the end of a scan for the remainder. after_flush() defers work until the files
+    added so far are published. Thread-safe (scanner threads share it).
+    """
+    def __init__(self, max_files, max_bytes, publisher):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.publisher = publisher
+        self._lock = threading.Lock()
+        self._files = []
+        self._bytes = 0
+        self._callbacks = []  # Run once the pack being filled is published
+        self._in_transit = 0  # Packs taken but not yet handed to the publisher
+
+    def add(self, task_kwargs):
+        with self._lock:
+            self._files.append(task_kwargs)
+            self._bytes += task_kwargs.get('file_size') or 0
+            if len(self._files) < self.max_files and self._bytes < self.max_bytes:
+                return
+            pack, callbacks = self._take()
+        self._dispatch(pack, callbacks)
+
+    def flush(self):
+        with self._lock:
+            pack, callbacks = self._take()
+        self._dispatch(pack, callbacks)
+
+    def after_flush(self, callback):
+        """Runs `callback` once every file added so far has reached the broker (see TaskPublisher.after_sent)."""
+        with self._lock:
+            if self._files or self._in_transit:
+                self._callbacks.append(callback)
+                return
+        self.publisher.after_sent(callback)
+
+    def _take(self):
+        pack, callbacks = self._files, self._callbacks
+        self._files, self._bytes, self._callbacks = [], 0, []
+        self._in_transit += 1
+        return pack, callbacks
+
+    def _dispatch(self, pack, callbacks):
+        try:
+            if len(pack) == 1:
+                self.publisher.dispatch_csv(pack[0])
+            elif pack:
+                self.publisher.dispatch_csv_pack(pack)
+                logger.debug(f"[DISPATCH] pack of {len(pack)} small files")
+        finally:
+            with self._lock:
+                self._in_transit -= 1
+            # The pack is in the publisher's buffer (sent or not): its callbacks now wait there
+            for callback in callbacks:
+                self.publisher.after_sent(callback)
+
+
 class GDriveHighSpeedIngestor:
     def __init__(self):
-        self.creds = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=['https://www.googleapis.com/auth/drive.readonly'])
+        self.creds = drive_service.credentials()
         # Producer uses a standard pool since it's threaded, not gevent
         # Reduced pool size to save memory on 3.5GB systems
         self.engine = create_engine(DATABASE_URI, pool_size=10, max_overflow=5, pool_pre_ping=True, pool_recycle=1800, pool_timeout=30, isolation_level="READ COMMITTED")
         self.table_name = "raw_google_map_drive_data"
         self.task_queue = queue.Queue(maxsize=100)
         self.folder_registry = {}  # Changed to Dict {folder_id: modified_time}
+        self.folder_child_counts = {}  # {folder_id: direct children at the last listing}
+        self.folder_paths = FolderPathCache(ROOT_FOLDER_ID)
+        self.last_full_walk = 0.0
+        self.reconcile_since = None  # Drive RFC 3339 time of the last complete reconciliation
         self.shutdown_event = threading.Event()
         self.scanners_finished = threading.Event()
         self._tls = threading.local()
@@ -54,12 +273,28 @@ class GDriveHighSpeedIngestor:
         self.page_token = None
         # Circuit breaker for Google Drive API calls
         self.api_breaker = CircuitBreaker(name="gdrive_api")
+        # Tiny CSVs are packed into multi-file tasks instead of one task each
+        self.small_file_max_bytes = config.SMALL_FILE_MAX_KB * 1024
+        # Bulk task publication: one broker round trip per batch of files, not per file
+        # ...paused by broker backpressure when queues / Redis memory / worker lag run high
+        from tasks.gdrive_task.etl_tasks import TaskPublisher, ETL_QUEUES
+        backpressure = BrokerBackpressure.from_config(ETL_QUEUES, self.shutdown_event) if config.BACKPRESSURE_ENABLED else None
+        self.publisher = TaskPublisher(backpressure=backpressure)
+
+        # Multi-instance mode: Redis-lease leader election + consistent-hash shards of ROOT's folders
+        self.cluster = ClusterMembership(get_redis(), config.ORCHESTRATOR_LEASE_SECONDS) if config.ORCHESTRATOR_CLUSTER else None
+        self.cluster_members = None
+        self.owned_folder_ids = set()
+        self.small_files = SmallFilePacker(config.SMALL_FILE_PACK_FILES, config.SMALL_FILE_PACK_MB * 1024 * 1024, self.publisher)
         
         # Stats & Heartbeat
         self.stats_lock = threading.Lock()
         self.total_scanned_folders = 0
         self.total_skipped_folders = 0
         self.total_dispatched_files = 0
+        self.scan_api_calls = 0
+        # Processed-file index for change detection ('query' = one IN query per folder instead, for tight memory)
+        self.file_index = ProcessedFileIndex() if config.SCANNER_FILE_INDEX == 'memory' else None
 
     def shutdown(self):
         """Signal the ingestor to stop."""
@@ -67,7 +302,7 @@ class GDriveHighSpeedIngestor:
 
     def get_service(self):
         if not hasattr(self._tls, 'service'):
-            self._tls.service = build('drive', 'v3', credentials=self.creds, cache_discovery=False)
+            self._tls.service = drive_service.build_service(self.creds)
         return self._tls.service
 
     def retry_on_429(func):
@@ -95,8 +330,17 @@ class GDriveHighSpeedIngestor:
         with self.engine.connect() as conn:
 
             # Load Folder Registry (ID -> ModifiedTime)
-            folders = conn.execute(text("SELECT folder_id, drive_modified_at FROM drive_folder_registry"))
+            try:
+                folders = conn.execute(text("SELECT folder_id, folder_modified_at, child_count, folder_name, parent_id FROM drive_folder_registry")).fetchall()
+            except Exception:
+                # Folder-tree columns not migrated yet: no folder time to compare, every folder is listed
+                folders = conn.execute(text("SELECT folder_id, NULL, NULL, folder_name, NULL FROM drive_folder_registry")).fetchall()
             self.folder_registry = {row[0]: row[1] for row in folders}
+            self.folder_child_counts = {row[0]: row[2] for row in folders if row[2] is not None}
+            for row in folders:
+                # In-memory entries (walks, change events) are at least as fresh as the DB
+                if row[4] and self.folder_paths.name(row[0]) is None:
+                    self.folder_paths.put(row[0], row[3], row[4])
             
             # Query for processed files count
             try:
@@ -115,6 +359,12 @@ class GDriveHighSpeedIngestor:
             res = conn.execute(text("SELECT meta_value FROM etl_metadata WHERE meta_key='last_change_token'"))
             row = res.fetchone()
             if row: self.page_token = row[0] if row else None
+            res = conn.execute(text("SELECT meta_value FROM etl_metadata WHERE meta_key='last_reconcile_at'"))
+            row = res.fetchone()
+            self.reconcile_since = row[0] if row else None
+
+            if self.file_index is not None:
+                self.sync_file_index(conn)
 
         logger.debug(f"Registry loaded: {len(self.folder_registry)} folders, {self.files_processed_count} files processed.")
 
@@ -123,147 +373,512 @@ class GDriveHighSpeedIngestor:
             conn.execute(text("INSERT INTO etl_metadata (meta_key, meta_value) VALUES ('last_change_token', :token) ON DUPLICATE KEY UPDATE meta_value = :token"), {"token": token})
 
     def get_changes(self):
-        """Fetch all pending changes from Google Drive since last token."""
+        """
+        Stream pending Google Drive changes since the last token, one page at a time, so
+        changes are dispatched while later pages are still being fetched. The token only
+        advances once every page has been read.
+        """
         service = self.get_service()
         if not self.page_token:
+            acquire_drive_quota("changes")
             token_res = service.changes().getStartPageToken().execute()
             self.page_token = token_res.get('startPageToken')
             self.save_change_token(self.page_token)
-            return []
+            return
 
         try:
-            all_changes = []
             current_token = self.page_token
             while True:
+                acquire_drive_quota("changes")
                 response = service.changes().list(
                     pageToken=current_token, 
                     spaces='drive', 
                     pageSize=100,
-                    fields="nextPageToken, newStartPageToken, changes(fileId, removed, file(id, name, mimeType, parents, modifiedTime))"
+                    fields="nextPageToken, newStartPageToken, changes(fileId, removed, file(id, name, mimeType, parents, modifiedTime, size, md5Checksum))"
                 ).execute()
-                all_changes.extend(response.get('changes', []))
+                yield response.get('changes', [])
                 if 'nextPageToken' in response:
                     current_token = response['nextPageToken']
                 else:
                     self.page_token = response.get('newStartPageToken') or current_token
                     break
-            
-            return all_changes
         except Exception as e:
             logger.warning(f"Changes API error: {e}. Token might be expired.")
+            acquire_drive_quota("changes")
             token_res = service.changes().getStartPageToken().execute()
             self.page_token = token_res.get('startPageToken')
             self.save_change_token(self.page_token)
-            return []
 
-    def register_folder(self, folder_id, folder_name, modified_at, csv_count=0):
+    def register_folder(self, folder_id, folder_name, modified_at, csv_count=0, parent_id=None, child_count=None,
+                        newest_child_at=None):
+        """
+        Upsert the folder-tree index row: the folder's own Drive modifiedTime (folder_modified_at),
+        its parent and its direct child count are what the next scan compares against.
+        drive_modified_at keeps its meaning: the newest child's modifiedTime at the last listing.
+        """
+        params = {"id": folder_id, "name": folder_name, "mod": modified_at, "count": csv_count,
+                  "parent": parent_id, "children": child_count, "newest": newest_child_at}
         try:
             with self.engine.begin() as conn:
-                sql = text("""
-                    INSERT INTO drive_folder_registry (folder_id, folder_name, drive_modified_at, csv_count, status, scanned_at) 
-                    VALUES (:id, :name, :mod, :count, 'DONE', NOW()) 
-                    ON DUPLICATE KEY UPDATE 
-                        drive_modified_at=VALUES(drive_modified_at), 
-                        csv_count=VALUES(csv_count), 
-                        status='DONE',
-                        scanned_at=NOW()
-                """)
-                conn.execute(sql, {"id": folder_id, "name": folder_name, "mod": modified_at, "count": csv_count})
+                try:
+                    conn.execute(text("""
+                        INSERT INTO drive_folder_registry (folder_id, folder_name, parent_id, drive_modified_at, folder_modified_at, csv_count, child_count, status, scanned_at) 
+                        VALUES (:id, :name, :parent, :newest, :mod, :count, :children, 'DONE', NOW()) 
+                        ON DUPLICATE KEY UPDATE 
+                            parent_id=COALESCE(VALUES(parent_id), parent_id),
+                            drive_modified_at=VALUES(drive_modified_at), 
+                            folder_modified_at=VALUES(folder_modified_at), 
+                            csv_count=VALUES(csv_count), 
+                            child_count=VALUES(child_count),
+                            status='DONE',
+                            scanned_at=NOW()
+                    """), params)
+                except Exception:
+                    # Folder-tree columns not migrated yet
+                    conn.execute(text("""
+                        INSERT INTO drive_folder_registry (folder_id, folder_name, drive_modified_at, csv_count, status, scanned_at) 
+                        VALUES (:id, :name, :newest, :count, 'DONE', NOW()) 
+                        ON DUPLICATE KEY UPDATE 
+                            drive_modified_at=VALUES(drive_modified_at), 
+                            csv_count=VALUES(csv_count), 
+                            status='DONE',
+                            scanned_at=NOW()
+                    """), params)
             
             # Update In-Memory Cache
             self.folder_registry[folder_id] = modified_at
+            if child_count is not None:
+                self.folder_child_counts[folder_id] = child_count
         except Exception as e:
             logger.error(f"Failed to register folder {folder_name}: {e}")
 
+    @staticmethod
+    def _db_time(modified_time):
+        """Drive ISO time -> the 'YYYY-MM-DD HH:MM:SS' form stored in drive/folder_modified_at."""
+        if modified_time and 'T' in modified_time:
+            return modified_time.replace('T', ' ').replace('Z', '').split('.')[0]
+        return modified_time
+
+    def folder_unchanged(self, folder_id, modified_at):
+        """
+        True if the folder-tree index says this subtree needs no listing: the folder was
+        fully scanned before and its Drive modifiedTime has not moved since.
+        """
+        recorded = self.folder_registry.get(folder_id)
+        if not recorded:
+            return False
+        if modified_at is None:
+            return True  # No current time to compare against (legacy callers): trust the index
+        return str(recorded) == self._db_time(modified_at)
+
     @retry_on_429
-    def list_files(self, parent_id):
+    def _list_page(self, query, page_token=None):
         # Circuit breaker + rate limit protected API call
         def _list():
+            acquire_drive_quota("list")
             return self.get_service().files().list(
-                q=f"'{parent_id}' in parents and trashed=false", 
-                fields="files(id, name, mimeType, modifiedTime)",
+                q=query,
+                fields="nextPageToken, files(id, name, mimeType, modifiedTime, size, md5Checksum, parents)",
                 orderBy="modifiedTime desc",
-                pageSize=1000 
-            ).execute().get('files', [])
+                pageSize=1000,
+                pageToken=page_token
+            ).execute()
+        with self.stats_lock:
+            self.scan_api_calls += 1
+        return self.api_breaker.call(_list)
+
+    def list_children(self, parent_ids):
+        """
+        Children of several folders with ONE query ('a' in parents or 'b' in parents ...),
+        following nextPageToken to the end. Returns {parent_id: [items newest first]}.
+        Errors propagate, so a failed listing is never mistaken for an empty folder.
+        """
+        parents_q = " or ".join(f"'{pid}' in parents" for pid in parent_ids)
+        query = f"({parents_q}) and trashed=false"
+        children = {pid: [] for pid in parent_ids}
+        page_token = None
+        while True:
+            res = self._list_page(query, page_token)
+            for item in res.get('files', []):
+                for pid in item.get('parents', []):
+                    if pid in children:
+                        children[pid].append(item)
+            page_token = res.get('nextPageToken')
+            if not page_token:
+                return children
+
+    @retry_on_429
+    def _get_folder(self, folder_id):
+        def _get():
+            acquire_drive_quota("get")
+            return self.get_service().files().get(fileId=folder_id, fields="id, name, parents").execute()
+        with self.stats_lock:
+            self.scan_api_calls += 1
+        return self.api_breaker.call(_get)
+
+    def lineage_of(self, item):
+        """
+        (folder_id, folder_name, path) of a changed item's parent from the folder path cache.
+        Uncached ancestors are fetched by ID (one files().get each, then remembered), never
+        by listing. None if the item is not under ROOT_FOLDER_ID.
+        """
+        for parent_id in item.get('parents', []):
+            for _ in range(100):  # Depth guard
+                missing = self.folder_paths.missing_ancestor(parent_id)
+                if missing is None:
+                    break
+                try:
+                    meta = self._get_folder(missing)
+                except Exception as e:
+                    logger.debug(f"Parent lookup failed for {missing}: {e}")
+                    break
+                self.folder_paths.put(missing, meta.get('name'), (meta.get('parents') or [None])[0])
+            path = self.folder_paths.path(parent_id)
+            if path is not None:
+                return parent_id, self.folder_paths.name(parent_id), path
+        return None
+
+    def list_files(self, parent_id):
         try:
-            return self.api_breaker.call(_list)
+            return self.list_children([parent_id])[parent_id]
         except CircuitBreakerOpenError as e:
             logger.warning(f"Circuit breaker OPEN, skipping list_files for {parent_id}: {e}")
             return []
 
-    def has_file_changed(self, file_id, current_hash):
-        """Stateless DB-backed check to see if a file needs processing."""
-        with self.engine.connect() as conn:
-            result = conn.execute(text("SELECT file_hash, status FROM file_registry WHERE drive_file_id = :id"), {"id": file_id}).fetchone()
-            if result:
-                # Processed successfully and hash hasn't changed = SKIP
-                if result[1] == 'PROCESSED' and result[0] == current_hash:
-                    return False
-            # Needs processing
-            return True
+    def flush_dispatch(self):
+        """Send the partly filled small-file pack and every buffered task."""
+        self.small_files.flush()
+        self.publisher.flush()
 
-    def scanner_producer(self, folder_id, folder_name, path=""):
-        if self.shutdown_event.is_set(): return
-        
-        # Check if folder is already fully processed in db
-        recorded_mod = self.folder_registry.get(folder_id)
-        # If it exists, SKIP the folder entirely to prevent re-scanning 125,000 files
-        if recorded_mod:
-            logger.debug(f"⏭ SKIPPING Folder: {folder_name} (Already indexed)")
+    def dispatch_file(self, item, folder_id, folder_name, path):
+        """Queue one changed CSV: small files (by Drive `size`) are packed, others get their own size-routed task."""
+        size = int(item['size']) if item.get('size') else None
+        task_kwargs = dict(
+            file_id=item['id'],
+            file_name=item['name'],
+            folder_id=folder_id,
+            folder_name=folder_name,
+            path=path,
+            modified_time=item.get('modifiedTime'),
+            file_size=size,
+            md5_checksum=item.get('md5Checksum')
+        )
+        if size is not None and size <= self.small_file_max_bytes and self.small_files.max_files > 1:
+            self.small_files.add(task_kwargs)
             return
-            
-        # 1. Fetch items
-        items = self.list_files(folder_id)
-        
-        # Separate Folders and Files to guarantee processing order
-        folders = [item for item in items if item['mimeType'] == 'application/vnd.google-apps.folder']
-        csv_files = [item for item in items if item['name'].lower().endswith('.csv')]
-        
-        # Process NEWEST CSV FILES first
-        folder_skipped = 0
-        folder_dispatched = 0
-        
-        for item in csv_files:
-            if self.shutdown_event.is_set(): break
-            
-            # Stateless change detection
-            current_hash = self.get_file_hash(item['id'], item.get('modifiedTime', ''))
-            
-            if not self.has_file_changed(item['id'], current_hash):
-                folder_skipped += 1
-                continue
-                
-            # New or modified file -> Dispatch
-            from tasks.gdrive_task.etl_tasks import process_csv_task
-            process_csv_task.delay(
-                file_id=item['id'], 
-                file_name=item['name'],
-                folder_id=folder_id, 
-                folder_name=folder_name,
-                path=f"{path}/{folder_name}", 
-                modified_time=item.get('modifiedTime')
-            )
-            folder_dispatched += 1
-            logger.debug(f"[DISPATCH] {item['name']}")
-
-        # Then recursively scan NEWEST SUBFOLDERS (Phase 2)
-        for folder in folders:
-            if self.shutdown_event.is_set(): break
-            self.scanner_producer(folder['id'], folder['name'], f"{path}/{folder_name}")
-                
-        # Log Summary for this folder
-        if folder_dispatched > 0:
-            logger.debug(f"📂 [SCANNED] {folder_name}: {folder_dispatched} new tasks, {folder_skipped} skipped.")
-            
-        with self.stats_lock:
-            self.total_scanned_folders += 1
-            self.total_dispatched_files += folder_dispatched
-            
-        # Register folder scan as done
-        mod_time = items[0].get('modifiedTime') if items else datetime.utcnow().isoformat() + "Z"
-        if 'T' in mod_time: 
-            mod_time = mod_time.replace('T', ' ').replace('Z', '').split('.')[0]
-        self.register_folder(folder_id, folder_name, mod_time, len(csv_files))
+        self.publisher.dispatch_csv(task_kwargs)
+
+    _REGISTRY_INDEX_SQL = "SELECT drive_file_id, file_hash, status, {md5} FROM file_registry WHERE {where}"
+
+    def _registry_rows(self, conn, where, params):
+        """file_registry rows for the index; tolerates a missing md5_checksum column (not migrated yet)."""
+        try:
+            return conn.execute(text(self._REGISTRY_INDEX_SQL.format(md5="md5_checksum", where=where)), params)
+        except Exception:
+            return conn.execute(text(self._REGISTRY_INDEX_SQL.format(md5="NULL", where=where)), params)
+
+    def sync_file_index(self, conn):
+        """Full load on the first call, then only rows touched since the previous sync."""
+        try:
+            db_now = conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()
+            if self.file_index.synced_at is None:
+                rows = self._registry_rows(conn.execution_options(stream_results=True), "status = 'PROCESSED'", {})
+            else:
+                rows = self._registry_rows(conn, "processed_at >= :since", {"since": self.file_index.synced_at})
+            applied = self.file_index.apply(rows)
+            self.file_index.synced_at = db_now
+            logger.debug(f"File index synced: {applied} rows applied, {len(self.file_index)} processed files in memory.")
+        except Exception as e:
+            # Keep the last good view; until the first load succeeds filter_changed queries the DB
+            logger.warning(f"File index sync failed: {e}")
+
+    def filter_changed(self, items):
+        """
+        Drive CSV items that still need processing: not PROCESSED at this revision, and
+        content (md5Checksum) not already ingested under any ID. At most one DB query
+        per call, none when the in-memory index is loaded.
+        """
+        if not items:
+            return []
+        index = self.file_index
+        if index is None or index.synced_at is None:
+            index = ProcessedFileIndex()
+            ids = [item['id'] for item in items]
+            sums = [item['md5Checksum'] for item in items if item.get('md5Checksum')] or ['']
+            with self.engine.connect() as conn:
+                try:
+                    rows = conn.execute(
+                        text(self._REGISTRY_INDEX_SQL.format(
+                            md5="md5_checksum",
+                            where="status = 'PROCESSED' AND (drive_file_id IN :ids OR md5_checksum IN :sums)"
+                        )).bindparams(bindparam("ids", expanding=True), bindparam("sums", expanding=True)),
+                        {"ids": ids, "sums": sums}
+                    ).fetchall()
+                except Exception:
+                    rows = conn.execute(
+                        text(self._REGISTRY_INDEX_SQL.format(md5="NULL", where="status = 'PROCESSED' AND drive_file_id IN :ids"))
+                        .bindparams(bindparam("ids", expanding=True)),
+                        {"ids": ids}
+                    ).fetchall()
+            index.apply(rows)
+        return [
+            item for item in items
+            if not index.is_processed(item['id'], self.get_file_hash(item['id'], item.get('modifiedTime', '')),
+                                      item.get('md5Checksum'))
+        ]
+
+    def _query_all(self, query):
+        """Every page of a files().list query."""
+        items, page_token = [], None
+        while True:
+            res = self._list_page(query, page_token)
+            items.extend(res.get('files', []))
+            page_token = res.get('nextPageToken')
+            if not page_token:
+                return items
+
+    def save_reconcile_mark(self, started_utc):
+        # Overlap the next window a little so clock skew / in-flight edits are never missed
+        mark = (started_utc - timedelta(minutes=10)).strftime('%Y-%m-%dT%H:%M:%S')
+        with self.engine.begin() as conn:
+            conn.execute(text("INSERT INTO etl_metadata (meta_key, meta_value) VALUES ('last_reconcile_at', :mark) ON DUPLICATE KEY UPDATE meta_value = :mark"), {"mark": mark})
+        self.reconcile_since = mark
+
+    def reconcile(self):
+        """
+        Reconciliation pass against the folder-tree index. Drive does not bump a folder's
+        modifiedTime when something deep below it changes, so instead of re-walking from ROOT
+        this asks Drive for folders and CSVs modified since the last pass:
+        - moved folders inside our tree (or new ones under it) are re-walked, which lists them,
+          compares child counts and descends only into subfolders that moved;
+        - modified CSVs in indexed folders that the walk did not list go through the normal
+          change detection and dispatch.
+        Without a previous mark it falls back to a walk from ROOT (unchanged subtrees skipped).
+        """
+        started = datetime.utcnow()
+        since = self.reconcile_since
+        if not since:
+            top_folders = [f for f in self.list_files(ROOT_FOLDER_ID) if f['mimeType'] == 'application/vnd.google-apps.folder']
+            self.walk_tree(self._roots(top_folders), "ROOT")
+        else:
+            in_tree = lambda fid: fid == ROOT_FOLDER_ID or fid in self.folder_registry
+            moved = self._query_all(
+                f"mimeType = 'application/vnd.google-apps.folder' and modifiedTime > '{since}' and trashed=false")
+            moved_ids = {f['id'] for f in moved}
+            roots = [
+                f for f in moved
+                if (in_tree(f['id']) or any(in_tree(p) for p in f.get('parents', [])))
+                # Moved folders under another moved folder are reached by that walk
+                and not any(p in moved_ids for p in f.get('parents', []))
+            ]
+            listed = self.walk_tree(self._roots(roots), "RECONCILE") if roots else set()
+
+            by_parent = {}
+            names = " or ".join(f"name contains '{token}'" for token in NAME_TOKENS)
+            for item in self._query_all(f"({names}) and modifiedTime > '{since}' and trashed=false"):
+                if not is_ingestible(item['name']):
+                    continue
+                parent = next((p for p in item.get('parents', []) if p in self.folder_registry), None)
+                if parent and parent not in listed:
+                    by_parent.setdefault(parent, []).append(item)
+            dispatched = 0
+            for parent, items in by_parent.items():
+                for item in self.filter_changed(items):
+                    folder_id, folder_name, path = self.lineage_of(item) or (parent, "Reconcile", "RECONCILE")
+                    self.dispatch_file(item, folder_id, folder_name, path)
+                    dispatched += 1
+            logger.info(f"🔁 [RECONCILE] {len(moved)} moved folders ({len(roots)} walked), "
+                        f"{dispatched} missed CSVs dispatched since {since}")
+        if not self.shutdown_event.is_set():
+            self.save_reconcile_mark(started)
+
+    def is_leader(self):
+        """True on a standalone orchestrator or the cluster's leader (runs change feed / reconciliation)."""
+        return self.cluster is None or self.cluster.is_leader
+
+    def top_level_folders(self):
+        return [f for f in self.list_files(ROOT_FOLDER_ID) if f['mimeType'] == 'application/vnd.google-apps.folder']
+
+    def take_shard(self, top_folders, members=None):
+        """
+        The top-level folders this instance scans: all of them standalone, otherwise the ones
+        the consistent-hash ring of live members assigns to this node. Remembers the result.
+        """
+        if self.cluster is None:
+            return top_folders
+        members = self.cluster.members() if members is None else members
+        ring = HashRing(members or [self.cluster.node_id])
+        owned = [f for f in top_folders if ring.owner(f['id']) == self.cluster.node_id]
+        self.cluster_members = members
+        self.owned_folder_ids = {f['id'] for f in owned}
+        logger.info(f"🧩 {len(ring.nodes)} orchestrator(s): {self.cluster.node_id} owns "
+                    f"{len(owned)}/{len(top_folders)} top-level folders")
+        return owned
+
+    def rebalance(self):
+        """
+        When cluster membership changed, walk the top-level folders this node just took over
+        (e.g. from a node whose lease expired). Subtrees the previous owner finished are
+        skipped by the folder-tree index, so only its unfinished work is redone.
+        """
+        members = self.cluster.members()
+        if members == self.cluster_members:
+            return
+        top_folders = self.top_level_folders()
+        if not top_folders:
+            return  # Listing failed: retry next cycle
+        previous = self.owned_folder_ids
+        gained = [f for f in self.take_shard(top_folders, members) if f['id'] not in previous]
+        if gained:
+            logger.info(f"🧩 Taking over {len(gained)} top-level folders")
+            self.walk_tree(self._roots(gained), "ROOT")
+            self.flush_dispatch()
+
+    @staticmethod
+    def _roots(folders):
+        """walk_tree roots from Drive folder items."""
+        return [(f['id'], f['name'], f.get('modifiedTime'), (f.get('parents') or [None])[0]) for f in folders]
+
+    def walk_tree(self, roots, path):
+        """
+        Breadth-first scan from `roots` [(folder_id, folder_name, modifiedTime, parent_id)].
+        Only subtrees whose modifiedTime (or parent's child count) moved since the last
+        scan are listed, so a rescan costs O(changed folders) rather than O(tree).
+        SCAN_THREADS threads share one frontier; each takes up to SCAN_PARENTS_PER_QUERY
+        queued folders at a time and lists them with one paginated multi-parent query,
+        so a full scan is bounded by Drive quota rather than per-folder round trips.
+        """
+        walk = TreeWalk()
+        for folder_id, folder_name, modified_at, parent_id in roots:
+            # Roots with known lineage keep their real path; `path` is the fallback prefix
+            walk.add(folder_id, folder_name, self.folder_paths.path(parent_id) or path,
+                     parent_id=parent_id, modified_at=modified_at)
+
+        start = time.time()
+        calls_before = self.scan_api_calls
+        folders_before = self.total_scanned_folders
+        per_query = max(1, config.SCAN_PARENTS_PER_QUERY)
+
+        def scanner():
+            while True:
+                first = walk.frontier.get()
+                if first is None:
+                    return  # Walk finished
+                batch = [first]
+                while len(batch) < per_query:
+                    try:
+                        item = walk.frontier.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        walk.frontier.put(None)  # Not ours to consume; hand it back
+                        break
+                    batch.append(item)
+                try:
+                    if not self.shutdown_event.is_set():
+                        self._scan_folders(walk, batch)
+                except Exception as e:
+                    # Left unregistered (and so are its ancestors) -> picked up again by the next scan
+                    logger.warning(f"Listing failed for {len(batch)} folder(s): {e}")
+                finally:
+                    for _ in batch:
+                        walk.frontier.task_done()
+
+        threads = [threading.Thread(target=scanner, name=f"Scanner-{i}", daemon=True)
+                   for i in range(max(1, config.SCAN_THREADS))]
+        for t in threads:
+            t.start()
+        walk.frontier.join()
+        for _ in threads:
+            walk.frontier.put(None)
+        for t in threads:
+            t.join()
+
+        elapsed = max(time.time() - start, 1e-6)
+        folders = self.total_scanned_folders - folders_before
+        calls = self.scan_api_calls - calls_before
+        logger.info(
+            f"🌲 [WALK] {path}: {folders} folders in {elapsed:.1f}s "
+            f"({folders / elapsed:.1f} folders/s, {calls} API calls, {calls / max(folders, 1):.2f} calls/folder)"
+        )
+        return walk.listed_ids
+
+    def _scan_folders(self, walk, batch):
+        """List one batch of frontier folders, dispatch their CSVs and queue their subfolders."""
+        todo = []
+        for folder_id, folder_name, path, modified_at, force in batch:
+            # Unchanged since the last scan -> SKIP the whole subtree (no re-scan of 125,000 files)
+            if not force and self.folder_unchanged(folder_id, modified_at):
+                logger.debug(f"⏭ SKIPPING Folder: {folder_name} (Unchanged since last scan)")
+                walk.listed(folder_id)
+            else:
+                todo.append((folder_id, folder_name, path, modified_at))
+        if not todo:
+            return
+
+        children = self.list_children([folder_id for folder_id, _, _, _ in todo])
+        walk.listed_ids.update(children)
+        listed = []
+
+        for folder_id, folder_name, path, modified_at in todo:
+            items = children[folder_id]
+            folder_path = f"{path}/{folder_name}"
+            parent_id = walk.parent_of(folder_id)
+            if parent_id is not None:
+                self.folder_paths.put(folder_id, folder_name, parent_id)
+            folders = [item for item in items if item['mimeType'] == 'application/vnd.google-apps.folder']
+            csv_files = [item for item in items if is_ingestible(item['name'])]  # .csv, .csv.gz / .gz, .zip
+
+            # Change detection for the whole folder at once, NEWEST CSV FILES first
+            changed = self.filter_changed(csv_files) if not self.shutdown_event.is_set() else []
+            folder_skipped = len(csv_files) - len(changed)
+            folder_dispatched = 0
+            for item in changed:
+                if self.shutdown_event.is_set(): break
+
+                # New or modified file -> Dispatch
+                self.dispatch_file(item, folder_id, folder_name, folder_path)
+                folder_dispatched += 1
+                logger.debug(f"[DISPATCH] {item['name']}")
+
+            # Subfolders join the shared frontier (breadth-first). When this folder's child count
+            # moved, Drive may not have bumped the subfolders' modifiedTime -> list them all.
+            previous_count = self.folder_child_counts.get(folder_id)
+            count_moved = previous_count is not None and previous_count != len(items)
+            for folder in folders:
+                self.folder_paths.put(folder['id'], folder['name'], folder_id)
+                walk.add(folder['id'], folder['name'], folder_path, parent_id=folder_id,
+                         modified_at=folder.get('modifiedTime'), force=count_moved)
+
+            if folder_dispatched > 0:
+                logger.debug(f"📂 [SCANNED] {folder_name}: {folder_dispatched} new tasks, {folder_skipped} skipped.")
+
+            with self.stats_lock:
+                self.total_scanned_folders += 1
+                self.total_dispatched_files += folder_dispatched
+
+            if self.shutdown_event.is_set():
+                continue  # Partly dispatched -> don't mark the folder DONE
+
+            # Register folder scan as done once its whole subtree has been listed
+            mod_time = self._db_time(modified_at or datetime.utcnow().isoformat() + "Z")
+            # drive_modified_at as before: newest child (listings are newest first), or now for an empty folder
+            newest_child = self._db_time(items[0].get('modifiedTime') if items else datetime.utcnow().isoformat() + "Z")
+            listed.append((folder_id, lambda fid=folder_id, name=folder_name, mod=mod_time, n=len(csv_files),
+                           parent=parent_id, children_n=len(items), newest=newest_child:
+                           self.register_folder(fid, name, mod, n, parent_id=parent, child_count=children_n,
+                                                newest_child_at=newest)))
+
+        if not listed:
+            return
+
+        def mark_listed():
+            for folder_id, on_complete in listed:
+                walk.listed(folder_id, on_complete)
+
+        # Folders are marked DONE only once this batch's tasks, including those in a partly
+        # filled small-file pack, have reached the broker with a later bulk publish
+        self.small_files.after_flush(mark_listed)
 
     # REMOVED: download_csv, worker_consumer, process_file, commit_batch
     # These are now handled by Celery in tasks/gdrive_task/etl_tasks.py
@@ -299,32 +914,38 @@ class GDriveHighSpeedIngestor:
             self.total_scanned_folders = 0
             self.total_dispatched_files = 0
             
+        is_leader = self.is_leader()
+
         # 1. INITIAL FULL SCAN (Only on first start)
         if self.first_run:
-            # Reset Celery Aggregated Counters in Redis ONLY on first startup
-            try:
-                r = redis.Redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
-                r.set('celery_files_processed', 0)
-                r.set('celery_rows_inserted', 0)
-                logger.debug("🔄 Redis Counters Reset (files & rows)")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to reset Redis counters: {e}")
+            # Reset Celery Aggregated Counters in Redis ONLY on first startup (cluster: leader only)
+            if is_leader:
+                try:
+                    r = redis.Redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+                    r.set('celery_files_processed', 0)
+                    r.set('celery_rows_inserted', 0)
+                    logger.debug("🔄 Redis Counters Reset (files & rows)")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to reset Redis counters: {e}")
 
             logger.info("🎬 Initializing GDrive Orchestrator v6.0 (Celery Mode)...")
-            top_folders = [f for f in self.list_files(ROOT_FOLDER_ID) if f['mimeType'] == 'application/vnd.google-apps.folder']
+            top_folders = self.top_level_folders()
+            owned = self.take_shard(top_folders)
             
-            # Reduced workers for scanning to avoid overhead.
-            with ThreadPoolExecutor(max_workers=8) as executor:
-                futures = [executor.submit(self.scanner_producer, f['id'], f['name'], "ROOT") for f in top_folders]
-                for f in as_completed(futures):
-                    if self.shutdown_event.is_set():
-                        logger.info("Shutdown requested. Cancelling remaining scanners.")
-                        break
-                self.scanners_finished.set()
+            walk_started = datetime.utcnow()
+            self.walk_tree(self._roots(owned), "ROOT")
+            if self.shutdown_event.is_set():
+                logger.info("Shutdown requested. Scan stopped early.")
+            elif is_leader:
+                self.save_reconcile_mark(walk_started)
+            self.scanners_finished.set()
+            self.flush_dispatch()
+            self.last_full_walk = time.time()
             
             # Removed redundant Producer-side stats refresh (handled by Celery now)
             self.first_run = False
-            self.save_change_token(self.page_token)
+            if is_leader:
+                self.save_change_token(self.page_token)
             logger.info("="*60)
             logger.info(f"✅ Initial Scan Complete in {time.time() - start_time:.2f}s")
             logger.info(f"   - Total Folders Scanned: {self.total_scanned_folders}")
@@ -332,56 +953,55 @@ class GDriveHighSpeedIngestor:
             logger.info("="*60)
             return
 
-        # 2. REACTIVE TARGETED SYNC
-        changes = self.get_changes()
-        if not changes:
+        # Cluster: pick up folders of nodes that joined/left, then leave the singleton duties to the leader
+        if self.cluster is not None:
+            self.rebalance()
+            if not is_leader:
+                logger.debug(f"⚡ Follower {self.cluster.node_id}: change feed and reconciliation run on the leader.")
+                return
+
+        # 2. PERIODIC RECONCILIATION: catches anything the change feed missed at O(changed) cost
+        if config.FOLDER_RECONCILE_MINUTES > 0 and time.time() - self.last_full_walk >= config.FOLDER_RECONCILE_MINUTES * 60:
+            self.reconcile()
+            self.flush_dispatch()
+            self.last_full_walk = time.time()
+            logger.info(f"🔁 Reconciliation pass done in {time.time() - start_time:.2f}s")
+
+        # 3. REACTIVE TARGETED SYNC: each change page is dispatched as it streams in
+        change_count = 0
+        folders_to_scan = {}  # Deduplicated to prevent parallel scans of the same folder
+        for changes in self.get_changes():
+            change_count += len(changes)
+            changed_csvs = []
+            for c in changes:
+                if c.get('removed'): continue
+                file = c.get('file', {})
+                if not file: continue
+
+                # Identify what changed
+                if is_ingestible(file.get('name', '')):
+                    changed_csvs.append(file)
+                elif file.get('mimeType') == 'application/vnd.google-apps.folder':
+                    # Renames / moves refresh the path cache straight from the change
+                    self.folder_paths.put(file['id'], file['name'], (file.get('parents') or [None])[0])
+                    folders_to_scan[file['id']] = file
+
+            for file in self.filter_changed(changed_csvs):
+                folder_id, folder_name, path = self.lineage_of(file) or ("TARGETED", "Reactive", "REACTIVE")
+                logger.debug(f"🆕 REACTIVE TASK: {path}/{file['name']}")
+                self.dispatch_file(file, folder_id, folder_name, path)
+
+        if not change_count:
             logger.debug("⚡ System Idle... No new changes detected.")
             return
 
-        logger.info(f"🚀 Reactive Trigger! Disptaching {len(changes)} updates to Celery...")
-        
-        from tasks.gdrive_task.etl_tasks import process_csv_task
-        
-        folders_to_scan = []
+        logger.info(f"🚀 Reactive Trigger! {change_count} changes dispatched to Celery")
 
-        for c in changes:
-            if c.get('removed'): continue
-            file = c.get('file', {})
-            if not file: continue
-            
-            # Identify what changed
-            if file.get('name', '').lower().endswith('.csv'):
-                file_hash = self.get_file_hash(file['id'], file.get('modifiedTime', ''))
-                if self.has_file_changed(file['id'], file_hash):
-                     logger.debug(f"🆕 REACTIVE TASK: {file['name']}")
-                     process_csv_task.delay(
-                        file_id=file['id'], 
-                        file_name=file['name'],
-                        folder_id="TARGETED", 
-                        folder_name="Reactive",
-                        path="REACTIVE", 
-                        modified_time=file.get('modifiedTime')
-                     )
-            elif file.get('mimeType') == 'application/vnd.google-apps.folder':
-                folders_to_scan.append(file)
-        
-        # Deduplicate folders to prevent parallel scans of the same folder
         if folders_to_scan:
-            seen_ids = set()
-            unique_folders = []
-            for f in folders_to_scan:
-                if f['id'] not in seen_ids:
-                    seen_ids.add(f['id'])
-                    unique_folders.append(f)
-            folders_to_scan = unique_folders
             logger.info(f"📂 Scanning {len(folders_to_scan)} unique reactive folders...")
-
-            with ThreadPoolExecutor(max_workers=8) as executor:
-                futures = [executor.submit(self.scanner_producer, f['id'], f['name'], "REACTIVE") for f in folders_to_scan]
-                for f in as_completed(futures):
-                    if self.shutdown_event.is_set():
-                        break
+            self.walk_tree(self._roots(folders_to_scan.values()), "REACTIVE")
             
+        self.flush_dispatch()
         self.save_change_token(self.page_token)
         logger.info(f"✨ Reactive Cycle dispatched in {time.time() - start_time:.2f}s")
 
@@ -391,9 +1011,10 @@ class ValidationQualityProcessor:
     Processes raw_google_map_drive_data -> raw_clean_google_map_data & master_table
     Ensures zero data loss, applying robust validation, normalization, and deduplication.
     """
-    def __init__(self, engine, shutdown_event):
+    def __init__(self, engine, shutdown_event, is_active=None):
         self.engine = engine
         self.shutdown_event = shutdown_event
+        self.is_active = is_active  # Cluster mode: only the leader validates
         self.batch_size = 2000 # Smaller batch for stability
         self.consecutive_errors = 0
         self.max_backoff = 60  # Max sleep on consecutive errors
@@ -404,6 +1025,7 @@ class ValidationQualityProcessor:
         self._agg_dup = 0
         self._agg_cleaned = 0
         self._agg_batches = 0
+        self._dedup_sig_column = True  # False until utils/db_migrations added raw_clean_google_map_data.dedup_sig
 
     @staticmethod
     def safe_str(val, default=""):
@@ -511,11 +1133,50 @@ class ValidationQualityProcessor:
         except Exception:
             return False, False, ["unknown"], [], ""
 
+    @staticmethod
+    def signature_hash(sig):
+        """
+        16-byte digest of a (phone, name, address, city) signature. Mirrors the generated
+        column raw_clean_google_map_data.dedup_sig:
+        MD5(CONCAT_WS('|', phone, LOWER(TRIM(name)), LOWER(TRIM(address)), LOWER(TRIM(city)))).
+        """
+        phone, name, addr, city = sig
+        key = "|".join([phone or '', (name or '').strip(' ').lower(), (addr or '').strip(' ').lower(),
+                        (city or '').strip(' ').lower()])
+        return hashlib.md5(key.encode('utf-8')).digest()
+
     def check_duplicates_batch(self, signatures, conn):
-        """Batch check signatures against the clean table. Never throws."""
+        """
+        Batch check signatures against the clean table. Never throws.
+        One indexed `dedup_sig IN (...)` lookup per 500 signatures; falls back to the
+        column-by-column scan while the dedup_sig migration has not run yet.
+        """
         if not signatures:
             return set()
-        
+        if not self._dedup_sig_column:
+            return self._scan_duplicates(signatures, conn)
+
+        by_hash = {self.signature_hash(sig): sig for sig in signatures}
+        hashes = list(by_hash)
+        query = text("SELECT dedup_sig FROM raw_clean_google_map_data WHERE dedup_sig IN :sigs").bindparams(
+            bindparam("sigs", expanding=True))
+        results = set()
+        for i in range(0, len(hashes), 500):
+            try:
+                for (found,) in conn.execute(query, {"sigs": hashes[i:i+500]}):
+                    sig = by_hash.get(bytes(found))
+                    if sig is not None:
+                        results.add(sig)
+            except Exception as e:
+                if "dedup_sig" in str(e):
+                    logger.warning("raw_clean_google_map_data.dedup_sig missing (migration pending); duplicate checks scan the table")
+                    self._dedup_sig_column = False
+                    return self._scan_duplicates(signatures, conn)
+                logger.warning(f"Duplicate check sub-batch failed (non-fatal): {e}")
+        return results
+
+    def _scan_duplicates(self, signatures, conn):
+        """Pre-migration duplicate check: OR'ed function-wrapped predicates (no index can serve it)."""
         results = set()
         sig_list = list(signatures)
         
@@ -546,12 +1207,200 @@ class ValidationQualityProcessor:
                 logger.warning(f"Duplicate check sub-batch failed (non-fatal): {e}")
         return results
 
+    def validate_batch(self, conn, rows, last_id):
+        """
+        Validate, clean and dedup one batch of raw rows and write the results (INSERT IGNORE,
+        so re-running a batch is harmless). Returns (batch_summary, highest raw id seen).
+        """
+        prepared = None
+        if config.VALIDATION_COLUMNAR and rows:
+            try:
+                prepared = self._prepare_columnar(conn, rows, last_id)
+            except Exception as e:
+                logger.warning(f"Columnar validation failed, validating row by row: {str(e)[:100]}")
+        if prepared is None:
+            prepared = self._prepare_rows(conn, rows, last_id)
+        clean_data_batch, master_data_batch, batch_summary, current_max_id = prepared
+        self._write_batch(conn, clean_data_batch, master_data_batch)
+        return batch_summary, current_max_id
+
+    def _prepare_columnar(self, conn, rows, last_id):
+        """Same output as _prepare_rows, computed column by column (model/columnar_validation.py)."""
+        batch = ColumnarBatch(rows)
+        existing_sigs = self.check_duplicates_batch(set(batch.signatures), conn)
+        conn.execute(text("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+        clean_data_batch, master_data_batch, batch_summary = batch.insert_params(existing_sigs, datetime.now())
+        return clean_data_batch, master_data_batch, batch_summary, max(last_id, batch.max_id)
+
+    def _prepare_rows(self, conn, rows, last_id):
+        """Row-by-row normalize, dedup lookup and validation. Returns the INSERT params, summary and max id."""
+        batch_summary = {
+            "total": 0, "missing": 0, "valid": 0,
+            "duplicate": 0, "cleaned": 0
+        }
+        
+        current_max_id = last_id
+        clean_data_batch = []
+        master_data_batch = []
+        batch_rows = []
+        signatures = set()
+        
+        # 2. Process batch — each row is individually protected
+        for row_obj in rows:
+            try:
+                raw_row = row_obj._asdict() if hasattr(row_obj, '_asdict') else row_obj._mapping
+                norm_row = UniversalNormalizer.normalize_row_full(dict(raw_row))
+                norm_row['id'] = raw_row['id']
+                
+                # Ensure all string fields are safe
+                for key in ['name', 'address', 'website', 'phone_number', 'category', 'subcategory', 'city', 'state', 'area']:
+                    norm_row[key] = self.safe_str(norm_row.get(key))
+                norm_row['reviews_count'] = self.safe_int(norm_row.get('reviews_count'))
+                norm_row['reviews_average'] = self.safe_float(norm_row.get('reviews_average'))
+                
+                batch_rows.append(norm_row)
+                current_max_id = max(current_max_id, norm_row['id'])
+                
+                sig = (norm_row['phone_number'], norm_row['name'].lower(), norm_row['address'].lower(), norm_row['city'].lower())
+                signatures.add(sig)
+            except Exception as row_err:
+                # Skip bad row, advance cursor past it
+                try:
+                    current_max_id = max(current_max_id, raw_row['id'])
+                except Exception:
+                    pass
+                logger.warning(f"Row normalization failed (skipping): {str(row_err)[:100]}")
+                continue
+
+        # Bulk Duplicate Check
+        existing_sigs = self.check_duplicates_batch(signatures, conn)
+        
+        # Switch back to safe mode for writes
+        conn.execute(text("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+
+        for row in batch_rows:
+            try:
+                batch_summary["total"] += 1
+                
+                is_structured, is_valid, missing_list, invalid_list, clean_phone = self.validate_row(row)
+                
+                sig = (row['phone_number'], row['name'].lower(), row['address'].lower(), row['city'].lower())
+                is_duplicate = sig in existing_sigs if is_structured else False
+
+                status = "VALID"
+                if not is_structured: 
+                    status = "MISSING"
+                    batch_summary["missing"] += 1
+                elif is_duplicate: 
+                    status = "DUPLICATE"
+                    batch_summary["duplicate"] += 1
+                elif not is_valid: 
+                    status = "INVALID"
+                else:
+                    batch_summary["valid"] += 1
+
+                if status in ["VALID", "MISSING", "INVALID", "DUPLICATE"]:
+                    created_at = row.get('created_at')
+                    if not created_at:
+                        created_at = datetime.now()
+                    
+                    clean_data_batch.append({
+                        "raw_id": row['id'], "name": row['name'], "address": row['address'],
+                        "website": row['website'], "phone": row['phone_number'], 
+                        "reviews": self.safe_int(row.get('reviews_count', 0)),
+                        "avg": self.safe_float(row.get('reviews_average', 0.00)),
+                        "cat": row['category'], "sub": row['subcategory'], "city": row['city'],
+                        "state": row['state'], "area": row['area'], "created": created_at,
+                        "val_status": status, 
+                        "clean_status": "CLEANED" if status == "VALID" else "FAILED_VALIDATION" if status != "DUPLICATE" else "DUPLICATE_FOUND", 
+                        "missing": ",".join(missing_list) if missing_list else None, 
+                        "invalid": ",".join(invalid_list) if invalid_list else None, 
+                        "duplicate_reason": "Exact match (Phone, Name, Address, City)" if status == "DUPLICATE" else None, 
+                        "processed_at": datetime.now()
+                    })
+                    
+                    if status == "VALID":
+                        master_data_batch.append({
+                            "name": row['name'],
+                            "address": row['address'],
+                            "website": row['website'],
+                            "phone_number": row['phone_number'],
+                            "reviews_count": self.safe_int(row.get('reviews_count', 0)),
+                            "reviews_avg": self.safe_float(row.get('reviews_average', 0.00)),
+                            "category": row['category'],
+                            "subcategory": row['subcategory'],
+                            "city": row['city'],
+                            "state": row['state'],
+                            "area": row['area'],
+                            "created_at": created_at
+                        })
+                        batch_summary["cleaned"] += 1
+            except Exception as row_err:
+                logger.warning(f"Row validation failed (skipping): {str(row_err)[:100]}")
+                continue
+
+        return clean_data_batch, master_data_batch, batch_summary, current_max_id
+
+    def _write_batch(self, conn, clean_data_batch, master_data_batch):
+        # 4. Execute Batch Writes — each INSERT is individually protected
+        if clean_data_batch:
+            try:
+                conn.execute(text("""
+                    INSERT IGNORE INTO validation_raw_google_map 
+                    (raw_id, name, address, website, phone_number, reviews_count, reviews_avg,
+                     category, subcategory, city, state, area, created_at,
+                     validation_status, cleaning_status, missing_fields, invalid_format_fields, duplicate_reason, processed_at)
+                    VALUES (:raw_id, :name, :address, :website, :phone, :reviews, :avg, :cat, :sub, :city, :state, :area, :created,
+                            :val_status, :clean_status, :missing, :invalid, :duplicate_reason, :processed_at)
+                """), clean_data_batch)
+            except Exception as e:
+                logger.warning(f"Clean table batch insert failed (non-fatal): {str(e)[:200]}")
+            
+        if master_data_batch:
+            try:
+                conn.execute(text("""
+                    INSERT IGNORE INTO g_map_master_table 
+                    (name, address, website, phone_number, reviews_count, reviews_avg, category, subcategory, city, state, area, created_at)
+                    VALUES (:name, :address, :website, :phone_number, :reviews_count, :reviews_avg, :category, :subcategory, :city, :state, :area, :created_at)
+                """), master_data_batch)
+            except Exception as e:
+                logger.warning(f"Master table batch insert failed (non-fatal): {str(e)[:200]}")
+
+    def _record_batch(self, batch_summary, last_id):
+        """Aggregate counters + periodic progress line."""
+        self._agg_total += batch_summary['total']
+        self._agg_valid += batch_summary['valid']
+        self._agg_missing += batch_summary['missing']
+        self._agg_dup += batch_summary['duplicate']
+        self._agg_cleaned += batch_summary['cleaned']
+        self._agg_batches += 1
+        
+        # Per-batch detail goes to DEBUG (log file only)
+        logger.debug(f"Quality Cycle Complete: Processed {batch_summary['total']} | Valid: {batch_summary['valid']} | Missing: {batch_summary['missing']} | Dup: {batch_summary['duplicate']} | Master: {batch_summary['cleaned']} | Last ID: {last_id}")
+        
+        # Print summary to console every 50 batches (~100K rows)
+        if self._agg_batches % 50 == 0:
+            logger.info(f"⚡ Validation Progress: {self._agg_total:,} rows | Valid: {self._agg_valid:,} | Missing: {self._agg_missing:,} | Dup: {self._agg_dup:,} | Master: {self._agg_cleaned:,} | Last ID: {last_id}")
+
     def start_pipeline(self):
         """Main loop for the quality assurance and master sync thread. NEVER exits on error."""
         last_id = self.get_last_processed_id()
         logger.info(f"Data Quality Processor Started from ID: {last_id}")
         
+        standby = False
         while not self.shutdown_event.is_set():
+            if self.is_active is not None and not self.is_active():
+                if not standby:
+                    logger.info("Data Quality Processor on standby (not the cluster leader)")
+                standby = True
+                if self.shutdown_event.wait(timeout=10):
+                    break
+                continue
+            if standby:
+                # Another leader may have moved the cursor meanwhile
+                standby = False
+                last_id = self.get_last_processed_id()
+                logger.info(f"Data Quality Processor resumed from ID: {last_id}")
             try:
                 with self.engine.begin() as conn:
                     # READ UNCOMMITTED: prevents locking raw table during read
@@ -575,134 +1424,7 @@ class ValidationQualityProcessor:
                             break
                         continue
 
-                    batch_summary = {
-                        "total": 0, "missing": 0, "valid": 0,
-                        "duplicate": 0, "cleaned": 0
-                    }
-                    
-                    current_max_id = last_id
-                    clean_data_batch = []
-                    master_data_batch = []
-                    batch_rows = []
-                    signatures = set()
-                    
-                    # 2. Process batch — each row is individually protected
-                    for row_obj in rows:
-                        try:
-                            raw_row = row_obj._asdict() if hasattr(row_obj, '_asdict') else row_obj._mapping
-                            norm_row = UniversalNormalizer.normalize_row_full(dict(raw_row))
-                            norm_row['id'] = raw_row['id']
-                            
-                            # Ensure all string fields are safe
-                            for key in ['name', 'address', 'website', 'phone_number', 'category', 'subcategory', 'city', 'state', 'area']:
-                                norm_row[key] = self.safe_str(norm_row.get(key))
-                            norm_row['reviews_count'] = self.safe_int(norm_row.get('reviews_count'))
-                            norm_row['reviews_average'] = self.safe_float(norm_row.get('reviews_average'))
-                            
-                            batch_rows.append(norm_row)
-                            current_max_id = max(current_max_id, norm_row['id'])
-                            
-                            sig = (norm_row['phone_number'], norm_row['name'].lower(), norm_row['address'].lower(), norm_row['city'].lower())
-                            signatures.add(sig)
-                        except Exception as row_err:
-                            # Skip bad row, advance cursor past it
-                            try:
-                                current_max_id = max(current_max_id, raw_row['id'])
-                            except Exception:
-                                pass
-                            logger.warning(f"Row normalization failed (skipping): {str(row_err)[:100]}")
-                            continue
-
-                    # Bulk Duplicate Check
-                    existing_sigs = self.check_duplicates_batch(signatures, conn)
-                    
-                    # Switch back to safe mode for writes
-                    conn.execute(text("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
-
-                    for row in batch_rows:
-                        try:
-                            batch_summary["total"] += 1
-                            
-                            is_structured, is_valid, missing_list, invalid_list, clean_phone = self.validate_row(row)
-                            
-                            sig = (row['phone_number'], row['name'].lower(), row['address'].lower(), row['city'].lower())
-                            is_duplicate = sig in existing_sigs if is_structured else False
-
-                            status = "VALID"
-                            if not is_structured: 
-                                status = "MISSING"
-                                batch_summary["missing"] += 1
-                            elif is_duplicate: 
-                                status = "DUPLICATE"
-                                batch_summary["duplicate"] += 1
-                            elif not is_valid: 
-                                status = "INVALID"
-                            else:
-                                batch_summary["valid"] += 1
-
-                            if status in ["VALID", "MISSING", "INVALID", "DUPLICATE"]:
-                                created_at = row.get('created_at')
-                                if not created_at:
-                                    created_at = datetime.now()
-                                
-                                clean_data_batch.append({
-                                    "raw_id": row['id'], "name": row['name'], "address": row['address'],
-                                    "website": row['website'], "phone": row['phone_number'], 
-                                    "reviews": self.safe_int(row.get('reviews_count', 0)),
-                                    "avg": self.safe_float(row.get('reviews_average', 0.00)),
-                                    "cat": row['category'], "sub": row['subcategory'], "city": row['city'],
-                                    "state": row['state'], "area": row['area'], "created": created_at,
-                                    "val_status": status, 
-                                    "clean_status": "CLEANED" if status == "VALID" else "FAILED_VALIDATION" if status != "DUPLICATE" else "DUPLICATE_FOUND", 
-                                    "missing": ",".join(missing_list) if missing_list else None, 
-                                    "invalid": ",".join(invalid_list) if invalid_list else None, 
-                                    "duplicate_reason": "Exact match (Phone, Name, Address, City)" if status == "DUPLICATE" else None, 
-                                    "processed_at": datetime.now()
-                                })
-                                
-                                if status == "VALID":
-                                    master_data_batch.append({
-                                        "name": row['name'],
-                                        "address": row['address'],
-                                        "website": row['website'],
-                                        "phone_number": row['phone_number'],
-                                        "reviews_count": self.safe_int(row.get('reviews_count', 0)),
-                                        "reviews_avg": self.safe_float(row.get('reviews_average', 0.00)),
-                                        "category": row['category'],
-                                        "subcategory": row['subcategory'],
-                                        "city": row['city'],
-                                        "state": row['state'],
-                                        "area": row['area'],
-                                        "created_at": created_at
-                                    })
-                                    batch_summary["cleaned"] += 1
-                        except Exception as row_err:
-                            logger.warning(f"Row validation failed (skipping): {str(row_err)[:100]}")
-                            continue
-
-                    # 4. Execute Batch Writes — each INSERT is individually protected
-                    if clean_data_batch:
-                        try:
-                            conn.execute(text("""
-                                INSERT IGNORE INTO validation_raw_google_map 
-                                (raw_id, name, address, website, phone_number, reviews_count, reviews_avg,
-                                 category, subcategory, city, state, area, created_at,
-                                 validation_status, cleaning_status, missing_fields, invalid_format_fields, duplicate_reason, processed_at)
-                                VALUES (:raw_id, :name, :address, :website, :phone, :reviews, :avg, :cat, :sub, :city, :state, :area, :created,
-                                        :val_status, :clean_status, :missing, :invalid, :duplicate_reason, :processed_at)
-                            """), clean_data_batch)
-                        except Exception as e:
-                            logger.warning(f"Clean table batch insert failed (non-fatal): {str(e)[:200]}")
-                        
-                    if master_data_batch:
-                        try:
-                            conn.execute(text("""
-                                INSERT IGNORE INTO g_map_master_table 
-                                (name, address, website, phone_number, reviews_count, reviews_avg, category, subcategory, city, state, area, created_at)
-                                VALUES (:name, :address, :website, :phone_number, :reviews_count, :reviews_avg, :category, :subcategory, :city, :state, :area, :created_at)
-                            """), master_data_batch)
-                        except Exception as e:
-                            logger.warning(f"Master table batch insert failed (non-fatal): {str(e)[:200]}")
+                    batch_summary, current_max_id = self.validate_batch(conn, rows, last_id)
 
                 # 5. Finalize batch — ALWAYS advance the cursor
                 batch_summary['last_id'] = current_max_id
@@ -711,31 +1433,93 @@ class ValidationQualityProcessor:
                 last_id = current_max_id
                 self.consecutive_errors = 0  # Reset on success
                 
-                # Aggregate counters for periodic summary
-                self._agg_total += batch_summary['total']
-                self._agg_valid += batch_summary['valid']
-                self._agg_missing += batch_summary['missing']
-                self._agg_dup += batch_summary['duplicate']
-                self._agg_cleaned += batch_summary['cleaned']
-                self._agg_batches += 1
-                
-                # Per-batch detail goes to DEBUG (log file only)
-                logger.debug(f"Quality Cycle Complete: Processed {batch_summary['total']} | Valid: {batch_summary['valid']} | Missing: {batch_summary['missing']} | Dup: {batch_summary['duplicate']} | Master: {batch_summary['cleaned']} | Last ID: {last_id}")
-                
-                # Print summary to console every 50 batches (~100K rows)
-                if self._agg_batches % 50 == 0:
-                    logger.info(f"⚡ Validation Progress: {self._agg_total:,} rows | Valid: {self._agg_valid:,} | Missing: {self._agg_missing:,} | Dup: {self._agg_dup:,} | Master: {self._agg_cleaned:,} | Last ID: {last_id}")
+                self._record_batch(batch_summary, last_id)
+
+            except Exception as e:
+                if self._back_off(e):
+                    break
+
+    def start_range_worker(self, leases):
+        """
+        Partitioned mode (VALIDATION_WORKERS): validate id ranges leased through
+        validation_range_lease, so any number of these loops (threads, processes, nodes)
+        run side by side while last_processed_id stays a contiguous low-watermark.
+        NEVER exits on error.
+        """
+        logger.info(f"Data Quality range worker {leases.owner} started")
+        while not self.shutdown_event.is_set():
+            try:
+                claimed = leases.claim()
+                if claimed is None:
+                    self.consecutive_errors = 0  # Reset on successful idle
+                    if self.shutdown_event.wait(timeout=10):
+                        break
+                    continue
+                start_id, end_id = claimed
+
+                with self.engine.begin() as conn:
+                    conn.execute(text("SET SESSION TRANSACTION ISOLATION LEVEL READ UNCOMMITTED"))
+                    rows = conn.execute(text("""
+                        SELECT id, name, address, website, phone_number, 
+                                reviews_count, reviews_average, category, subcategory, 
+                                city, state, area
+                        FROM raw_google_map_drive_data 
+                        WHERE id BETWEEN :start_id AND :end_id
+                        ORDER BY id ASC
+                    """), {"start_id": start_id, "end_id": end_id}).fetchall()
+                    batch_summary, _ = self.validate_batch(conn, rows, start_id - 1)
+                    # Same transaction as the writes: a range is DONE exactly when its rows are
+                    leases.complete(conn, start_id)
+
+                batch_summary['last_id'] = leases.advance()
+                self.log_validation_batch(batch_summary)
+                self.consecutive_errors = 0  # Reset on success
+                self._record_batch(batch_summary, batch_summary['last_id'])
 
             except Exception as e:
-                self.consecutive_errors += 1
-                backoff = min(self.consecutive_errors * 5, self.max_backoff)
-                msg = str(e)
-                if "[parameters:" in msg:
-                    msg = msg.split("[parameters:")[0] + " [Params hidden]"
-                logger.warning(f"Validation Loop Error (retry in {backoff}s, attempt #{self.consecutive_errors}): {msg[:200]}")
-                if self.shutdown_event.wait(timeout=backoff):
+                if self._back_off(e):
                     break
 
+    def _back_off(self, e):
+        """Log a loop error and sleep with linear backoff. True if shutdown was requested meanwhile."""
+        self.consecutive_errors += 1
+        backoff = min(self.consecutive_errors * 5, self.max_backoff)
+        msg = str(e)
+        if "[parameters:" in msg:
+            msg = msg.split("[parameters:")[0] + " [Params hidden]"
+        logger.warning(f"Validation Loop Error (retry in {backoff}s, attempt #{self.consecutive_errors}): {msg[:200]}")
+        return self.shutdown_event.wait(timeout=backoff)
+
+
+def start_range_validators(engine, shutdown_event, count):
+    """Start `count` partitioned validation threads in this process; returns them."""
+    node = f"{socket.gethostname()}:{os.getpid()}"
+    threads = []
+    for i in range(count):
+        processor = ValidationQualityProcessor(engine, shutdown_event)
+        leases = IdRangeLeases(engine, f"{node}:{i}", span=config.VALIDATION_RANGE_IDS,
+                               lease_seconds=config.VALIDATION_LEASE_SECONDS,
+                               initial_watermark=processor.get_last_processed_id)
+        thread = threading.Thread(target=processor.start_range_worker, args=(leases,),
+                                  name=f"QualityRange-{i}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+def start_validation(engine, shutdown_event, is_active=None):
+    """Orchestrator side of validation per VALIDATION_WORKERS; returns the started threads."""
+    workers = config.VALIDATION_WORKERS
+    if workers > 1:
+        # Ranges are leased through MySQL, so every cluster node takes part (no is_active gate)
+        return start_range_validators(engine, shutdown_event, workers)
+    if workers < 1:
+        logger.info("Validation disabled in this process (VALIDATION_WORKERS=0): run worker_validation.py")
+        return []
+    validator = ValidationQualityProcessor(engine, shutdown_event, is_active=is_active)
+    thread = threading.Thread(target=validator.start_pipeline, name="QualityThread", daemon=True)
+    thread.start()
+    return [thread]
+
 def get_engine():
     return GDriveHighSpeedIngestor()
 
@@ -758,10 +1542,8 @@ def start_background_etl():
     t_scanner = threading.Thread(target=scanner_loop, name="ScannerThread", daemon=True)
     t_scanner.start()
 
-    # Start Validation & Cleaning Thread
-    validator = ValidationQualityProcessor(ingestor.engine, ingestor.shutdown_event)
-    t_validator = threading.Thread(target=validator.start_pipeline, name="QualityThread", daemon=True)
-    t_validator.start()
+    # Start Validation & Cleaning Thread(s)
+    start_validation(ingestor.engine, ingestor.shutdown_event)
 
     return ingestor
 
@@ -108,9 +108,14 @@ CREATE TABLE IF NOT EXISTS raw_clean_google_map_data (
     area VARCHAR(255),
     created_at DATETIME,
 
+    -- Duplicate signature (phone, name, address, city) for the validator's indexed lookup
+    dedup_sig BINARY(16) AS (UNHEX(MD5(CONCAT_WS('|', COALESCE(phone_number, ''), LOWER(TRIM(COALESCE(name, ''))),
+        LOWER(TRIM(COALESCE(address, ''))), LOWER(TRIM(COALESCE(city, ''))))))) VIRTUAL,
+
     -- INDEXES
     UNIQUE INDEX idx_raw_id (raw_id),
-    UNIQUE INDEX idx_composite_dedup (name(100), phone_number, city(50), address(100))
+    UNIQUE INDEX idx_composite_dedup (name(100), phone_number, city(50), address(100)),
+    INDEX idx_clean_dedup_sig (dedup_sig)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- -----------------------------------------------------------------------------
@@ -122,18 +127,26 @@ CREATE TABLE IF NOT EXISTS file_registry (
     filename VARCHAR(500),
     status ENUM('PENDING', 'IN_PROGRESS', 'PROCESSED', 'ERROR') DEFAULT 'PENDING',
     last_processed_row INT DEFAULT 0,
+    last_processed_byte BIGINT DEFAULT 0,
     error_message TEXT,
     file_hash VARCHAR(255),
-    processed_at DATETIME
+    md5_checksum VARCHAR(32),
+    file_size BIGINT,
+    processed_at DATETIME,
+    INDEX idx_file_registry_md5 (md5_checksum, status)
 );
 
 CREATE TABLE IF NOT EXISTS drive_folder_registry (
     folder_id VARCHAR(200) PRIMARY KEY,
     folder_name VARCHAR(500),
+    parent_id VARCHAR(200),
     drive_modified_at VARCHAR(100),
+    folder_modified_at VARCHAR(100),
     csv_count INT DEFAULT 0,
+    child_count INT,
     status ENUM('PENDING', 'SCANNING', 'DONE', 'ERROR') DEFAULT 'PENDING',
-    scanned_at DATETIME
+    scanned_at DATETIME,
+    INDEX idx_folder_parent (parent_id)
 );
 
 CREATE TABLE IF NOT EXISTS etl_metadata (
@@ -151,6 +164,17 @@ CREATE TABLE IF NOT EXISTS data_validation_log (
     timestamp DATETIME
 );
 
+-- Id ranges leased by partitioned validation workers (VALIDATION_WORKERS); DONE rows are
+-- dropped once etl_metadata.last_processed_id moves past them
+CREATE TABLE IF NOT EXISTS validation_range_lease (
+    start_id BIGINT PRIMARY KEY,
+    end_id BIGINT NOT NULL,
+    status ENUM('LEASED', 'DONE') NOT NULL DEFAULT 'LEASED',
+    owner VARCHAR(100),
+    lease_expires DOUBLE,
+    INDEX idx_range_status (status, lease_expires)
+);
+
 CREATE TABLE IF NOT EXISTS etl_dlq (
     id INT AUTO_INCREMENT PRIMARY KEY,
     file_id VARCHAR(255),
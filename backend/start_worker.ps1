@@ -5,8 +5,8 @@ Write-Host "🚀 Starting Celery Worker for Windows..." -ForegroundColor Cyan
 $geventInstalled = pip show gevent
 if ($geventInstalled) {
     Write-Host "✅ Gevent detected. Starting with -P gevent (High Concurrency)..." -ForegroundColor Green
-    celery -A celery_app worker --loglevel=info -P gevent
+    celery -A celery_app worker --loglevel=info -P gevent -Q celery,gdrive_small,gdrive_medium,gdrive_large
 } else {
     Write-Host "⚠️ Gevent not found. Falling back to -P solo (Stable)..." -ForegroundColor Yellow
-    celery -A celery_app worker --loglevel=info -P solo
+    celery -A celery_app worker --loglevel=info -P solo -Q celery,gdrive_small,gdrive_medium,gdrive_large
 }
@@ -1,30 +1,45 @@
 import os
 import csv
+import gzip
 import io
 import logging
 import time
 import random
 import signal
 import hashlib
+import tempfile
+import shutil
+import zipfile
 import threading
+import queue
 import redis
+from collections import deque
 from contextlib import contextmanager
-from sqlalchemy import create_engine, text
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text, bindparam
 from sqlalchemy.exc import OperationalError
 from urllib.parse import quote_plus
-from google.oauth2 import service_account
 from utils.metrics import (
     files_processed, rows_inserted, rows_skipped,
-    processing_time, dlq_entries, active_db_ops, batch_size_hist, error_count
+    processing_time, dlq_entries, active_db_ops, batch_size_hist, error_count,
+    pipeline_stage_items, pipeline_stage_seconds, pipeline_bottleneck, dedup_skipped_duplicates,
+    queue_wait_time, queue_tasks_routed, file_lease_conflicts, download_cache_requests
 )
 from config import config
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
 from celery import shared_task
+from celery.signals import worker_init, worker_process_init, task_prerun
 from dotenv import load_dotenv
 
 from model.normalizer import UniversalNormalizer
+from utils.redis_pool import get_redis
+from utils.db_pool import create_pooled_engine, is_prefork, pool_size_for
+from utils.redis_bloom import RedisBloomFilter
+from utils.drive_rate_limit import acquire_drive_quota
+from utils.redis_lease import LeaseSet
+from utils import drive_service
+from utils.download_cache import download_cache_key, get_download_cache
+from utils.csv_archive import archive_format, is_csv_member
 
 from celery.utils.log import get_task_logger
 
@@ -53,14 +68,62 @@ DATABASE_URI = config.DATABASE_URI
 MAX_FILE_SIZE_MB = config.MAX_FILE_SIZE_MB
 ETL_VERSION = config.ETL_VERSION
 BATCH_SIZE = min(config.BATCH_SIZE, 500)  # Cap at 500 to reduce InnoDB lock window & deadlocks
+BULK_LOAD_BATCH_SIZE = config.BULK_LOAD_BATCH_SIZE
+PIPELINE_QUEUE_DEPTH = config.PIPELINE_QUEUE_DEPTH
+DOWNLOAD_PREFETCH_CHUNKS = config.DOWNLOAD_PREFETCH_CHUNKS
+
+# SECTION 1: Process-scoped SQLAlchemy Engine for Celery Workers
+# One pool per worker process, capped by ETL_DB_CONNECTION_BUDGET (no overflow) so 100 greenlets
+# share a few warm connections instead of handshaking with MySQL on every batch/status update.
+# Outside a worker it holds the full budget; a worker replaces it with one built at its final size.
+def create_etl_engine(pool_size):
+    return create_pooled_engine(
+        DATABASE_URI,
+        pool_size,
+        pool_timeout=config.ETL_DB_POOL_TIMEOUT,
+        pool_recycle=config.ETL_DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        # Client-side opt-in for LOAD DATA LOCAL INFILE (bulk mode); the server must allow it too
+        connect_args={"local_infile": True} if config.RAW_BULK_LOAD else {}
+    )
+
+
+engine = create_etl_engine(config.ETL_DB_CONNECTION_BUDGET)
+
+
+@worker_init.connect
+def size_db_pool(sender=None, **kwargs):
+    """
+    Build the engine at its final size from the worker's -P/-c once they are known
+    (runs before any task and before prefork children fork). Everything in this module
+    reaches the engine through the module global, so rebinding it is enough.
+    """
+    global engine
+    if sender is None:
+        return
+    size = pool_size_for(sender.concurrency, config.ETL_DB_CONNECTION_BUDGET, is_prefork(sender.pool_cls))
+    if size != engine.pool.size():
+        old, engine = engine, create_etl_engine(size)
+        old.dispose()
+    logger.info(f"🔌 ETL DB pool sized to {size} connection(s) per process")
 
-# SECTION 1: Optimized SQLAlchemy Engine (NullPool for Celery Workers)
-# By using NullPool, Celery workers open and close connections per task, preventing connection limit exhaustion
-engine = create_engine(
-    DATABASE_URI,
-    poolclass=NullPool,
-    pool_pre_ping=True
-)
+
+@worker_init.connect
+def warm_drive_client(**kwargs):
+    """Parse the discovery document and fetch a token before the first task (prefork children inherit both)."""
+    if not _SA_FILE_OK:
+        return
+    try:
+        drive_service.discovery_document()
+        drive_service.credentials()
+    except Exception as e:
+        logger.warning(f"⚠️ Drive client warm-up failed (tasks will retry on first use): {e}")
+
+
+@worker_process_init.connect
+def reset_db_pool_after_fork(**kwargs):
+    # Prefork children must never reuse sockets inherited from the parent
+    engine.dispose(close=False)
 
 # Fix 7: Graceful Shutdown
 shutdown_requested = False
@@ -83,40 +146,373 @@ except (OSError, ValueError):
 
 
 def get_service():
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
-        raise FileNotFoundError(f"Service account file not found at: {SERVICE_ACCOUNT_FILE}")
-        
-    creds = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE, scopes=['https://www.googleapis.com/auth/drive.readonly']
-    )
-    return build('drive', 'v3', credentials=creds, cache_discovery=False)
+    """Drive client on the worker process' cached credentials and parsed discovery document."""
+    return drive_service.build_service()
+
+
+class FileTooLargeError(Exception):
+    """Raised when a Drive file exceeds MAX_FILE_SIZE_MB before or during download."""
+    pass
+
+
+class BatchWriteError(Exception):
+    """Raised when a batch could not be committed (non-retryable error or retries exhausted)."""
+    pass
+
+
+class PipelineStats:
+    """
+    Per-file throughput counters for each ingest stage.
+    Busy seconds are summed per stage; the stage with the most busy time is the
+    one limiting the file. Every sample is also exported to Prometheus.
+    """
+    STAGES = ('download', 'normalize', 'dedup', 'insert')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items = dict.fromkeys(self.STAGES, 0)
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+
+    def record(self, stage, items, seconds):
+        with self._lock:
+            self.items[stage] += items
+            self.seconds[stage] += seconds
+        pipeline_stage_items.labels(stage=stage).inc(items)
+        pipeline_stage_seconds.labels(stage=stage).inc(seconds)
+
+    def bottleneck(self):
+        return max(self.STAGES, key=lambda st: self.seconds[st])
+
+    def summary(self):
+        parts = []
+        for st in self.STAGES:
+            secs = self.seconds[st]
+            rate = self.items[st] / secs if secs > 0 else 0.0
+            unit = "B/s" if st == 'download' else "rows/s"
+            parts.append(f"{st} {self.items[st]} in {secs:.2f}s ({rate:,.0f} {unit})")
+        return " | ".join(parts)
+
+
+class _DriveChunkReader(io.RawIOBase):
+    """
+    Pull-based raw stream over MediaIoBaseDownload.
+    Without prefetch only ONE chunk is held in memory: the next chunk is requested
+    from Drive once the reader has consumed the previous one. With `prefetch=N`
+    a download thread stays up to N chunks ahead so network time overlaps parsing.
+    A `sink` (download cache writer) receives every chunk in order and is committed
+    only if the file was read to the end.
+    """
+    def __init__(self, request, chunksize, max_bytes=None, start_byte=0, prefetch=0, stats=None, sink=None):
+        super().__init__()
+        self._sink = sink
+        self._chunk = b""
+        self._incoming = b""
+        self._pos = 0
+        self._done = False
+        self._max_bytes = max_bytes
+        self._stats = stats
+        self.bytes_downloaded = 0
+        self._quota_taken = False
+        self._downloader = MediaIoBaseDownload(self, request, chunksize=chunksize)
+        if start_byte:
+            # Resume: MediaIoBaseDownload builds its Range header from _progress
+            self._downloader._progress = start_byte
+
+        self._prefetch_queue = None
+        self._stop = threading.Event()
+        if prefetch:
+            self._prefetch_queue = queue.Queue(maxsize=prefetch)
+            threading.Thread(target=self._prefetch_loop, name="etl-download", daemon=True).start()
+
+    # MediaIoBaseDownload writes each fetched chunk here
+    def write(self, data):
+        self._incoming = bytes(data)
+        return len(data)
+
+    def readable(self):
+        return True
+
+    def _fetch_next(self):
+        """Download one chunk from Drive and return its bytes."""
+        if not self._quota_taken:
+            # One token per download, not per chunk: a per-chunk charge would cap the whole
+            # fleet at DRIVE_GET_MEDIA_QPS x chunk size of bandwidth
+            acquire_drive_quota("get_media")
+            self._quota_taken = True
+        t0 = time.perf_counter()
+        try:
+            status, self._done = self._downloader.next_chunk()
+        except HttpError as e:
+            # 416 on a resumed download means the checkpoint is already at EOF
+            if getattr(e.resp, 'status', None) == 416 and self._downloader._progress > 0:
+                self._done = True
+                return b""
+            raise
+        chunk, self._incoming = self._incoming, b""
+        self.bytes_downloaded += len(chunk)
+        if self._stats is not None:
+            self._stats.record('download', len(chunk), time.perf_counter() - t0)
+        if self._max_bytes:
+            # Before: Content-Range reports the full size on the first chunk
+            total = getattr(status, 'total_size', None)
+            if total and total > self._max_bytes:
+                raise FileTooLargeError(f"File is {total / 1048576:.1f} MB (limit {self._max_bytes / 1048576:.0f} MB)")
+            # During: guards against servers that do not report a total size
+            if self.bytes_downloaded > self._max_bytes:
+                raise FileTooLargeError(f"Download exceeded {self._max_bytes / 1048576:.0f} MB limit")
+        return chunk
+
+    def _prefetch_put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._prefetch_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _prefetch_loop(self):
+        try:
+            while not self._done and not self._stop.is_set():
+                if not self._prefetch_put(self._fetch_next()):
+                    return
+            self._prefetch_put(None)
+        except BaseException as e:
+            # Re-raised in the reading thread
+            self._prefetch_put(e)
+
+    def _next_chunk(self):
+        """Next chunk of bytes, or None at EOF."""
+        if self._prefetch_queue is None:
+            chunk = None if self._done else self._fetch_next()
+        else:
+            chunk = self._prefetch_queue.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+        if self._sink is not None:
+            if chunk is None:
+                self._sink.commit()
+                self._sink = None
+            else:
+                self._sink.write(chunk)
+        return chunk
+
+    def readinto(self, b):
+        while self._pos >= len(self._chunk):
+            chunk = self._next_chunk()
+            if chunk is None:
+                return 0
+            self._chunk, self._pos = chunk, 0
+        n = min(len(b), len(self._chunk) - self._pos)
+        b[:n] = self._chunk[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if self._sink is not None:  # Stopped before EOF: never publish a partial file
+            self._sink.abort()
+            self._sink = None
+        self._stop.set()
+        super().close()
+
+
+class _CachedFileReader(io.RawIOBase):
+    """Raw stream over a download cache entry, positioned at `start_byte` (no Drive traffic)."""
+    bytes_downloaded = 0
+
+    def __init__(self, f, start_byte=0):
+        super().__init__()
+        self._f = f
+        if start_byte:
+            self._f.seek(start_byte)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._f.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+class _GunzipReader(io.RawIOBase):
+    """Gunzips a .gz download as it streams (multi-member files included); memory stays at one chunk."""
+    def __init__(self, raw):
+        super().__init__()
+        self._raw = raw
+        self._gz = gzip.GzipFile(fileobj=raw, mode='rb')
+
+    @property
+    def bytes_downloaded(self):
+        return self._raw.bytes_downloaded
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._gz.readinto(b)
+
+    def close(self):
+        self._gz.close()
+        self._raw.close()
+        super().close()
+
+
+class DriveCsvStream:
+    """
+    Line iterator over a streaming Drive download, suitable for csv.reader/DictReader.
+    Lines are decoded one at a time so rows reach the caller while later chunks
+    are still on Drive.
+    `resumable=False` (decompressed archives) keeps bytes_consumed at 0: Drive can
+    only range-request the compressed bytes, so those resume by row count instead.
+    """
+    def __init__(self, raw, buffer_size=64 * 1024, start_byte=0, resumable=True):
+        self._raw = raw
+        self._buffered = io.BufferedReader(raw, buffer_size=buffer_size)
+        self.resumable = resumable
+        # Absolute file offset just past the last line handed to the csv reader.
+        # csv.reader never reads ahead of the record it is building, so after each
+        # yielded row this is a safe resume point.
+        self.bytes_consumed = start_byte
+
+    def __iter__(self):
+        readline = self._buffered.readline
+        count = self.resumable
+        while True:
+            line = readline()
+            if not line:
+                return
+            if count:
+                self.bytes_consumed += len(line)
+            yield line.decode('utf-8', errors='replace')
+
+    def parts(self):
+        """CSV documents in this download (each starts with its own header row)."""
+        yield self
+
+    @property
+    def bytes_downloaded(self):
+        return self._raw.bytes_downloaded
+
+    def close(self):
+        self._buffered.close()
+
+
+class ZipCsvStream:
+    """
+    A .zip download, ingested one CSV member at a time. The member index sits at the
+    END of a zip, so the archive is spooled to a temp file (disk, not memory) and each
+    member is then decompressed as it is read.
+    """
+    bytes_consumed = 0  # No byte resume point inside an archive: retries resume by row count
+
+    def __init__(self, raw):
+        self._spool = tempfile.TemporaryFile(prefix="gdrive-zip-")
+        try:
+            shutil.copyfileobj(raw, self._spool, 1024 * 1024)
+            self.bytes_downloaded = raw.bytes_downloaded
+        finally:
+            raw.close()
+        self._zip = zipfile.ZipFile(self._spool)
+
+    def parts(self):
+        for info in self._zip.infolist():
+            if info.is_dir() or not is_csv_member(info.filename):
+                continue
+            part = DriveCsvStream(self._zip.open(info), resumable=False)
+            try:
+                yield part
+            finally:
+                part.close()
+
+    def close(self):
+        self._zip.close()
+        self._spool.close()
+
+
+def csv_records(stream, fieldnames=None):
+    """
+    (header_plan, values) for every row of every part of a download. Headers are
+    resolved ONCE per part (a zip's members each bring their own); `fieldnames`
+    replaces the header of the first part when resuming mid-file.
+    """
+    for part in stream.parts():
+        reader = csv.reader(part)
+        header = fieldnames if fieldnames is not None else next(reader, [])
+        fieldnames = None
+        header_plan = UniversalNormalizer.compile_header_plan(header)
+        for values in reader:
+            yield header_plan, values
 
 
 # Fix 1 + Fix 2: File size protection + Context manager (no memory leak)
 @contextmanager
-def download_csv(service, file_id, max_size_mb=None):
+def download_csv(service, file_id, max_size_mb=None, file_size=None, chunksize=1024*1024, start_byte=0,
+                 prefetch=0, stats=None, cache_key=None, file_name=None):
     """
-    STREAMS a CSV file from Google Drive row-by-row into memory.
-    NO local files, NO temp files, NO ByteIO accumulation of full file.
+    STREAMS a CSV file from Google Drive row-by-row.
+    NO local files, NO temp files, NO BytesIO accumulation of the full file:
+    memory is bounded by one chunk (1MB) plus the line buffer.
+
+    Enforces MAX_FILE_SIZE_MB (0 disables) before the transfer when `file_size`
+    is known from the listing, on the first chunk via Content-Range, and while
+    bytes are being received.
+
+    `start_byte` resumes the transfer from a checkpointed row boundary.
+    `prefetch` keeps up to N chunks downloading ahead of the parser.
+    `cache_key` reads through the local download cache (DOWNLOAD_CACHE_DIR) when enabled.
+    `file_name` ending in .gz / .zip selects streaming decompression (see csv_records);
+    the size limit then applies to the compressed download and `start_byte` must be 0.
     """
-    request = service.files().get_media(fileId=file_id)
-    
-    import io
-    from googleapiclient.http import MediaIoBaseDownload
-    
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request, chunksize=1024*1024) # 1MB chunks
-    
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    
-    fh.seek(0)
-    wrapper = io.TextIOWrapper(fh, encoding='utf-8', errors='replace')
+    limit_mb = MAX_FILE_SIZE_MB if max_size_mb is None else max_size_mb
+    max_bytes = int(limit_mb * 1024 * 1024) if limit_mb else None
+
+    if max_bytes and file_size and int(file_size) > max_bytes:
+        raise FileTooLargeError(f"File is {int(file_size) / 1048576:.1f} MB (limit {limit_mb} MB)")
+
+    cache = get_download_cache() if cache_key else None
+    cached = cache.open(cache_key) if cache else None
+    if cached is not None:
+        download_cache_requests.labels(result='hit').inc()
+        raw = _CachedFileReader(cached, start_byte)
+    else:
+        if cache:
+            download_cache_requests.labels(result='miss').inc()
+        request = service.files().get_media(fileId=file_id)
+        # Only a download from byte 0 holds the whole file
+        sink = cache.writer(cache_key) if cache and not start_byte else None
+        raw = _DriveChunkReader(request, chunksize, max_bytes=max_bytes, start_byte=start_byte,
+                                prefetch=prefetch, stats=stats, sink=sink)
+    fmt = archive_format(file_name)
+    if fmt == 'gzip':
+        stream = DriveCsvStream(_GunzipReader(raw), resumable=False)
+    elif fmt == 'zip':
+        stream = ZipCsvStream(raw)
+    else:
+        stream = DriveCsvStream(raw, start_byte=start_byte)
     try:
-        yield wrapper
+        yield stream
     finally:
-        wrapper.close()
+        stream.close()
+
+
+def read_csv_header(service, file_id, cache_key=None):
+    """Fetch only the header row (first small chunk) of a Drive CSV — used when resuming mid-file."""
+    with download_csv(service, file_id, max_size_mb=0, chunksize=64 * 1024, cache_key=cache_key) as stream:
+        return next(csv.reader(stream), [])
+
+
+def normalize_modified_time(modified_time):
+    """Drive ISO timestamp -> MySQL DATETIME string ('2024-01-01T10:00:00.000Z' -> '2024-01-01 10:00:00')."""
+    if modified_time:
+        modified_time = str(modified_time).strip()
+        if 'T' in modified_time:
+            modified_time = modified_time.replace('T', ' ').replace('Z', '').split('.')[0]
+    return modified_time
 
 
 def get_file_hash(file_id, modified_time):
@@ -126,15 +522,30 @@ def get_file_hash(file_id, modified_time):
 
 # SECTION 3: Batched Insert Optimization (with Deadlock Retry + Rate Limiting)
 
-def commit_batch(batch, task_id=None):
-    """
-    Inserts a BATCH of rows efficiently. 
-    NO deduplication - inserts EVERYTHING as requested.
-    Includes retry logic for transient DB errors.
-    """
-    if not batch:
-        return 0
-    
+RAW_TABLE = "raw_google_map_drive_data"
+
+_INSERT_RAW_SQL = """
+    INSERT IGNORE INTO {table} (
+        name, address, website, phone_number, 
+        reviews_count, reviews_average, 
+        category, subcategory, city, state, area, 
+        drive_file_id, drive_file_name, full_drive_path, 
+        drive_uploaded_time, source,
+        etl_version, task_id, file_hash
+    )
+    VALUES (
+        :name, :address, :website, :phone_number, 
+        :reviews_count, :reviews_average, 
+        :category, :subcategory, :city, :state, :area, 
+        :drive_file_id, :drive_file_name, :drive_file_path, 
+        :drive_uploaded_time, 'google_drive',
+        :etl_version, :task_id, :file_hash
+    )
+"""
+
+
+def prepare_batch(batch, task_id=None):
+    """Sanitizes rows in place and injects lineage fields. Never hits the network."""
     # Sanitize all values before insertion to prevent ANY DB error
     for row in batch:
         row['etl_version'] = ETL_VERSION
@@ -158,66 +569,111 @@ def commit_batch(batch, task_id=None):
             val = row.get(key)
             if val and isinstance(val, str) and len(val) > 500:
                 row[key] = val[:500]
-        
-    sql = text("""
-        INSERT IGNORE INTO raw_google_map_drive_data (
-            name, address, website, phone_number, 
-            reviews_count, reviews_average, 
-            category, subcategory, city, state, area, 
-            drive_file_id, drive_file_name, full_drive_path, 
-            drive_uploaded_time, source,
-            etl_version, task_id, file_hash
-        )
-        VALUES (
-            :name, :address, :website, :phone_number, 
-            :reviews_count, :reviews_average, 
-            :category, :subcategory, :city, :state, :area, 
-            :drive_file_id, :drive_file_name, :drive_file_path, 
-            :drive_uploaded_time, 'google_drive',
-            :etl_version, :task_id, :file_hash
-        )
-    """)
-    
+
     # Inject lineage fields into each row
     for row in batch:
         row.setdefault('etl_version', ETL_VERSION)
         row.setdefault('task_id', task_id)
         row.setdefault('file_hash', '')
-    # All DB operations are wrapped in context managers for resource safety.
+    return batch
 
-    from redis import Redis
-    
-    # 1. Deduplicate using Redis to avoid InnoDB gap-lock deadlocks on INSERT IGNORE
-    # We use a Redis TTL-based key (3 days) to quickly filter out exact duplicates
-    # before they even hit the MySQL database, while keeping RAM usage bounded.
+
+_dedup_filter = None
+_dedup_filter_lock = threading.Lock()
+
+
+def get_dedup_filter():
+    """Process-wide Bloom filter on a pooled Redis client (built once per worker process)."""
+    global _dedup_filter
+    if _dedup_filter is None:
+        with _dedup_filter_lock:
+            if _dedup_filter is None:
+                _dedup_filter = RedisBloomFilter(
+                    get_redis(config.DEDUP_REDIS_URL),
+                    name="gdrive_etl_bloom",
+                    capacity=config.DEDUP_BLOOM_CAPACITY,
+                    error_rate=config.DEDUP_BLOOM_ERROR_RATE,
+                    window_seconds=config.DEDUP_WINDOW_HOURS * 3600,
+                )
+    return _dedup_filter
+
+
+def row_signature(row):
+    """Deterministic identity of a row for cross-file dedup."""
+    return f"{row.get('name', '')}|{row.get('phone_number', '')}|{row.get('address', '')}".lower().strip()
+
+
+_UNIQUE_KEY = ("name", "address", "phone_number")
+
+
+def unique_key(row):
+    return tuple(row.get(col) for col in _UNIQUE_KEY)
+
+
+def find_stored_keys(rows, table=RAW_TABLE):
+    """Unique keys of `rows` already present in `table`, in ONE indexed SELECT ... IN."""
+    keys = list({unique_key(row) for row in rows})
+    if not keys:
+        return set()
+    with engine.connect() as conn:
+        result = conn.execute(
+            text(f"SELECT name, address, phone_number FROM {table} WHERE (name, address, phone_number) IN :keys")
+            .bindparams(bindparam("keys", expanding=True)),
+            {"keys": keys},
+        )
+        return {tuple(r) for r in result}
+
+
+def dedup_batch(batch):
+    """
+    Drops rows that are already committed, in ONE Redis round trip plus at most ONE
+    MySQL lookup. Signatures live in a rotating, fixed-size Bloom filter
+    (DEDUP_BLOOM_CAPACITY / DEDUP_BLOOM_ERROR_RATE), so dedup memory stays bounded
+    and does not crowd broker keys out of an LRU-capped Redis.
+    A Bloom hit may be a false positive, so the "probably seen" rows are confirmed
+    against the raw table's unique key and only exact matches are dropped; rows the
+    filter has never seen go straight to INSERT IGNORE. If either lookup fails the
+    whole batch is kept. The filter is read-only here; see remember_batch.
+    """
+    if not batch:
+        return []
     try:
-        r = Redis.from_url(os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
-        
-        unique_batch = []
-        for row in batch:
-            # Create a unique deterministic identity for the row
-            identity_string = f"{row.get('name', '')}|{row.get('phone_number', '')}|{row.get('address', '')}".lower().strip()
-            row_hash = hashlib.md5(identity_string.encode('utf-8')).hexdigest()
-            redis_key = f"gdrive_etl_dedup:{row_hash}"
-            
-            # Check if this exact row has been processed recently
-            # SET NX EX 259200 sets the key for 3 days, returning True if it was set (meaning it's new)
-            is_new = r.set(redis_key, "1", nx=True, ex=259200)
-            
-            if is_new:
-                unique_batch.append(row)
-            else:
-                # Row is a duplicate, skip it entirely
-                pass
-                
-        # If the entire batch was duplicates, return early
-        if not unique_batch:
-            return 0
-            
+        seen = get_dedup_filter().might_contain_many([row_signature(row) for row in batch])
+        probable = [row for row, hit in zip(batch, seen) if hit]
+        if not probable:
+            return batch
+        stored = find_stored_keys(probable)
     except Exception as e:
-        logger.warning(f"Redis deduplication failed, falling back to MySQL INSERT IGNORE: {e}")
-        unique_batch = batch # Fallback to sending all rows to MySQL if Redis fails
-        
+        logger.warning(f"Dedup pre-screen failed, relying on MySQL INSERT IGNORE: {e}")
+        return batch
+    if not stored:
+        return batch
+    unique = [row for row in batch if unique_key(row) not in stored]
+    dedup_skipped_duplicates.inc(len(batch) - len(unique))
+    return unique
+
+
+def remember_batch(batch):
+    """
+    Records a COMMITTED batch's signatures in the Bloom filter. Called only after
+    write_batch succeeds, so rows of a failed or retried batch are never marked seen.
+    Never throws.
+    """
+    if not batch:
+        return
+    try:
+        get_dedup_filter().add_many([row_signature(row) for row in batch])
+    except Exception as e:
+        logger.warning(f"Redis dedup update failed (filter only, rows are committed): {e}")
+
+
+def insert_batch(unique_batch, table=RAW_TABLE):
+    """
+    INSERT IGNORE a prepared, deduplicated batch with deadlock/connection retry.
+    Raises BatchWriteError when the batch was not committed, so no checkpoint moves past it.
+    """
+    if not unique_batch:
+        return 0
     # Sort the batch by the unique index columns to prevent InnoDB Deadlocks.
     # Concurrent transactions locking index records in the same order avoid deadlocks.
     unique_batch.sort(key=lambda x: (
@@ -232,7 +688,7 @@ def commit_batch(batch, task_id=None):
             with engine.begin() as conn:
                 # Set lock wait timeout per-connection to avoid long hangs
                 conn.execute(text("SET innodb_lock_wait_timeout = 15"))
-                result = conn.execute(sql, unique_batch)
+                result = conn.execute(text(_INSERT_RAW_SQL.format(table=table)), unique_batch)
                 inserted = result.rowcount
                 if inserted > 0:
                     rows_inserted.inc(inserted)
@@ -252,7 +708,7 @@ def commit_batch(batch, task_id=None):
             if "[SQL:" in err_msg:
                 err_msg = err_msg.split("[SQL:")[0].strip()
             logger.error(f"Batch Insert Failed after retries: {err_msg}")
-            return 0
+            raise BatchWriteError(err_msg) from e
         except Exception as e:
             msg = str(e)
             if "[parameters:" in msg:
@@ -260,34 +716,292 @@ def commit_batch(batch, task_id=None):
             if "[SQL:" in msg:
                 msg = msg.split("[SQL:")[0].strip()
             logger.error(f"Batch Insert Failed: {msg}")
-            return 0
-    return 0
+            raise BatchWriteError(msg) from e
+
+
+# SECTION 3a: LOAD DATA LOCAL INFILE bulk mode (RAW_BULK_LOAD=true)
+# Rows are spooled to a local TSV and loaded in one statement; same columns and
+# lineage as the INSERT IGNORE path. Falls back to INSERT IGNORE when the server
+# (or client) has local_infile disabled.
+_BULK_COLUMNS = [
+    ('name', 'name'), ('address', 'address'), ('website', 'website'), ('phone_number', 'phone_number'),
+    ('reviews_count', 'reviews_count'), ('reviews_average', 'reviews_average'),
+    ('category', 'category'), ('subcategory', 'subcategory'), ('city', 'city'), ('state', 'state'), ('area', 'area'),
+    ('drive_file_id', 'drive_file_id'), ('drive_file_name', 'drive_file_name'), ('full_drive_path', 'drive_file_path'),
+    ('drive_uploaded_time', 'drive_uploaded_time'),
+    ('etl_version', 'etl_version'), ('task_id', 'task_id'), ('file_hash', 'file_hash'),
+]
+
+_LOAD_DATA_SQL = """
+    LOAD DATA LOCAL INFILE :path IGNORE INTO TABLE {table}
+    CHARACTER SET utf8mb4
+    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+    LINES TERMINATED BY '\\n'
+    ({columns})
+    SET source = 'google_drive'
+"""
 
+# MySQL error codes meaning "LOCAL INFILE not allowed" (server or client side)
+_LOCAL_INFILE_DISABLED_CODES = {1148, 2068, 3948, 3950}
 
-def update_file_status(file_id, filename, status, error_msg=None, file_hash=None, folder_id=None, row_number=0):
+_bulk_load_available = None  # None = not probed yet in this process
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def _tsv_field(val):
+    if val is None:
+        return '\\N'
+    if isinstance(val, str):
+        return val.translate(_TSV_ESCAPES)
+    return str(val)
+
+
+def write_tsv_rows(fh, rows):
+    """Write prepared rows to `fh` (binary) in LOAD DATA's default TSV escaping."""
+    for row in rows:
+        line = '\t'.join(_tsv_field(row.get(key)) for _, key in _BULK_COLUMNS)
+        fh.write(line.encode('utf-8'))
+        fh.write(b'\n')
+
+
+def bulk_load_enabled():
+    """True when RAW_BULK_LOAD is on and the server accepts LOCAL INFILE (probed once per process)."""
+    global _bulk_load_available
+    if not config.RAW_BULK_LOAD:
+        return False
+    if _bulk_load_available is None:
+        try:
+            with engine.connect() as conn:
+                _bulk_load_available = bool(int(conn.execute(text("SELECT @@GLOBAL.local_infile")).scalar() or 0))
+        except Exception as e:
+            logger.warning(f"Could not probe local_infile, using INSERT IGNORE path: {e}")
+            _bulk_load_available = False
+        if not _bulk_load_available:
+            logger.warning("RAW_BULK_LOAD is on but the server has local_infile=OFF — falling back to INSERT IGNORE")
+    return _bulk_load_available
+
+
+def load_batch_infile(unique_batch, table=RAW_TABLE):
+    """
+    Bulk-load a prepared, deduplicated batch via LOAD DATA LOCAL INFILE ... IGNORE.
+    Raises OperationalError; callers fall back to insert_batch when it is disabled.
+    """
+    global _bulk_load_available
+    if not unique_batch:
+        return 0
+    columns = ", ".join(col for col, _ in _BULK_COLUMNS)
+    sql = text(_LOAD_DATA_SQL.format(table=table, columns=columns))
+    # PyMySQL streams LOCAL INFILE from a path, so the spool is a named temp file
+    spool = tempfile.NamedTemporaryFile(mode='wb', suffix='.tsv', prefix='gdrive_bulk_',
+                                        dir=config.BULK_LOAD_SPOOL_DIR or None, delete=False)
+    try:
+        with spool:
+            write_tsv_rows(spool, unique_batch)
+        with engine.begin() as conn:
+            conn.execute(text("SET innodb_lock_wait_timeout = 15"))
+            inserted = conn.execute(sql, {"path": spool.name}).rowcount
+        if inserted > 0:
+            rows_inserted.inc(inserted)
+        logger.debug(f"Bulk-loaded batch: {inserted} rows.")
+        return inserted
+    except OperationalError as e:
+        code = e.orig.args[0] if getattr(e, 'orig', None) is not None and e.orig.args else None
+        if code in _LOCAL_INFILE_DISABLED_CODES:
+            _bulk_load_available = False
+            logger.warning(f"LOCAL INFILE rejected (MySQL {code}) — switching to INSERT IGNORE path")
+        raise
+    finally:
+        try:
+            os.unlink(spool.name)
+        except OSError:
+            pass
+
+
+def write_batch(unique_batch, table=RAW_TABLE):
+    """Persist a batch: LOAD DATA bulk mode when available, INSERT IGNORE otherwise."""
+    if not unique_batch:
+        return 0
+    if bulk_load_enabled():
+        try:
+            return load_batch_infile(unique_batch, table=table)
+        except OperationalError as e:
+            if _bulk_load_available:
+                # Not a local_infile problem — let the deadlock/connection retry path handle it
+                logger.warning(f"Bulk load failed, retrying batch via INSERT IGNORE: {str(e).split('[SQL:')[0].strip()}")
+    return insert_batch(unique_batch, table=table)
+
+
+def commit_batch(batch, task_id=None):
+    """
+    Inserts a BATCH of rows efficiently: sanitize -> dedup (Bloom + confirming SELECT) -> INSERT IGNORE.
+    Includes retry logic for transient DB errors.
+    """
+    if not batch:
+        return 0
+    prepare_batch(batch, task_id=task_id)
+    batch = dedup_batch(batch)
+    inserted = write_batch(batch)
+    remember_batch(batch)
+    return inserted
+
+
+# SECTION 3b: Staged ingest pipeline inside a single CSV task
+# normalize (caller) -> [queue] -> dedup pre-screen -> [queue] -> MySQL insert + checkpoint
+# Bounded queues give backpressure; download runs ahead via DOWNLOAD_PREFETCH_CHUNKS.
+_STOP = object()
+
+
+class _PipelineStage(threading.Thread):
+    """Consumes batches from `inbox`, applies `func`, forwards results to `outbox`."""
+    def __init__(self, name, func, inbox, outbox, stats, failed):
+        super().__init__(name=f"etl-{name}", daemon=True)
+        self.stage = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stats = stats
+        self.failed = failed
+        self.error = None
+
+    def run(self):
+        while True:
+            item = self.inbox.get()
+            if item is _STOP:
+                break
+            if self.failed.is_set():
+                continue  # Keep draining so upstream never blocks on a full queue
+            try:
+                n = len(item['rows'])
+                t0 = time.perf_counter()
+                out = self.func(item)
+                self.stats.record(self.stage, n, time.perf_counter() - t0)
+            except BaseException as e:
+                self.error = e
+                self.failed.set()
+                continue
+            if self.outbox is not None:
+                self.outbox.put(out)
+        if self.outbox is not None:
+            self.outbox.put(_STOP)
+
+
+class CsvIngestPipeline:
+    """
+    Overlaps Redis dedup and MySQL inserts with download/normalization of the
+    next batches. Batches are committed strictly in order, so the row/byte
+    checkpoint written after each insert is always a safe resume point.
+    """
+    def __init__(self, file_id, task_id, last_row=0, last_byte=0, queue_depth=None):
+        depth = queue_depth or PIPELINE_QUEUE_DEPTH
+        self.file_id = file_id
+        self.task_id = task_id
+        self.stats = PipelineStats()
+        self.failed = threading.Event()
+        self.inserted = 0
+        self.committed_row = last_row
+        self.committed_byte = last_byte
+        self._dedup_q = queue.Queue(maxsize=depth)
+        self._insert_q = queue.Queue(maxsize=depth)
+        self._stages = [
+            _PipelineStage('dedup', self._dedup, self._dedup_q, self._insert_q, self.stats, self.failed),
+            _PipelineStage('insert', self._insert, self._insert_q, None, self.stats, self.failed),
+        ]
+        self._finished = False
+
+    def __enter__(self):
+        for stage in self._stages:
+            stage.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.failed.set()
+        self._join()
+        return False
+
+    def _dedup(self, item):
+        item['rows'] = dedup_batch(item['rows'])
+        return item
+
+    def _insert(self, item):
+        # write_batch raises on failure: the stage stops and the checkpoint stays at the last commit
+        self.inserted += write_batch(item['rows'])
+        remember_batch(item['rows'])
+        update_file_checkpoint(self.file_id, item['end_row'], item['end_byte'])
+        self.committed_row, self.committed_byte = item['end_row'], item['end_byte']
+
+    def submit(self, batch, end_row, end_byte, normalize_seconds=0.0):
+        """Hand a normalized batch to the dedup/insert stages (blocks when they fall behind)."""
+        t0 = time.perf_counter()
+        prepare_batch(batch, task_id=self.task_id)
+        self.stats.record('normalize', len(batch), normalize_seconds + time.perf_counter() - t0)
+        self._dedup_q.put({'rows': batch, 'end_row': end_row, 'end_byte': end_byte})
+        # Cooperative yield: under gevent this lets the stage greenlets issue their I/O now
+        time.sleep(0)
+
+    def _join(self):
+        if self._finished:
+            return
+        self._finished = True
+        self._dedup_q.put(_STOP)
+        for stage in self._stages:
+            stage.join()
+
+    def finish(self):
+        """Flush all queued batches; re-raises the first stage error. Returns rows inserted."""
+        self._join()
+        for stage in self._stages:
+            if stage.error is not None:
+                raise stage.error
+        pipeline_bottleneck.labels(stage=self.stats.bottleneck()).inc()
+        return self.inserted
+
+
+_UPSERT_FILE_STATUS_SQL = """
+    INSERT INTO file_registry (drive_file_id, filename, drive_folder_id, status, error_message, file_hash,
+                               md5_checksum, file_size, last_processed_row, last_processed_byte, processed_at)
+    VALUES (:file_id, :filename, :folder_id, :status, :error_msg, :file_hash,
+            :md5_checksum, :file_size, COALESCE(:row_number, 0), COALESCE(:byte_offset, 0), NOW())
+    ON DUPLICATE KEY UPDATE 
+        status = VALUES(status),
+        error_message = VALUES(error_message),
+        drive_folder_id = COALESCE(VALUES(drive_folder_id), drive_folder_id),
+        file_hash = COALESCE(VALUES(file_hash), file_hash),
+        md5_checksum = COALESCE(VALUES(md5_checksum), md5_checksum),
+        file_size = COALESCE(VALUES(file_size), file_size),
+        last_processed_row = IF(:row_number IS NULL, last_processed_row, VALUES(last_processed_row)),
+        last_processed_byte = IF(:byte_offset IS NULL, last_processed_byte, VALUES(last_processed_byte)),
+        processed_at = NOW()
+"""
+
+
+def _file_status_params(file_id, filename, status, error_msg=None, file_hash=None, folder_id=None, row_number=None, byte_offset=None,
+                        md5_checksum=None, file_size=None):
+    return {
+        "file_id": file_id,
+        "filename": filename,
+        "folder_id": folder_id,
+        "status": status,
+        "error_msg": str(error_msg)[:2000] if error_msg else None,
+        "file_hash": file_hash,
+        "md5_checksum": md5_checksum,
+        "file_size": file_size,
+        "row_number": row_number,
+        "byte_offset": byte_offset
+    }
+
+
+def update_file_status(file_id, filename, status, error_msg=None, file_hash=None, folder_id=None, row_number=None, byte_offset=None,
+                       md5_checksum=None, file_size=None):
     """
     Updates file status and row checkpoint for crash-safe resumption.
+    A row_number/byte_offset of None leaves the stored checkpoint untouched.
     """
     try:
-        sql = text("""
-            INSERT INTO file_registry (drive_file_id, filename, drive_folder_id, status, error_message, file_hash, processed_at)
-            VALUES (:file_id, :filename, :folder_id, :status, :error_msg, :file_hash, NOW())
-            ON DUPLICATE KEY UPDATE 
-                status = VALUES(status),
-                error_message = VALUES(error_message),
-                drive_folder_id = COALESCE(VALUES(drive_folder_id), drive_folder_id),
-                file_hash = COALESCE(VALUES(file_hash), file_hash),
-                processed_at = NOW()
-        """)
         with engine.begin() as conn:
-            conn.execute(sql, {
-                "file_id": file_id,
-                "filename": filename,
-                "folder_id": folder_id,
-                "status": status,
-                "error_msg": str(error_msg)[:2000] if error_msg else None,
-                "file_hash": file_hash
-            })
+            conn.execute(text(_UPSERT_FILE_STATUS_SQL), _file_status_params(
+                file_id, filename, status, error_msg, file_hash, folder_id, row_number, byte_offset,
+                md5_checksum, file_size))
     except Exception as e:
         # Strip verbose SQL from warning message
         msg = str(e)
@@ -295,16 +1009,114 @@ def update_file_status(file_id, filename, status, error_msg=None, file_hash=None
             msg = msg.split("[SQL:")[0].strip()
         logger.warning(f"Checkpoint update failed for {filename}: {msg}")
 
-def get_file_checkpoint(file_id):
-    """Retrieves the processing status for a file."""
+
+def update_files_status(entries):
+    """
+    Bulk variant of update_file_status: one executemany upsert in one transaction.
+    `entries` are dicts of update_file_status keyword arguments. Never throws.
+    """
+    if not entries:
+        return
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(_UPSERT_FILE_STATUS_SQL), [_file_status_params(**e) for e in entries])
+    except Exception as e:
+        msg = str(e)
+        if "[SQL:" in msg:
+            msg = msg.split("[SQL:")[0].strip()
+        logger.warning(f"Bulk status update failed for {len(entries)} files: {msg}")
+
+
+def update_file_checkpoint(file_id, row_number, byte_offset):
+    """Advance the row/byte checkpoint after a committed batch. Never throws."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE file_registry
+                SET last_processed_row = :row_number, last_processed_byte = :byte_offset
+                WHERE drive_file_id = :file_id
+            """), {"file_id": file_id, "row_number": row_number, "byte_offset": byte_offset})
+    except Exception as e:
+        msg = str(e)
+        if "[SQL:" in msg:
+            msg = msg.split("[SQL:")[0].strip()
+        logger.warning(f"Row checkpoint update failed for {file_id}: {msg}")
+
+
+def get_file_checkpoint(file_id, file_hash=None):
+    """
+    Retrieves the processing status and resume point for a file.
+    Returns (status, last_row, last_byte). The checkpoint is only honoured when
+    it was written for the same file revision (`file_hash`).
+    """
+    try:
+        with engine.connect() as conn:
+            res = conn.execute(text("""
+                SELECT status, file_hash, last_processed_row, last_processed_byte
+                FROM file_registry WHERE drive_file_id = :id
+            """), {"id": file_id}).fetchone()
+            if res:
+                if file_hash and res[1] != file_hash:
+                    return res[0], 0, 0
+                return res[0], int(res[2] or 0), int(res[3] or 0)
+            return None, 0, 0
+    except Exception:
+        pass
+    # Checkpoint columns not migrated yet — still honour the status
     try:
         with engine.connect() as conn:
             res = conn.execute(text("SELECT status FROM file_registry WHERE drive_file_id = :id"), {"id": file_id}).fetchone()
             if res:
-                return res[0], 0
+                return res[0], 0, 0
     except Exception:
         pass
-    return None, 0
+    return None, 0, 0
+
+
+def get_files_status(file_ids):
+    """One IN query for many files. Returns {drive_file_id: (status, file_hash)}."""
+    if not file_ids:
+        return {}
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT drive_file_id, status, file_hash FROM file_registry WHERE drive_file_id IN :ids")
+                .bindparams(bindparam("ids", expanding=True)),
+                {"ids": list(file_ids)}
+            ).fetchall()
+        return {r[0]: (r[1], r[2]) for r in rows}
+    except Exception as e:
+        logger.warning(f"Bulk registry lookup failed ({len(file_ids)} files): {e}")
+        return {}
+
+
+def get_processed_checksums(checksums):
+    """
+    Content-level skip: {md5Checksum: drive_file_id} for checksums some file already
+    PROCESSED, whatever its Drive ID (byte-identical re-uploads, touched files).
+    """
+    checksums = [c for c in set(checksums) if c]
+    if not checksums:
+        return {}
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("""
+                    SELECT md5_checksum, MIN(drive_file_id) FROM file_registry
+                    WHERE md5_checksum IN :sums AND status = 'PROCESSED'
+                    GROUP BY md5_checksum
+                """).bindparams(bindparam("sums", expanding=True)),
+                {"sums": checksums}
+            ).fetchall()
+        return {r[0]: r[1] for r in rows}
+    except Exception as e:
+        # Column not migrated yet or DB hiccup — fall back to processing the file
+        logger.debug(f"Checksum lookup failed: {e}")
+        return {}
+
+
+def _duplicate_note(file_id, original_id):
+    return None if original_id == file_id else f"Same content as {original_id}"
 
 
 # Fix 4: Dead Letter Queue
@@ -384,6 +1196,38 @@ def trigger_stats_refresh():
         pass
 
 
+def file_leases(task_id):
+    """Per-file processing leases owned by this task run (None if disabled or not running as a task)."""
+    if not config.ETL_FILE_LEASE or not task_id:
+        return None
+    return LeaseSet(get_redis(), task_id, config.ETL_FILE_LEASE_SECONDS, "etl:file_lease")
+
+
+def claim_file(leases, file_id, file_name):
+    """
+    True if this task may ingest the file: it holds the file's lease (or leasing is
+    off / Redis is down). The lease value is the task id, so a redelivered or retried
+    run of the same task takes its own stale lease back instead of waiting for expiry.
+    """
+    if leases is None:
+        return True
+    try:
+        if leases.acquire(file_id):
+            return True
+        holder = leases.holder(file_id)
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ File lease unavailable for {file_name} ({e}); processing without it")
+        return True
+    file_lease_conflicts.inc()
+    logger.info(f"Skip: {file_name} is being ingested by task {holder}.")
+    return False
+
+
+def release_files(leases):
+    if leases is not None:
+        leases.release_all()
+
+
 # SECTION 4: Main Processing Task (with all fixes applied)
 @shared_task(
     bind=True, 
@@ -394,7 +1238,8 @@ def trigger_stats_refresh():
     retry_backoff_max=60,
     retry_jitter=True
 )
-def process_csv_task(self, file_id, file_name, folder_id, folder_name, path, modified_time):
+def process_csv_task(self, file_id, file_name, folder_id, folder_name, path, modified_time, file_size=None,
+                     md5_checksum=None):
     global shutdown_requested
 
     # Fast-fail: skip all tasks when service account is missing (startup log already announced it)
@@ -406,70 +1251,112 @@ def process_csv_task(self, file_id, file_name, folder_id, folder_name, path, mod
     task_id = self.request.id
     
     # Normalize datetime ONCE — handles all ISO formats safely
-    if modified_time:
-        modified_time = str(modified_time).strip()
-        if 'T' in modified_time:
-            modified_time = modified_time.replace('T', ' ').replace('Z', '').split('.')[0]
+    modified_time = normalize_modified_time(modified_time)
         
     file_hash = get_file_hash(file_id, modified_time or '')
     
     # 1. Check for existing checkpoint (Idempotency Phase 3)
-    status, last_row = get_file_checkpoint(file_id)
+    status, last_row, last_byte = get_file_checkpoint(file_id, file_hash)
     if status == 'PROCESSED':
         logger.debug(f"Skip: {file_name} already fully processed.")
         return f"Skipped processed file: {file_name}"
+
+    # Content-level skip: these exact bytes were already ingested (under this or another Drive ID)
+    if md5_checksum:
+        original_id = get_processed_checksums([md5_checksum]).get(md5_checksum)
+        if original_id:
+            update_file_status(file_id, file_name, 'PROCESSED', _duplicate_note(file_id, original_id),
+                               file_hash=file_hash, folder_id=folder_id, md5_checksum=md5_checksum, file_size=file_size)
+            logger.debug(f"Skip: {file_name} has the same content as {original_id}.")
+            return f"Skipped duplicate content: {file_name}"
+
+    # One task per file at a time: a duplicate (double publish, scanner overlap) exits before downloading
+    leases = file_leases(task_id)
+    if not claim_file(leases, file_id, file_name):
+        return f"Skipped {file_name}: being processed by another task"
     
     try:
         service = get_service()
-        update_file_status(file_id, file_name, 'IN_PROGRESS', row_number=last_row, file_hash=file_hash)
+        update_file_status(file_id, file_name, 'IN_PROGRESS', row_number=last_row, byte_offset=last_byte, file_hash=file_hash,
+                           md5_checksum=md5_checksum, file_size=file_size)
         
-        with download_csv(service, file_id) as stream:
-            reader = csv.DictReader(stream)
-            current_row_idx = 0
+        # Resume from the byte checkpoint: the header is fetched separately, the
+        # body download starts at the first unprocessed row.
+        fieldnames = None
+        start_byte = 0
+        cache_key = download_cache_key(file_id, md5_checksum, modified_time)
+        if last_row and last_byte:
+            fieldnames = read_csv_header(service, file_id, cache_key)
+            start_byte = last_byte
+            logger.info(f"[RESUME] {file_name} from row {last_row} (byte {last_byte})")
+        
+        with CsvIngestPipeline(file_id, task_id, last_row, last_byte) as pipeline, \
+                download_csv(service, file_id, file_size=file_size, start_byte=start_byte,
+                             prefetch=DOWNLOAD_PREFETCH_CHUNKS, stats=pipeline.stats, cache_key=cache_key,
+                             file_name=file_name) as stream:
+            # Headers are resolved ONCE per file (per member of a .zip); rows are then mapped by column index
+            file_meta = {
+                "drive_file_id": file_id, "drive_file_name": file_name,
+                "drive_folder_id": folder_id, "drive_folder_name": folder_name,
+                "drive_file_path": path, "drive_uploaded_time": modified_time
+            }
+            current_row_idx = last_row if start_byte else 0
+            batch_limit = BULK_LOAD_BATCH_SIZE if bulk_load_enabled() else BATCH_SIZE
             batch = []
             row_count = 0
-            skipped_count = 0
-            actual_inserted = 0  # Track true inserts
+            norm_seconds = 0.0
+            # Resume point just past the last row appended to `batch`
+            batch_end_row, batch_end_byte = last_row, last_byte
             
-            for row in reader:
+            for header_plan, values in csv_records(stream, fieldnames):
+                if shutdown_requested or pipeline.failed.is_set():
+                    break
+                if not values:
+                    continue  # Blank line — csv.DictReader skipped these too
+
                 current_row_idx += 1
                 
-                # Resume logic: Skip rows already processed
+                # Legacy resume (no byte checkpoint): skip rows already processed
                 if current_row_idx <= last_row:
                     continue
-
-                if shutdown_requested:
-                    if batch:
-                        actual_inserted += commit_batch(batch, task_id=task_id)
-                    # Only log partial shutdowns to DB
-                    update_file_status(file_id, file_name, 'PARTIAL', 
-                                       error_msg=f"Shutdown at row {row_count}", folder_id=folder_id)
-                    return f"Partial: {file_name} stopped at row {row_count} (Inserted: {actual_inserted})"
+                batch_end_row, batch_end_byte = current_row_idx, stream.bytes_consumed
                 
                 # Normalize — wrapped in try/except to skip bad rows instead of crashing
+                t0 = time.perf_counter()
                 try:
-                    norm_row = UniversalNormalizer.normalize_row_raw({
-                        **row, "drive_file_id": file_id, "drive_file_name": file_name,
-                        "drive_folder_id": folder_id, "drive_folder_name": folder_name,
-                        "drive_file_path": path, "drive_uploaded_time": modified_time
-                    })
+                    norm_row = UniversalNormalizer.normalize_values_raw(values, header_plan, file_meta)
                     norm_row['file_hash'] = file_hash
                     batch.append(norm_row)
                 except Exception as norm_err:
                     logger.warning(f"Row {current_row_idx} normalization failed in {file_name}: {norm_err}")
                     continue
+                finally:
+                    norm_seconds += time.perf_counter() - t0
                 
                 row_count += 1
                 
-                if len(batch) >= BATCH_SIZE:
-                    actual_inserted += commit_batch(batch, task_id=task_id)
-                    batch = []
+                if len(batch) >= batch_limit:
+                    pipeline.submit(batch, batch_end_row, batch_end_byte, norm_seconds)
+                    batch, norm_seconds = [], 0.0
 
             # Remaining rows
             if batch:
-                actual_inserted += commit_batch(batch, task_id=task_id)
+                pipeline.submit(batch, batch_end_row, batch_end_byte, norm_seconds)
+            actual_inserted = pipeline.finish()
+
+        logger.debug(f"[PIPELINE] {file_name} | bottleneck={pipeline.stats.bottleneck()} | {pipeline.stats.summary()}",
+                     extra={'task_id': task_id})
 
-        update_file_status(file_id, file_name, 'PROCESSED', file_hash=file_hash, folder_id=folder_id)
+        if shutdown_requested:
+            # Only log partial shutdowns to DB — resume from the last committed batch
+            update_file_status(file_id, file_name, 'PARTIAL', 
+                               error_msg=f"Shutdown at row {pipeline.committed_row}", folder_id=folder_id,
+                               row_number=pipeline.committed_row, byte_offset=pipeline.committed_byte)
+            return f"Partial: {file_name} stopped at row {pipeline.committed_row} (Inserted: {actual_inserted})"
+
+        update_file_status(file_id, file_name, 'PROCESSED', file_hash=file_hash, folder_id=folder_id,
+                           row_number=batch_end_row, byte_offset=batch_end_byte,
+                           md5_checksum=md5_checksum, file_size=file_size)
         
         elapsed = time.time() - start_time
         processing_time.observe(elapsed)  # Fix 9: Metrics
@@ -508,6 +1395,14 @@ def process_csv_task(self, file_id, file_name, folder_id, folder_name, path, mod
         update_file_status(file_id, file_name, 'ERROR', err_msg, file_hash=file_hash, folder_id=folder_id)
         return f"Failed (no retry): {file_name} — config error"
 
+    except FileTooLargeError as e:
+        # Size limit is permanent for this revision of the file — do NOT retry
+        err_msg = str(e)
+        logger.error("[SIZE LIMIT] %s: %s", file_name, err_msg, extra={'task_id': task_id})
+        update_file_status(file_id, file_name, 'ERROR', err_msg, file_hash=file_hash, folder_id=folder_id)
+        send_to_dlq(file_id, file_name, err_msg, task_id, self.request.retries)
+        return f"Failed (no retry): {file_name} — {err_msg}"
+
     except Exception as e:
         err_msg = str(e)
         logger.error(f"[ERROR] processing {file_name}: {err_msg}", extra={'task_id': task_id})
@@ -519,3 +1414,329 @@ def process_csv_task(self, file_id, file_name, folder_id, folder_name, path, mod
             # Don't raise — file is in DLQ, no more retries
             return f"DLQ: {file_name} after {self.request.retries} retries"
         raise self.retry(exc=e)
+
+    finally:
+        release_files(leases)
+
+
+# SECTION 5: Multi-file task for small CSVs
+# The scanner packs tiny CSVs (by Drive `size`) into one task: one Drive client, one registry
+# lookup, rows coalesced across files into full insert batches and one bulk registry upsert.
+@shared_task(
+    bind=True,
+    max_retries=3,
+    name="tasks.gdrive.process_csv_batch",
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    retry_backoff_max=60,
+    retry_jitter=True
+)
+def process_csv_batch_task(self, files):
+    """
+    `files` is a list of dicts with process_csv_task's keyword arguments.
+    Every file still gets its own PROCESSED/ERROR row in file_registry; a file that
+    fails to download or parse is marked ERROR without failing the rest of the pack.
+    """
+    if not _SA_FILE_OK:
+        logger.debug("Skipping %d packed files — service account not configured", len(files))
+        return f"Skipped {len(files)} files: GDrive credentials not configured"
+
+    leases = file_leases(self.request.id)
+    try:
+        return _ingest_pack(self, files, leases)
+    finally:
+        release_files(leases)
+
+
+def _ingest_pack(task, files, leases):
+    start_time = time.time()
+    task_id = task.request.id
+    batch_limit = BULK_LOAD_BATCH_SIZE if bulk_load_enabled() else BATCH_SIZE
+    known = get_files_status([f['file_id'] for f in files])
+    seen_content = get_processed_checksums([f.get('md5_checksum') for f in files])
+    buffer = []
+    results = []  # file_registry upserts, written together once every row is committed
+    row_count = 0
+    actual_inserted = 0
+    skipped_files = 0
+
+    try:
+        service = get_service()
+        for f in files:
+            if shutdown_requested:
+                break  # Files not reached keep their old registry state and are picked up by the next scan
+            file_id, file_name = f['file_id'], f['file_name']
+            modified_time = normalize_modified_time(f.get('modified_time'))
+            file_hash = get_file_hash(file_id, modified_time or '')
+            status, stored_hash = known.get(file_id, (None, None))
+            if status == 'PROCESSED' and stored_hash == file_hash:
+                skipped_files += 1
+                continue
+
+            md5_checksum = f.get('md5_checksum')
+            entry = {"file_id": file_id, "filename": file_name, "folder_id": f.get('folder_id'), "file_hash": file_hash,
+                     "md5_checksum": md5_checksum, "file_size": f.get('file_size')}
+            # Same bytes already ingested, or packed twice in this task under different IDs
+            if md5_checksum and md5_checksum in seen_content:
+                results.append(dict(entry, status='PROCESSED', error_msg=_duplicate_note(file_id, seen_content[md5_checksum])))
+                skipped_files += 1
+                continue
+            if not claim_file(leases, file_id, file_name):
+                skipped_files += 1
+                continue
+            file_meta = {
+                "drive_file_id": file_id, "drive_file_name": file_name,
+                "drive_folder_id": f.get('folder_id'), "drive_folder_name": f.get('folder_name'),
+                "drive_file_path": f.get('path'), "drive_uploaded_time": modified_time
+            }
+            rows = []
+            current_row_idx = 0
+            try:
+                with download_csv(service, file_id, file_size=f.get('file_size'), file_name=file_name,
+                                  cache_key=download_cache_key(file_id, md5_checksum, modified_time)) as stream:
+                    for header_plan, values in csv_records(stream):
+                        if not values:
+                            continue
+                        current_row_idx += 1
+                        try:
+                            norm_row = UniversalNormalizer.normalize_values_raw(values, header_plan, file_meta)
+                        except Exception as norm_err:
+                            logger.warning(f"Row {current_row_idx} normalization failed in {file_name}: {norm_err}")
+                            continue
+                        norm_row['file_hash'] = file_hash
+                        rows.append(norm_row)
+            except Exception as e:
+                # One bad file must not sink the whole pack
+                logger.warning(f"[PACK] {file_name} failed: {e}", extra={'task_id': task_id})
+                results.append(dict(entry, status='ERROR', error_msg=str(e)))
+                continue
+
+            if md5_checksum:
+                seen_content[md5_checksum] = file_id
+            row_count += len(rows)
+            buffer.extend(rows)
+            results.append(dict(entry, status='PROCESSED', row_number=current_row_idx, byte_offset=stream.bytes_consumed))
+            while len(buffer) >= batch_limit:
+                actual_inserted += commit_batch(buffer[:batch_limit], task_id=task_id)
+                del buffer[:batch_limit]
+
+        actual_inserted += commit_batch(buffer, task_id=task_id)
+
+    except Exception as e:
+        err_msg = str(e)
+        logger.error(f"[ERROR] processing pack of {len(files)} files: {err_msg}", extra={'task_id': task_id})
+        if task.request.retries >= task.max_retries:
+            # Give every file its own task so each gets its own retries and DLQ entry
+            release_files(leases)  # ...which must not find the files still leased by this pack
+            for f in files:
+                dispatch_csv(f)
+            return f"Split pack of {len(files)} files after {task.request.retries} retries"
+        raise task.retry(exc=e)
+
+    update_files_status(results)
+    done = sum(1 for r in results if r['status'] == 'PROCESSED')
+    files_processed.inc(done)
+
+    try:
+        r = redis.Redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0'))
+        total_files = r.incrby('celery_files_processed', done)
+        total_rows = r.incrby('celery_rows_inserted', actual_inserted)
+        if done and total_files % 50 < done:
+            logger.info(f"⚡ Progress: {total_files} files done | {total_rows} REAL rows inserted")
+    except Exception:
+        pass
+
+    elapsed = time.time() - start_time
+    logger.debug(
+        f"✅ [PACK] {done}/{len(files)} files | Skipped: {skipped_files} | Read: {row_count} | "
+        f"Actual Inserts: {actual_inserted} | Time: {elapsed:.2f}s",
+        extra={'task_id': task_id}
+    )
+    trigger_stats_refresh()
+    return f"Processed pack: {done}/{len(files)} files, {row_count} read, {actual_inserted} inserted"
+
+
+# SECTION 7: Size-aware queue routing
+# Files are routed by Drive size so one multi-GB CSV only ever holds a `gdrive_large` slot
+# while small files keep flowing through their own workers (see ecosystem.config.js).
+QUEUE_SMALL, QUEUE_MEDIUM, QUEUE_LARGE = "gdrive_small", "gdrive_medium", "gdrive_large"
+ETL_QUEUES = (QUEUE_SMALL, QUEUE_MEDIUM, QUEUE_LARGE)
+_QUEUE_TIME_LIMITS = {
+    QUEUE_SMALL: config.ETL_SMALL_TIME_LIMIT,
+    QUEUE_MEDIUM: config.ETL_MEDIUM_TIME_LIMIT,
+    QUEUE_LARGE: config.ETL_LARGE_TIME_LIMIT,
+}
+
+
+def queue_for_size(file_size):
+    """Drive size in bytes -> queue name. Unknown sizes go to the medium queue."""
+    if file_size is None:
+        return QUEUE_MEDIUM
+    if file_size >= config.ETL_LARGE_FILE_MB * 1024 * 1024:
+        return QUEUE_LARGE
+    if file_size >= config.ETL_MEDIUM_FILE_MB * 1024 * 1024:
+        return QUEUE_MEDIUM
+    return QUEUE_SMALL
+
+
+def _publish_options(queue_name, task_kwargs):
+    """apply_async options for an ETL task bound for `queue_name`."""
+    if not config.ETL_QUEUE_ROUTING:
+        return {"kwargs": task_kwargs}
+    hard = _QUEUE_TIME_LIMITS[queue_name]
+    queue_tasks_routed.labels(queue=queue_name).inc()
+    return dict(
+        kwargs=task_kwargs,
+        queue=queue_name,
+        time_limit=hard,
+        soft_time_limit=int(hard * 0.9),
+        headers={"etl_enqueued_at": time.time(), "etl_queue": queue_name},
+    )
+
+
+def _publish(task, queue_name, **task_kwargs):
+    return task.apply_async(**_publish_options(queue_name, task_kwargs))
+
+
+def dispatch_csv(task_kwargs):
+    """Publish one process_csv_task to the queue matching its file size."""
+    return _publish(process_csv_task, queue_for_size(task_kwargs.get('file_size')), **task_kwargs)
+
+
+def dispatch_csv_pack(files):
+    """Publish a pack of small files as one process_csv_batch_task (always the small queue)."""
+    return _publish(process_csv_batch_task, QUEUE_SMALL, files=files)
+
+
+class TaskPublisher:
+    """
+    Bulk task publication for the scanner. Messages are buffered and sent once
+    ETL_PUBLISH_BATCH of them are waiting or ETL_PUBLISH_FLUSH_SECONDS have passed (a
+    timer flushes a buffer that stops growing): one producer checkout and one broker
+    connection per batch instead of one of each per file. Batches go out one at a time,
+    in the order their messages were added. flush() raises if the broker is
+    unreachable; messages that were not sent stay buffered for the next flush.
+    after_sent() defers work (marking source folders done) until every message added
+    so far has reached the broker, without forcing a flush.
+    With `backpressure`, each batch first waits until the broker is keeping up.
+    Thread-safe (scanner threads share one publisher).
+    """
+    def __init__(self, max_messages=None, max_delay=None, backpressure=None):
+        self.backpressure = backpressure
+        self.max_messages = max(1, max_messages or config.ETL_PUBLISH_BATCH)
+        self.max_delay = config.ETL_PUBLISH_FLUSH_SECONDS if max_delay is None else max_delay
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._buffer = []
+        self._first_at = 0.0
+        self._timer = None
+        self._added = 0
+        self._waiting = deque()  # (messages added before it, callback)
+        self.published = 0
+
+    def dispatch_csv(self, task_kwargs):
+        self.add(process_csv_task, queue_for_size(task_kwargs.get('file_size')), task_kwargs)
+
+    def dispatch_csv_pack(self, files):
+        self.add(process_csv_batch_task, QUEUE_SMALL, {"files": files})
+
+    def add(self, task, queue_name, task_kwargs):
+        with self._lock:
+            if not self._buffer:
+                self._first_at = time.monotonic()
+                self._arm_timer(self.max_delay)
+            self._buffer.append((task, _publish_options(queue_name, task_kwargs)))
+            self._added += 1
+            if len(self._buffer) < self.max_messages and time.monotonic() - self._first_at < self.max_delay:
+                return
+        self.flush()
+
+    def flush(self):
+        # Taking and sending under one lock keeps batches in order: `published` is then
+        # a watermark (every message added before it has been sent), which after_sent relies on
+        with self._send_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            self._send(batch)
+        self._run_ready()
+
+    def after_sent(self, callback):
+        """Runs `callback` once every message added so far has been sent (right away if none is pending)."""
+        with self._lock:
+            if self.published < self._added:
+                self._waiting.append((self._added, callback))
+                return
+        callback()
+
+    def _run_ready(self):
+        with self._lock:
+            ready = []
+            while self._waiting and self._waiting[0][0] <= self.published:
+                ready.append(self._waiting.popleft()[1])
+        for callback in ready:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Post-publish callback failed: {e}")
+
+    def _arm_timer(self, delay):
+        """Caller holds the lock. One timer at a time; it sends the buffer once its oldest message is due."""
+        if self._timer is not None or delay <= 0:
+            return
+        self._timer = threading.Timer(delay, self._flush_due)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_due(self):
+        with self._lock:
+            self._timer = None
+            if not self._buffer:
+                return
+            remaining = self.max_delay - (time.monotonic() - self._first_at)
+            if remaining > 0:
+                # Sent and refilled since this timer was armed
+                self._arm_timer(remaining)
+                return
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Timed publish of ETL tasks failed, kept for the next flush: {e}")
+
+    def _send(self, batch):
+        if not batch:
+            return
+        if self.backpressure is not None:
+            self.backpressure.wait()
+        t0 = time.perf_counter()
+        sent = 0
+        try:
+            with batch[0][0].app.producer_or_acquire() as producer:
+                for task, options in batch:
+                    task.apply_async(producer=producer, **options)
+                    sent += 1
+        except Exception:
+            # Put back what never reached the broker, ahead of anything buffered since
+            with self._lock:
+                if not self._buffer:
+                    self._first_at = time.monotonic()
+                self._buffer[:0] = batch[sent:]
+                self._arm_timer(self.max_delay)
+                self.published += sent
+            raise
+        with self._lock:
+            self.published += sent
+        logger.debug(f"📤 Published {len(batch)} ETL tasks in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+@task_prerun.connect
+def observe_queue_wait(sender=None, task=None, **kwargs):
+    """Queue latency: publish -> worker start, for first attempts of routed ETL tasks."""
+    try:
+        req = task.request
+        enqueued_at = getattr(req, 'etl_enqueued_at', None)
+        if enqueued_at is None or req.retries:
+            return  # Not routed, or a retry whose wait includes the backoff
+        queue_wait_time.labels(queue=getattr(req, 'etl_queue', None) or 'unknown').observe(
+            max(0.0, time.time() - float(enqueued_at)))
+    except Exception:
+        pass
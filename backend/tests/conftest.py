@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Allow the test suite to import config.py without a local backend/.env
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("DB_PORT", "3306")
+# Drive calls in tests hit fakes, not the shared Redis token buckets / file leases
+os.environ.setdefault("DRIVE_RATE_LIMIT", "false")
+os.environ.setdefault("ETL_FILE_LEASE", "false")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+
+from utils.backpressure import BrokerBackpressure
+
+
+class FakeBroker:
+    """Just enough Redis for sample(): LLEN/LINDEX over a pipeline plus INFO memory."""
+    def __init__(self):
+        self.queues = {}
+        self.used_memory, self.maxmemory = 0, 1000
+
+    def pipeline(self, transaction=False):
+        broker, calls = self, []
+
+        class Pipe:
+            def llen(self, name):
+                calls.append(len(broker.queues.get(name, [])))
+
+            def lindex(self, name, index):
+                items = broker.queues.get(name, [])
+                calls.append(items[index] if items else None)
+
+            def execute(self):
+                return calls
+        return Pipe()
+
+    def info(self, section):
+        return {"used_memory": self.used_memory, "maxmemory": self.maxmemory}
+
+
+def _message(enqueued_at):
+    return json.dumps({"body": "", "headers": {"etl_enqueued_at": enqueued_at, "etl_queue": "gdrive_small"}})
+
+
+def test_hysteresis_between_high_and_low_water_marks(monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("utils.backpressure.time.time", lambda: now)
+    broker = FakeBroker()
+    bp = BrokerBackpressure(broker, ["gdrive_small", "gdrive_large"], queue_high=10, queue_low=4,
+                            mem_high=0.8, mem_low=0.5, lag_high=600, lag_low=60, poll_seconds=0)
+
+    broker.queues["gdrive_small"] = [_message(now - 5)] * 6
+    assert not bp.check()
+    broker.queues["gdrive_large"] = [_message(now - 30)] * 5   # 11 queued
+    assert bp.check() and bp.reason == "queue_depth=11"
+    broker.queues["gdrive_large"] = []                          # 6 queued: below high, above low
+    assert bp.check()
+    broker.queues["gdrive_small"] = [_message(now - 5)] * 3
+    assert not bp.check()
+
+    broker.used_memory = 900
+    assert bp.check() and "redis_memory=0.90" in bp.reason
+    broker.used_memory = 100
+    broker.queues["gdrive_small"] = [_message(now - 700)]       # oldest task waited too long
+    assert bp.check() and "worker_lag" in bp.reason
+
+
+def test_wait_returns_on_resume_or_stop():
+    broker = FakeBroker()
+    broker.used_memory = 950
+    stop = threading.Event()
+    bp = BrokerBackpressure(broker, ["q"], 10, 4, 0.8, 0.5, 600, 60, poll_seconds=0.01, stop_event=stop)
+    threading.Timer(0.05, lambda: setattr(broker, "used_memory", 100)).start()
+    assert bp.wait() > 0
+    assert not bp.throttled
+
+    broker.used_memory = 950
+    time.sleep(0.02)  # past the cached sample
+    threading.Timer(0.05, stop.set).start()
+    assert bp.wait() > 0 and bp.throttled
+
+
+def test_fails_open_when_redis_errors():
+    class Down:
+        def pipeline(self, transaction=False):
+            raise ConnectionError("redis down")
+
+    bp = BrokerBackpressure(Down(), ["q"], 10, 4, 0.8, 0.5, 600, 60, poll_seconds=0)
+    assert bp.wait() == 0.0
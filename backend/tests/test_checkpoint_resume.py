@@ -0,0 +1,151 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from tasks.gdrive_task import etl_tasks
+from test_drive_stream import FakeDownloader, FakeService, _csv_bytes
+
+ROWS = 1234
+TASK_KWARGS = dict(file_id="f1", file_name="shops.csv", folder_id="d1", folder_name="D", path="/D/shops.csv",
+                   modified_time="2024-01-01T00:00:00Z")
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """file_registry in sqlite behind the real checkpoint reads/writes; INSERT batches are recorded."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'registry.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE file_registry (drive_file_id VARCHAR(100) PRIMARY KEY, file_name TEXT, status VARCHAR(20),
+                file_hash VARCHAR(64), last_processed_row INTEGER DEFAULT 0, last_processed_byte BIGINT DEFAULT 0)
+        """))
+
+    def update_file_status(file_id, filename, status, error_msg=None, file_hash=None, folder_id=None,
+                           row_number=None, byte_offset=None, **kwargs):
+        # The MySQL upsert: a None checkpoint or hash leaves the stored value alone
+        with engine.begin() as conn:
+            conn.execute(text("INSERT OR IGNORE INTO file_registry (drive_file_id, file_name) VALUES (:id, :name)"),
+                         {"id": file_id, "name": filename})
+            conn.execute(text("""
+                UPDATE file_registry SET status = :status, file_hash = COALESCE(:hash, file_hash),
+                    last_processed_row = COALESCE(:row, last_processed_row),
+                    last_processed_byte = COALESCE(:byte, last_processed_byte)
+                WHERE drive_file_id = :id
+            """), {"id": file_id, "status": status, "hash": file_hash, "row": row_number, "byte": byte_offset})
+
+    written = []
+
+    def write_batch(rows):
+        written.append([r["name"] for r in rows])
+        return len(rows)
+
+    monkeypatch.setattr(etl_tasks, "engine", engine)
+    monkeypatch.setattr(etl_tasks, "update_file_status", update_file_status)
+    monkeypatch.setattr(etl_tasks, "write_batch", write_batch)
+    monkeypatch.setattr(etl_tasks, "dedup_batch", lambda rows: rows)
+    monkeypatch.setattr(etl_tasks, "remember_batch", lambda rows: None)
+    monkeypatch.setattr(etl_tasks, "bulk_load_enabled", lambda: False)
+    monkeypatch.setattr(etl_tasks, "trigger_stats_refresh", lambda: None)
+    monkeypatch.setattr(etl_tasks, "BATCH_SIZE", 100)
+    monkeypatch.setattr(etl_tasks, "_SA_FILE_OK", True)
+    monkeypatch.setattr(etl_tasks, "MediaIoBaseDownload", FakeDownloader)
+    monkeypatch.setattr(etl_tasks, "get_service", lambda: FakeService(_csv_bytes(ROWS)))
+
+    class Registry:
+        def seed(self, file_hash, row, byte):
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO file_registry (drive_file_id, file_name, status, file_hash, last_processed_row,
+                        last_processed_byte) VALUES ('f1', 'shops.csv', 'PARTIAL', :hash, :row, :byte)
+                """), {"hash": file_hash, "row": row, "byte": byte})
+
+        def row(self):
+            with engine.connect() as conn:
+                return tuple(conn.execute(text("""
+                    SELECT status, last_processed_row, last_processed_byte FROM file_registry WHERE drive_file_id = 'f1'
+                """)).fetchone())
+
+    reg = Registry()
+    reg.written = written
+    reg.file_hash = etl_tasks.get_file_hash("f1", etl_tasks.normalize_modified_time(TASK_KWARGS["modified_time"]))
+    return reg
+
+
+def _names(start, stop):
+    return [f"Shop {i}" for i in range(start, stop)]
+
+
+def _flatten(batches):
+    return [name for batch in batches for name in batch]
+
+
+def test_failed_batch_retries_from_last_commit_without_duplicates_or_gaps(registry, monkeypatch):
+    write_batch = etl_tasks.write_batch
+    checkpoints = []
+    failed = []
+
+    def flaky_write(rows):
+        if len(registry.written) == 4 and not failed:
+            failed.append(rows[0]["name"])
+            raise etl_tasks.BatchWriteError("Lost connection to MySQL server during query")
+        return write_batch(rows)
+
+    def tracking_checkpoint(file_id, row, byte, _real=etl_tasks.update_file_checkpoint):
+        checkpoints.append(row)
+        _real(file_id, row, byte)
+
+    monkeypatch.setattr(etl_tasks, "write_batch", flaky_write)
+    monkeypatch.setattr(etl_tasks, "update_file_checkpoint", tracking_checkpoint)
+
+    result = etl_tasks.process_csv_task.apply(kwargs=TASK_KWARGS)
+
+    # The fifth batch failed once: the retry resumed at row 401, not after the lost batch
+    assert failed == ["Shop 400"]
+    assert registry.written[4][0] == "Shop 400"
+    assert _flatten(registry.written) == _names(0, ROWS)
+    assert checkpoints[:5] == [100, 200, 300, 400, 500]
+    assert registry.row() == ("PROCESSED", ROWS, len(_csv_bytes(ROWS)))
+    assert result.successful()
+
+
+def test_resume_from_stored_row_and_byte_offset(registry):
+    registry.seed(registry.file_hash, 500, len(_csv_bytes(500)))
+
+    etl_tasks.process_csv_task.apply(kwargs=TASK_KWARGS)
+
+    assert _flatten(registry.written) == _names(500, ROWS)
+    assert registry.written[0] == _names(500, 600)
+    assert registry.row() == ("PROCESSED", ROWS, len(_csv_bytes(ROWS)))
+
+
+def test_checkpoint_for_another_revision_is_ignored(registry):
+    registry.seed("hash-of-an-older-revision", 500, len(_csv_bytes(500)))
+
+    etl_tasks.process_csv_task.apply(kwargs=TASK_KWARGS)
+
+    assert _flatten(registry.written) == _names(0, ROWS)
+    assert registry.row() == ("PROCESSED", ROWS, len(_csv_bytes(ROWS)))
+
+
+def test_partial_run_then_resume_reads_every_row_once(registry, monkeypatch):
+    write_batch = etl_tasks.write_batch
+
+    def stop_after_three(rows):
+        inserted = write_batch(rows)
+        if len(registry.written) == 3:
+            monkeypatch.setattr(etl_tasks, "shutdown_requested", True)
+        return inserted
+
+    monkeypatch.setattr(etl_tasks, "write_batch", stop_after_three)
+    first = etl_tasks.process_csv_task.apply(kwargs=TASK_KWARGS).result
+    status, row, byte = registry.row()
+    assert first.startswith("Partial") and status == "PARTIAL"
+    # Batches already queued behind the shutdown still commit; the checkpoint covers exactly those
+    assert row == len(_flatten(registry.written)) and row % 100 == 0
+    assert byte == len(_csv_bytes(row))
+
+    monkeypatch.setattr(etl_tasks, "shutdown_requested", False)
+    monkeypatch.setattr(etl_tasks, "write_batch", write_batch)
+    etl_tasks.process_csv_task.apply(kwargs=TASK_KWARGS)
+
+    assert _flatten(registry.written) == _names(0, ROWS)
+    assert registry.row() == ("PROCESSED", ROWS, len(_csv_bytes(ROWS)))
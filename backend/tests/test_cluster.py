@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from model import robust_gdrive_etl_v2 as etl_v2
+from utils.cluster import ClusterMembership, HashRing
+
+
+def test_hash_ring_spreads_keys_and_moves_few_on_membership_change():
+    keys = [f"folder-{i}" for i in range(3000)]
+    three = HashRing(["a", "b", "c"])
+    owners = [three.owner(k) for k in keys]
+    assert all(owners.count(n) > 600 for n in "abc")
+
+    two = HashRing(["a", "b"])  # c died
+    moved = [k for k, o in zip(keys, owners) if two.owner(k) != o]
+    # Only c's keys move, and they are spread over the survivors
+    assert all(three.owner(k) == "c" for k in moved)
+    assert len(moved) == owners.count("c")
+
+
+def test_leader_election_and_failover():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    a = ClusterMembership(fakeredis.FakeRedis(server=server), lease_seconds=1, node_id="a")
+    b = ClusterMembership(fakeredis.FakeRedis(server=server), lease_seconds=1, node_id="b")
+
+    a.heartbeat()
+    b.heartbeat()
+    assert a.is_leader and not b.is_leader
+    assert a.members() == b.members() == ["a", "b"]
+
+    a.leave()  # clean shutdown: no waiting for the lease
+    b.heartbeat()
+    assert b.is_leader and b.members() == ["b"]
+
+    # A crashed leader (no heartbeat) is replaced once its lease expires
+    a.heartbeat()
+    time.sleep(1.1)  # b stops heartbeating
+    a.heartbeat()
+    assert a.is_leader and a.members() == ["a"]
+
+
+def test_rebalance_walks_only_folders_taken_over(monkeypatch):
+    ing = etl_v2.GDriveHighSpeedIngestor.__new__(etl_v2.GDriveHighSpeedIngestor)
+    members = ["n1", "n2"]
+    ing.cluster = type("C", (), {"node_id": "n1", "is_leader": False, "members": lambda self: list(members)})()
+    ing.cluster_members, ing.owned_folder_ids = None, set()
+    tops = [{'id': f"top{i}", 'name': f"top{i}", 'mimeType': 'application/vnd.google-apps.folder'} for i in range(40)]
+    ing.top_level_folders = lambda: tops
+    walked = []
+    ing.walk_tree = lambda roots, path: walked.append({r[0] for r in roots})
+    ing.flush_dispatch = lambda: None
+
+    owned = ing.take_shard(tops)
+    assert 0 < len(owned) < 40
+    ing.rebalance()
+    assert walked == []  # membership unchanged
+
+    members.remove("n2")
+    ing.rebalance()
+    assert walked == [{f['id'] for f in tops} - {f['id'] for f in owned}]
+    assert len(ing.owned_folder_ids) == 40
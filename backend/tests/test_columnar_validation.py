@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from model.robust_gdrive_etl_v2 import ValidationQualityProcessor
+
+COLUMNS = ("id", "name", "address", "website", "phone_number", "reviews_count", "reviews_average",
+           "category", "subcategory", "city", "state", "area")
+
+TRICKY = [
+    # name, address, website, phone, reviews_count, reviews_average, category, subcategory, city, state, area
+    ("Cafe One", "1 Main St", "https://www.cafe.com/", "+91 98765 43210", 12, 4.5, "Cafe", "Coffee", "Pune", "mh", "Camp"),
+    ("  Cafe   One ", " 1 Main St", "cafe.com", "9876543210", "12 reviews", "4.5", "Cafe", "", "PUNE", "Maharashtra", None),
+    (None, "2 Side Rd", "nowebsite", "12345", None, None, "Shop", None, "Surat", "GJ", "nan"),
+    ("nan", "None", "NaN", "NaT", "", "", "none", "nat", "Nat", "nan", ""),
+    ("ｎａｎ", "Ｍａｉｎ Road", "WWW.Example.IN//", "०९८७६५४३२१", "१२", "४.५", "Ｃａｆｅ", "x y", "दिल्ली", "दिल्ली", "\tArea\n"),
+    ("Shop", "Addr", "", "98765432109876543210", "0", "0.00001", "Cat", "Sub", "City", "Tamil Nadu", "A"),
+    ("Shop", "Addr", "http://a.b", "98-76-54-32-10", -5, "-3.5", "Cat", "Sub", "City", "u.p.", "A"),
+    ("Shop", "Addr", "x.y", 9876543210, 7, "123456789012345678901234", "Cat", "Sub", "City", 42, "A"),
+    ("Shop", "Addr", "x.y", "98765", 7, "1e5", "Cat", "Sub", "City", "Kerala", 0),
+    ("Known Dup", "9 Old Rd", "dup.com", "9000000000", 1, 1.0, "Cat", "Sub", "Mumbai", "mh", "A"),
+    ("Known Dup", "9 Old Rd", "dup.com", "", 1, 1.0, "Cat", "Sub", "Mumbai", "mh", "A"),
+]
+
+
+class FakeConn:
+    def __init__(self, stored):
+        self.stored = stored
+
+    def execute(self, query, params=None):
+        if "dedup_sig IN" in str(query):
+            return [(h,) for h in params["sigs"] if h in self.stored]
+        return []
+
+
+@pytest.fixture
+def rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'raw.db'}")
+    with engine.begin() as conn:
+        # No declared types: sqlite keeps every value exactly as inserted (str, int, float or NULL)
+        conn.execute(text(f"CREATE TABLE raw ({', '.join(COLUMNS)})"))
+        for i, values in enumerate(TRICKY, start=100):
+            conn.execute(text(f"INSERT INTO raw VALUES ({', '.join(':' + c for c in COLUMNS)})"),
+                         dict(zip(COLUMNS, (i,) + values)))
+        return conn.execute(text(f"SELECT {', '.join(COLUMNS)} FROM raw ORDER BY id")).fetchall()
+
+
+def _without_timestamps(params):
+    return [{k: v for k, v in p.items() if k not in ("created", "processed_at", "created_at")} for p in params]
+
+
+def test_columnar_path_matches_row_by_row(rows):
+    processor = ValidationQualityProcessor(engine=None, shutdown_event=None)
+    stored = {processor.signature_hash(("9000000000", "known dup", "9 old rd", "mumbai"))}
+
+    by_row = processor._prepare_rows(FakeConn(stored), rows, 0)
+    columnar = processor._prepare_columnar(FakeConn(stored), rows, 0)
+
+    clean_rows, master_rows, summary_rows, max_rows = by_row
+    clean_cols, master_cols, summary_cols, max_cols = columnar
+    assert _without_timestamps(clean_cols) == _without_timestamps(clean_rows)
+    assert _without_timestamps(master_cols) == _without_timestamps(master_rows)
+    assert summary_cols == summary_rows
+    assert max_cols == max_rows == 100 + len(TRICKY) - 1
+    assert summary_cols["duplicate"] == 1 and summary_cols["valid"] > 0
+
+    # Parameters go straight to pymysql: plain Python types only, no numpy scalars
+    for params in clean_cols + master_cols:
+        for key, value in params.items():
+            assert type(value).__module__ in ("builtins", "datetime"), (key, type(value))
+    for a, b in zip(clean_cols, clean_rows):
+        assert type(a["avg"]) is type(b["avg"]) and type(a["reviews"]) is type(b["reviews"])
+
+
+def test_float_reparse_edge_cases_match(rows):
+    processor = ValidationQualityProcessor(engine=None, shutdown_event=None)
+    avg_rows = [p["avg"] for p in processor._prepare_rows(FakeConn(set()), rows, 0)[0]]
+    avg_cols = [p["avg"] for p in processor._prepare_columnar(FakeConn(set()), rows, 0)[0]]
+    # The row path re-parses str(float): 0.00001 -> '1e-05' -> 1.0, 1.23e23 -> '1.2345...e+23' -> 1.2345...
+    assert avg_cols == avg_rows
+    assert avg_cols[5] == 1.0 and 1 < avg_cols[7] < 2
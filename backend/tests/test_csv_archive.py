@@ -0,0 +1,70 @@
+import gzip
+import io
+import zipfile
+
+from tasks.gdrive_task import etl_tasks
+from utils.csv_archive import is_ingestible
+from test_drive_stream import FakeDownloader, FakeService, _csv_bytes, fake_downloader  # noqa: F401 (autouse)
+from test_small_file_pack import MultiFileService, _file, batch_env  # noqa: F401 (fixture)
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def _records(data, file_name):
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=1024, file_name=file_name) as stream:
+        return [(plan, values) for plan, values in etl_tasks.csv_records(stream)], stream.bytes_consumed
+
+
+def test_names_picked_up_by_the_scanner():
+    assert all(map(is_ingestible, ["a.csv", "a.CSV.gz", "shops.gz", "batch.zip"]))
+    assert not any(map(is_ingestible, ["a.json.gz", "a.xlsx", "csv"]))
+
+
+def test_gzip_is_decompressed_while_streaming():
+    plain = _csv_bytes(300)
+    # Two concatenated gzip members, as `cat a.gz b.gz` produces
+    half = plain.index(b"\nShop 150,") + 1
+    data = gzip.compress(plain[:half]) + gzip.compress(plain[half:])
+    records, offset = _records(data, "shops.csv.gz")
+    assert [v[0] for _, v in records] == [f"Shop {i}" for i in range(300)]
+    assert FakeDownloader.calls >= len(data) // 1024
+    assert offset == 0  # no byte checkpoint inside an archive
+
+
+def test_zip_members_each_bring_their_own_header():
+    data = _zip({
+        "a.csv": "name,phone\nShop A,9000000001\n",
+        "sub/b.csv": "phone,name\n9000000002,Shop B\n",
+        "readme.txt": "not a csv",
+        "__MACOSX/._a.csv": "junk",
+    })
+    records, _ = _records(data, "batch.zip")
+    assert [values for _, values in records] == [["Shop A", "9000000001"], ["9000000002", "Shop B"]]
+    plan_a, plan_b = records[0][0], records[1][0]
+    assert plan_a != plan_b
+
+
+def test_pack_ingests_archives_with_drive_lineage(batch_env, monkeypatch):
+    data = {
+        "z1": _zip({"a.csv": "name,phone\n" + "".join(f"Zip {i},9{i:09d}\n" for i in range(30)),
+                    "b.csv": "name,phone\n" + "".join(f"Zap {i},8{i:09d}\n" for i in range(20))}),
+        "g1": gzip.compress(("name,phone\n" + "".join(f"Gz {i},7{i:09d}\n" for i in range(10))).encode()),
+    }
+    monkeypatch.setattr(etl_tasks, "get_service", lambda: MultiFileService(data))
+    monkeypatch.setattr(etl_tasks, "get_files_status", lambda ids: {})
+    rows = []
+    monkeypatch.setattr(etl_tasks, "write_batch", lambda batch: rows.extend(batch) or len(batch))
+
+    files = [dict(_file("z1"), file_name="z1.zip"), dict(_file("g1"), file_name="g1.csv.gz")]
+    res = etl_tasks.process_csv_batch_task.apply(kwargs={"files": files})
+
+    assert res.result == "Processed pack: 2/2 files, 60 read, 60 inserted"
+    assert {r["drive_file_name"] for r in rows if r["drive_file_id"] == "z1"} == {"z1.zip"}
+    (entries,) = batch_env["status"]
+    assert {e["file_id"]: e["row_number"] for e in entries} == {"z1": 50, "g1": 10}
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text, exc as sa_exc
+
+from utils.db_pool import MeteredQueuePool, create_pooled_engine, is_prefork, pool_size_for
+
+
+def test_pool_size_for_gevent_and_prefork():
+    assert pool_size_for(100, 20) == 20
+    assert pool_size_for(6, 20) == 6
+    # prefork: 6 processes share 20 connections, each runs one task (pipeline uses 2)
+    assert pool_size_for(6, 20, prefork=True) == 2
+    assert pool_size_for(32, 20, prefork=True) == 1
+
+
+def test_prefork_over_budget_is_reported(caplog):
+    # 32 processes need at least one connection each: the budget of 20 cannot hold
+    assert pool_size_for(32, 20, prefork=True) == 1
+    assert "exceed ETL_DB_CONNECTION_BUDGET=20" in caplog.text
+    caplog.clear()
+    pool_size_for(10, 20, prefork=True)
+    assert caplog.text == ""
+
+
+def test_is_prefork():
+    assert is_prefork('prefork')
+    assert is_prefork(None)
+    assert not is_prefork('gevent')
+    from celery.concurrency import solo
+    assert not is_prefork(solo.TaskPool)
+
+
+def test_pooled_engine_caps_connections(tmp_path):
+    engine = create_pooled_engine(f"sqlite:///{tmp_path / 'x.db'}", 1, pool_timeout=0.1)
+    assert isinstance(engine.pool, MeteredQueuePool)
+    assert engine.pool.size() == 1
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+    # The connection went back to the pool and is reused
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 2")).scalar() == 2
+    assert engine.pool.checkedout() == 0
+
+
+def test_worker_init_rebuilds_the_etl_engine_at_its_final_size(monkeypatch):
+    from types import SimpleNamespace
+    from tasks.gdrive_task import etl_tasks
+
+    monkeypatch.setattr(etl_tasks, "engine", etl_tasks.engine)  # restored after the test
+    monkeypatch.setattr(etl_tasks.config, "ETL_DB_CONNECTION_BUDGET", 20)
+    before = etl_tasks.engine
+    etl_tasks.size_db_pool(sender=SimpleNamespace(concurrency=6, pool_cls="gevent"))
+    assert etl_tasks.engine is not before and etl_tasks.engine.pool.size() == 6
+    assert etl_tasks.engine.url == before.url
+
+    same = etl_tasks.engine
+    etl_tasks.size_db_pool(sender=SimpleNamespace(concurrency=6, pool_cls="gevent"))
+    assert etl_tasks.engine is same
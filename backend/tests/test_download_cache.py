@@ -0,0 +1,61 @@
+import csv
+import os
+
+import pytest
+
+from tasks.gdrive_task import etl_tasks
+from utils.download_cache import DownloadCache
+from test_drive_stream import FakeDownloader, FakeService, _csv_bytes
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    FakeDownloader.calls = 0
+    monkeypatch.setattr(etl_tasks, "MediaIoBaseDownload", FakeDownloader)
+    cache = DownloadCache(str(tmp_path), max_bytes=10 * 1024 * 1024, compression="gzip")
+    monkeypatch.setattr(etl_tasks, "get_download_cache", lambda: cache)
+    return cache
+
+
+def _read(data, **kw):
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=1024, cache_key="abc123", **kw) as s:
+        return list(csv.reader(s))
+
+
+def test_second_download_is_served_from_cache(cache):
+    data = _csv_bytes(500)
+    first = _read(data)
+    drive_calls = FakeDownloader.calls
+    assert drive_calls > 0 and cache.open("abc123").read() == data
+
+    assert _read(data) == first
+    assert FakeDownloader.calls == drive_calls  # no Drive traffic on a hit
+
+    # A resumed download starts at the checkpoint inside the cached file
+    offset = data.index(b"\nShop 100,") + 1
+    assert _read(data, start_byte=offset)[0][0] == "Shop 100"
+    assert FakeDownloader.calls == drive_calls
+
+
+def test_partial_download_is_not_cached(cache, tmp_path):
+    data = _csv_bytes(500)
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=1024, cache_key="abc123") as s:
+        next(csv.reader(s))
+    assert cache.open("abc123") is None
+    assert not [n for _, _, names in os.walk(tmp_path) for n in names]  # temp file cleaned up
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = DownloadCache(str(tmp_path), max_bytes=10 ** 6, compression="none")
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        writer = cache.writer(key)
+        writer.write(b"x" * 1000)
+        writer.commit()
+        path = os.path.join(str(tmp_path), key[:2], key + ".csv")
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.open("aa1").close()  # read: now the most recently used
+
+    cache.max_bytes = 2500
+    assert cache.evict() == 1000
+    assert cache.open("bb2") is None
+    assert cache.open("aa1") is not None and cache.open("cc3") is not None
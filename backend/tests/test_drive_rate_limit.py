@@ -0,0 +1,34 @@
+import pytest
+import redis
+
+from utils import drive_rate_limit
+from utils.drive_rate_limit import RedisTokenBucket, acquire_drive_quota
+
+
+def test_token_bucket_shared_between_clients():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    scanner = RedisTokenBucket(fakeredis.FakeRedis(server=server), "drive_ratelimit:sa:list", rate=20, capacity=2)
+    worker = RedisTokenBucket(fakeredis.FakeRedis(server=server), "drive_ratelimit:sa:list", rate=20, capacity=2)
+
+    assert scanner.try_take()[0]
+    assert worker.try_take()[0]
+    granted, wait, left = scanner.try_take()
+    assert not granted and 0 < wait <= 0.05 and left < 1
+    # acquire() sleeps for the refill instead of failing
+    waited, _ = worker.acquire()
+    assert 0.02 < waited < 0.5
+
+
+def test_limiter_fails_open_when_redis_is_down(monkeypatch):
+    class DownBucket:
+        def acquire(self, tokens=1):
+            raise redis.ConnectionError("connection refused")
+
+    monkeypatch.setattr(drive_rate_limit.config, "DRIVE_RATE_LIMIT", True)
+    monkeypatch.setattr(drive_rate_limit, "_unavailable_until", 0.0)
+    monkeypatch.setattr(drive_rate_limit, "get_bucket", lambda method: DownBucket())
+    assert acquire_drive_quota("list") == 0.0
+    # Skipped entirely during the fail-open window
+    monkeypatch.setattr(drive_rate_limit, "get_bucket", lambda method: pytest.fail("retried Redis too soon"))
+    assert acquire_drive_quota("list") == 0.0
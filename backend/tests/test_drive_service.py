@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from google.auth.credentials import AnonymousCredentials
+
+from utils import drive_service
+
+
+class FakeCredentials:
+    def __init__(self, lifetime):
+        self.lifetime = lifetime
+        self.token, self.expiry, self.refreshes = None, None, 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+        self.expiry = datetime.utcnow() + self.lifetime
+
+
+def test_credentials_are_loaded_once_and_refreshed_before_expiry(monkeypatch, tmp_path):
+    key_file = tmp_path / "sa.json"
+    key_file.write_text("{}")
+    loads = []
+    monkeypatch.setattr(drive_service.config, "SERVICE_ACCOUNT_FILE", str(key_file))
+    monkeypatch.setattr(drive_service, "_credentials", None)
+    monkeypatch.setattr(drive_service.service_account.Credentials, "from_service_account_file",
+                        lambda path, scopes: loads.append(path) or FakeCredentials(timedelta(hours=1)))
+
+    creds = drive_service.credentials()
+    assert drive_service.credentials() is creds
+    assert loads == [str(key_file)] and creds.refreshes == 1
+
+    # Inside the refresh margin the shared token is renewed before anyone sends it
+    creds.expiry = datetime.utcnow() + timedelta(seconds=drive_service.config.DRIVE_TOKEN_REFRESH_MARGIN - 10)
+    assert drive_service.credentials() is creds and creds.refreshes == 2
+
+
+def test_service_uses_static_document_and_endpoint_override(monkeypatch):
+    monkeypatch.setattr(drive_service.config, "DRIVE_API_ENDPOINT", "http://localhost:8089/drive/v3/")
+    assert drive_service.discovery_document() is drive_service.discovery_document()
+
+    service = drive_service.build_service(AnonymousCredentials())
+    request = service.files().get_media(fileId="f1")
+    assert request.uri.startswith("http://localhost:8089/drive/v3/files/f1?alt=media")
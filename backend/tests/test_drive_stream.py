@@ -0,0 +1,117 @@
+import csv
+import pytest
+
+from tasks.gdrive_task import etl_tasks
+
+
+class _Progress:
+    def __init__(self, total_size):
+        self.total_size = total_size
+
+
+class FakeDownloader:
+    """Stands in for MediaIoBaseDownload: writes one chunk per next_chunk() call."""
+    calls = 0
+
+    def __init__(self, fd, request, chunksize):
+        self._fd = fd
+        self._data = request
+        self._chunksize = chunksize
+        self._progress = 0
+
+    def next_chunk(self):
+        FakeDownloader.calls += 1
+        chunk = self._data[self._progress:self._progress + self._chunksize]
+        self._progress += len(chunk)
+        self._fd.write(chunk)
+        return _Progress(len(self._data)), self._progress >= len(self._data)
+
+
+class FakeService:
+    def __init__(self, data):
+        self._data = data
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        return self._data
+
+
+@pytest.fixture(autouse=True)
+def fake_downloader(monkeypatch):
+    FakeDownloader.calls = 0
+    monkeypatch.setattr(etl_tasks, "MediaIoBaseDownload", FakeDownloader)
+
+
+def _csv_bytes(rows):
+    lines = ["name,phone,address"] + [f"Shop {i},98765{i:05d},\"Line 1\nLine {i}\"" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def test_rows_are_yielded_before_download_completes():
+    data = _csv_bytes(2000)
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=1024) as stream:
+        reader = csv.DictReader(stream)
+        first = next(reader)
+        assert first["name"] == "Shop 0"
+        assert first["address"] == "Line 1\nLine 0"
+        assert FakeDownloader.calls < len(data) // 1024
+        rest = list(reader)
+    assert len(rest) == 1999
+    assert rest[-1]["phone"] == "9876501999"
+
+
+def test_size_limit_enforced_from_listing_size():
+    with pytest.raises(etl_tasks.FileTooLargeError):
+        with etl_tasks.download_csv(FakeService(b""), "f1", max_size_mb=1, file_size=5 * 1024 * 1024):
+            pass
+    assert FakeDownloader.calls == 0
+
+
+def test_size_limit_enforced_on_first_chunk():
+    data = b"x" * (2 * 1024 * 1024)
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=1, chunksize=1024) as stream:
+        with pytest.raises(etl_tasks.FileTooLargeError):
+            list(stream)
+    assert FakeDownloader.calls == 1
+
+
+def test_resume_from_byte_checkpoint_matches_full_read():
+    data = _csv_bytes(1200)
+    service = FakeService(data)
+    with etl_tasks.download_csv(service, "f1", max_size_mb=0, chunksize=4096) as stream:
+        reader = csv.DictReader(stream)
+        rows, checkpoint = [], None
+        for row in reader:
+            rows.append(row)
+            if len(rows) == 500:
+                checkpoint = stream.bytes_consumed
+
+    header = etl_tasks.read_csv_header(service, "f1")
+    assert header == ["name", "phone", "address"]
+    with etl_tasks.download_csv(service, "f1", max_size_mb=0, chunksize=4096, start_byte=checkpoint) as stream:
+        resumed = list(csv.DictReader(stream, fieldnames=header))
+    assert resumed == rows[500:]
+
+
+def test_prefetch_download_yields_identical_rows():
+    data = _csv_bytes(800)
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=2048) as stream:
+        expected = list(csv.DictReader(stream))
+    stats = etl_tasks.PipelineStats()
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=2048,
+                                prefetch=2, stats=stats) as stream:
+        assert list(csv.DictReader(stream)) == expected
+        assert stream.bytes_consumed == len(data)
+    assert stats.items["download"] == len(data)
+
+
+def test_download_takes_one_rate_limit_token_per_file(monkeypatch):
+    taken = []
+    monkeypatch.setattr(etl_tasks, "acquire_drive_quota", lambda method, tokens=1: taken.append(method))
+    data = _csv_bytes(1000)
+    with etl_tasks.download_csv(FakeService(data), "f1", max_size_mb=0, chunksize=1024) as stream:
+        assert len(list(csv.DictReader(stream))) == 1000
+    assert FakeDownloader.calls > 10
+    assert taken == ["get_media"]
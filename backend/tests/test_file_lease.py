@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from tasks.gdrive_task import etl_tasks
+from utils.redis_lease import LeaseSet
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_lease_excludes_other_owners_until_released():
+    client = fakeredis.FakeRedis()
+    first, second = LeaseSet(client, "task-1", 5, "lease"), LeaseSet(client, "task-2", 5, "lease")
+    assert first.acquire("f1")
+    assert not second.acquire("f1")
+    assert second.holder("f1") == "task-1"
+
+    # A redelivered run of the same task takes its own stale lease back
+    assert LeaseSet(client, "task-1", 5, "lease").acquire("f1")
+
+    first.release_all()
+    assert second.acquire("f1")
+    first.release_all()  # releasing again must not drop someone else's lease
+    assert second.holder("f1") == "task-2"
+    second.release_all()
+
+
+def test_heartbeat_keeps_lease_past_its_ttl():
+    client = fakeredis.FakeRedis()
+    with LeaseSet(client, "task-1", 0.3, "lease") as leases:
+        assert leases.acquire("f1")
+        time.sleep(0.8)
+        assert leases.holder("f1") == "task-1" and not leases.lost
+    assert client.get("lease:f1") is None
+
+
+def test_task_exits_when_file_is_leased_by_another_task(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(etl_tasks.config, "ETL_FILE_LEASE", True)
+    monkeypatch.setattr(etl_tasks, "get_redis", lambda *a, **kw: client)
+    monkeypatch.setattr(etl_tasks, "_SA_FILE_OK", True)
+    monkeypatch.setattr(etl_tasks, "get_file_checkpoint", lambda file_id, file_hash: (None, 0, 0))
+    monkeypatch.setattr(etl_tasks, "update_file_status", lambda *a, **kw: pytest.fail("must not touch the registry"))
+    monkeypatch.setattr(etl_tasks, "get_service", lambda: pytest.fail("must not download"))
+
+    other = LeaseSet(client, "other-task", 60, "etl:file_lease")
+    assert other.acquire("f1")
+    res = etl_tasks.process_csv_task.apply(args=("f1", "f1.csv", "d", "D", "/p", "2024-01-01T00:00:00Z"))
+    assert res.result == "Skipped f1.csv: being processed by another task"
+    other.release_all()
@@ -0,0 +1,47 @@
+import csv
+import io
+
+from model.normalizer import UniversalNormalizer
+
+META = {
+    "drive_file_id": "f1", "drive_file_name": "x.csv", "drive_folder_id": "d1",
+    "drive_folder_name": "Cafe", "drive_file_path": "ROOT/Cafe", "drive_uploaded_time": "2024-02-26T10:00:00.000Z",
+}
+
+HEADERS = [
+    ["name", "address", "phone", "city", "state", "category", "website", "reviews", "rating", "area"],
+    ["Business Name", " ADDRESS ", "Mobile", "Town", "Province", "Type", "URL", "Total Reviews", "Avg Rating", "Area"],
+    ["नाम", "पता", "फोन", "शहर", "राज्य", "श्रेणी", "वेबसाइट", "समीक्षाएं", "रेटिंग", "area"],
+    ["Name", "name", "phone_number", "Phone", "City", "city", "state", "extra"],
+    ["company name", "business name", "contact", "tel", "location", "location city", "region", "sub-category"],
+    ["foo", "bar"],
+]
+
+ROWS = [
+    ["Cafe One", "12 MG Road", "+91 98765 43210", "Ahmedabad", "gj", "Cafe", "https://cafe.one/", "1,234", "4.5", "Navrangpura"],
+    ["Short Row", "Addr"],
+    ["Long", "Row", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11"],
+    ["", "", "", "", "", "", "", "n/a", "nan", ""],
+]
+
+
+def _dict_path(header, row):
+    text = io.StringIO()
+    csv.writer(text).writerows([header, row])
+    text.seek(0)
+    dict_row = next(csv.DictReader(text))
+    return UniversalNormalizer.normalize_row_raw({**dict_row, **META})
+
+
+def test_compiled_plan_matches_get_fuzzy_for_every_header_shape():
+    for header in HEADERS:
+        plan = UniversalNormalizer.compile_header_plan(header)
+        for row in ROWS:
+            assert UniversalNormalizer.normalize_values_raw(row, plan, META) == _dict_path(header, row), (header, row)
+
+
+def test_duplicate_headers_resolve_to_last_column_like_dictreader():
+    plan = UniversalNormalizer.compile_header_plan(["name", "city", "name"])
+    assert plan["name"] == 2
+    assert plan["city"] == 1
+    assert plan["address"] is None
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from utils import id_range_lease
+from utils.id_range_lease import IdRangeLeases
+
+
+class SqliteLeases(IdRangeLeases):
+    lock_clause = ""  # sqlite serializes writers on its own
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'leases.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE etl_metadata (meta_key VARCHAR(100) PRIMARY KEY, meta_value TEXT)"))
+        conn.execute(text("""
+            CREATE TABLE validation_range_lease (start_id BIGINT PRIMARY KEY, end_id BIGINT NOT NULL,
+                status VARCHAR(10) NOT NULL DEFAULT 'LEASED', owner VARCHAR(100), lease_expires DOUBLE)
+        """))
+        conn.execute(text("CREATE TABLE raw_google_map_drive_data (id INTEGER PRIMARY KEY)"))
+        for i in range(1, 51):
+            conn.execute(text("INSERT INTO raw_google_map_drive_data (id) VALUES (:i)"), {"i": i})
+    return engine
+
+
+def _watermark(engine):
+    with engine.connect() as conn:
+        return int(conn.execute(text("SELECT meta_value FROM etl_metadata WHERE meta_key = 'last_processed_id'")).scalar())
+
+
+def _complete(engine, leases, start_id):
+    with engine.begin() as conn:
+        return leases.complete(conn, start_id)
+
+
+def test_workers_lease_consecutive_ranges_up_to_max_id(engine):
+    a = SqliteLeases(engine, "a", span=20, initial_watermark=lambda: 5)
+    b = SqliteLeases(engine, "b", span=20)
+    assert a.claim() == (6, 25)
+    assert b.claim() == (26, 45)
+    assert a.claim() == (46, 50)
+    assert b.claim() is None
+
+
+def test_watermark_moves_only_across_contiguous_done_ranges(engine):
+    a = SqliteLeases(engine, "a", span=10)
+    b = SqliteLeases(engine, "b", span=10)
+    assert a.claim() == (1, 10)
+    assert b.claim() == (11, 20)
+    assert b.claim() == (21, 30)
+
+    _complete(engine, b, 11)
+    _complete(engine, b, 21)
+    assert b.advance() == 0  # 1-10 is still running
+    _complete(engine, a, 1)
+    assert a.advance() == 30
+    assert _watermark(engine) == 30
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM validation_range_lease")).scalar() == 0
+    assert a.claim() == (31, 40)
+
+
+def test_expired_range_is_taken_over_first(engine, monkeypatch):
+    crashed = SqliteLeases(engine, "crashed", span=10, lease_seconds=60)
+    alive = SqliteLeases(engine, "alive", span=10, lease_seconds=60)
+    assert crashed.claim() == (1, 10)
+    assert alive.claim() == (11, 20)
+
+    now = id_range_lease.time.time()
+    monkeypatch.setattr(id_range_lease.time, "time", lambda: now + 120)
+    assert alive.claim() == (1, 10)
+    # The original holder finishing late no longer counts; the new holder's completion does
+    assert not _complete(engine, crashed, 1)
+    assert _complete(engine, alive, 1)
+    assert alive.advance() == 10
@@ -0,0 +1,98 @@
+import pytest
+
+from tasks.gdrive_task import etl_tasks
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    log = {"inserted": [], "checkpoints": [], "remembered": []}
+    monkeypatch.setattr(etl_tasks, "dedup_batch", lambda rows: [r for r in rows if r["name"] != "dup"])
+    monkeypatch.setattr(etl_tasks, "remember_batch", lambda rows: log["remembered"].append([r["name"] for r in rows]))
+
+    def fake_insert(rows):
+        log["inserted"].append([r["name"] for r in rows])
+        return len(rows)
+
+    monkeypatch.setattr(etl_tasks, "write_batch", fake_insert)
+    monkeypatch.setattr(etl_tasks, "update_file_checkpoint",
+                        lambda file_id, row, byte: log["checkpoints"].append((file_id, row, byte)))
+    return log
+
+
+def _batch(names):
+    return [{"name": n} for n in names]
+
+
+def test_batches_commit_in_order_and_advance_checkpoint(calls):
+    with etl_tasks.CsvIngestPipeline("f1", "t1", queue_depth=1) as pipeline:
+        for i in range(5):
+            pipeline.submit(_batch([f"a{i}", "dup", f"b{i}"]), end_row=(i + 1) * 3, end_byte=(i + 1) * 100)
+        inserted = pipeline.finish()
+
+    assert inserted == 10
+    assert calls["inserted"] == [[f"a{i}", f"b{i}"] for i in range(5)]
+    assert calls["checkpoints"] == [("f1", (i + 1) * 3, (i + 1) * 100) for i in range(5)]
+    assert calls["remembered"] == calls["inserted"]
+    assert (pipeline.committed_row, pipeline.committed_byte) == (15, 500)
+    assert pipeline.stats.items["insert"] == 10
+    assert pipeline.stats.items["normalize"] == 15
+
+
+def test_stage_error_is_reraised_and_checkpoint_not_advanced(calls, monkeypatch):
+    def failing_insert(rows):
+        raise etl_tasks.OperationalError("INSERT", {}, Exception("Lost connection"))
+
+    monkeypatch.setattr(etl_tasks, "write_batch", failing_insert)
+    with etl_tasks.CsvIngestPipeline("f1", "t1", last_row=7, last_byte=70, queue_depth=1) as pipeline:
+        for i in range(4):
+            pipeline.submit(_batch(["x"]), end_row=8 + i, end_byte=80 + i)
+        with pytest.raises(etl_tasks.OperationalError):
+            pipeline.finish()
+
+    assert calls["checkpoints"] == []
+    assert calls["remembered"] == []
+    assert (pipeline.committed_row, pipeline.committed_byte) == (7, 70)
+
+
+class DeadlockEngine:
+    def begin(self):
+        raise etl_tasks.OperationalError("INSERT", {}, Exception("Deadlock found when trying to get lock"))
+
+
+@pytest.mark.parametrize("failing_engine", ["no_table", "deadlock"])
+def test_failed_insert_raises_and_checkpoint_stays_put(calls, monkeypatch, tmp_path, failing_engine):
+    from sqlalchemy import create_engine
+    if failing_engine == "no_table":
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    else:
+        engine = DeadlockEngine()
+        monkeypatch.setattr(etl_tasks.time, "sleep", lambda s: None)
+    # The real write path: insert_batch used to swallow the error and return 0
+    monkeypatch.setattr(etl_tasks, "write_batch", etl_tasks.insert_batch)
+    monkeypatch.setattr(etl_tasks, "engine", engine)
+
+    with pytest.raises(etl_tasks.BatchWriteError):
+        etl_tasks.insert_batch(_batch(["x"]))
+
+    with etl_tasks.CsvIngestPipeline("f1", "t1", last_row=7, last_byte=70, queue_depth=1) as pipeline:
+        pipeline.submit(_batch(["x", "y"]), end_row=9, end_byte=90)
+        with pytest.raises(etl_tasks.BatchWriteError):
+            pipeline.finish()
+
+    assert calls["checkpoints"] == []
+    assert (pipeline.committed_row, pipeline.committed_byte) == (7, 70)
+    assert pipeline.inserted == 0
+
+
+def test_tsv_rows_escape_mysql_specials():
+    import io
+    row = {key: None for _, key in etl_tasks._BULK_COLUMNS}
+    row.update({"name": "A\tB\\C", "address": "L1\nL2\r", "reviews_count": 3, "reviews_average": 4.5})
+    buf = io.BytesIO()
+    etl_tasks.write_tsv_rows(buf, [row])
+    fields = buf.getvalue().decode("utf-8").rstrip("\n").split("\t")
+    assert len(fields) == len(etl_tasks._BULK_COLUMNS)
+    assert fields[0] == "A\\tB\\\\C"
+    assert fields[1] == "L1\\nL2\\r"
+    assert fields[2] == "\\N"
+    assert fields[4:6] == ["3", "4.5"]
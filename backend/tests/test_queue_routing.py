@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from tasks.gdrive_task import etl_tasks
+
+MB = 1024 * 1024
+
+
+def test_queue_for_size(monkeypatch):
+    monkeypatch.setattr(etl_tasks.config, "ETL_MEDIUM_FILE_MB", 10)
+    monkeypatch.setattr(etl_tasks.config, "ETL_LARGE_FILE_MB", 200)
+    assert etl_tasks.queue_for_size(5 * MB) == "gdrive_small"
+    assert etl_tasks.queue_for_size(10 * MB) == "gdrive_medium"
+    assert etl_tasks.queue_for_size(2048 * MB) == "gdrive_large"
+    assert etl_tasks.queue_for_size(None) == "gdrive_medium"
+
+
+def test_dispatch_sets_queue_limits_and_timestamp(monkeypatch):
+    sent = []
+    monkeypatch.setattr(etl_tasks.config, "ETL_QUEUE_ROUTING", True)
+    monkeypatch.setattr(etl_tasks.process_csv_task, "apply_async", lambda **kw: sent.append(kw))
+    monkeypatch.setattr(etl_tasks.process_csv_batch_task, "apply_async", lambda **kw: sent.append(kw))
+
+    etl_tasks.dispatch_csv({"file_id": "f", "file_size": 2048 * MB})
+    etl_tasks.dispatch_csv_pack([{"file_id": "a"}, {"file_id": "b"}])
+
+    big, pack = sent
+    assert big["queue"] == "gdrive_large" and big["kwargs"]["file_id"] == "f"
+    assert big["time_limit"] == etl_tasks.config.ETL_LARGE_TIME_LIMIT
+    assert big["soft_time_limit"] < big["time_limit"]
+    assert big["headers"]["etl_queue"] == "gdrive_large" and big["headers"]["etl_enqueued_at"] > 0
+    assert pack["queue"] == "gdrive_small" and len(pack["kwargs"]["files"]) == 2
+
+
+def _fake_producers(monkeypatch):
+    producers = []
+
+    class ProducerCtx:
+        def __enter__(self):
+            producers.append(object())
+            return producers[-1]
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(etl_tasks.config, "ETL_QUEUE_ROUTING", True)
+    monkeypatch.setattr(etl_tasks.process_csv_task.app, "producer_or_acquire", lambda producer=None: ProducerCtx())
+    return producers
+
+
+def test_publisher_buffers_then_sends_one_batch_per_producer(monkeypatch):
+    producers = _fake_producers(monkeypatch)
+    sent = []
+    monkeypatch.setattr(etl_tasks.process_csv_task, "apply_async", lambda **kw: sent.append(kw))
+
+    publisher = etl_tasks.TaskPublisher(max_messages=3, max_delay=60)
+    for i in range(4):
+        publisher.dispatch_csv({"file_id": f"f{i}", "file_size": 1})
+    assert [kw["kwargs"]["file_id"] for kw in sent] == ["f0", "f1", "f2"]
+    publisher.flush()
+    assert len(sent) == 4 and len(producers) == 2
+    assert all(kw["producer"] is producers[0] for kw in sent[:3])
+    assert publisher.published == 4
+
+
+def test_publisher_timer_flushes_a_buffer_that_stopped_growing(monkeypatch):
+    _fake_producers(monkeypatch)
+    sent = []
+    monkeypatch.setattr(etl_tasks.process_csv_task, "apply_async", lambda **kw: sent.append(kw))
+
+    publisher = etl_tasks.TaskPublisher(max_messages=100, max_delay=0.05)
+    publisher.dispatch_csv({"file_id": "f0", "file_size": 1})
+    assert sent == []
+    deadline = time.monotonic() + 2
+    while not sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [kw["kwargs"]["file_id"] for kw in sent] == ["f0"]
+    assert publisher.published == 1
+
+
+def test_publisher_keeps_unsent_messages_when_the_broker_fails(monkeypatch):
+    _fake_producers(monkeypatch)
+    sent, broker = [], {"up": False}
+
+    def apply_async(**kw):
+        if not broker["up"] and len(sent) == 1:
+            raise ConnectionError("broker down")
+        sent.append(kw["kwargs"]["file_id"])
+
+    monkeypatch.setattr(etl_tasks.process_csv_task, "apply_async", apply_async)
+    publisher = etl_tasks.TaskPublisher(max_messages=100, max_delay=60)
+    for i in range(3):
+        publisher.dispatch_csv({"file_id": f"f{i}", "file_size": 1})
+    with pytest.raises(ConnectionError):
+        publisher.flush()
+    assert sent == ["f0"] and publisher.published == 1
+
+    broker["up"] = True
+    publisher.flush()
+    # Nothing lost and nothing published twice
+    assert sent == ["f0", "f1", "f2"] and publisher.published == 3
+
+
+def test_after_sent_waits_for_messages_added_before_it(monkeypatch):
+    _fake_producers(monkeypatch)
+    sent, done, broker = [], [], {"up": False}
+
+    def apply_async(**kw):
+        if not broker["up"]:
+            raise ConnectionError("broker down")
+        sent.append(kw["kwargs"]["file_id"])
+
+    monkeypatch.setattr(etl_tasks.process_csv_task, "apply_async", apply_async)
+    publisher = etl_tasks.TaskPublisher(max_messages=100, max_delay=60)
+    publisher.after_sent(lambda: done.append("nothing pending"))
+    publisher.dispatch_csv({"file_id": "f0", "file_size": 1})
+    publisher.after_sent(lambda: done.append("f0"))
+    publisher.dispatch_csv({"file_id": "f1", "file_size": 1})
+    assert done == ["nothing pending"]
+
+    # A failed send keeps the callbacks waiting with their messages
+    with pytest.raises(ConnectionError):
+        publisher.flush()
+    assert done == ["nothing pending"]
+
+    broker["up"] = True
+    publisher.flush()
+    assert sent == ["f0", "f1"] and done == ["nothing pending", "f0"]
@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from utils.redis_bloom import RedisBloomFilter, bloom_parameters, bit_positions
+from tasks.gdrive_task import etl_tasks
+
+
+def test_bloom_parameters_match_textbook_sizing():
+    bits, hashes = bloom_parameters(10_000_000, 0.001)
+    # ~14.4 bits per item and k=10 for a 0.1% false-positive rate
+    assert 143_000_000 < bits < 144_500_000
+    assert hashes == 10
+    with pytest.raises(ValueError):
+        bloom_parameters(1000, 1.5)
+
+
+def test_bit_positions_are_deterministic_and_in_range():
+    first = bit_positions("shop|9876543210|main road", 1000, 7)
+    assert first == bit_positions("shop|9876543210|main road", 1000, 7)
+    assert len(first) == 7 and all(0 <= p < 1000 for p in first)
+    assert first != bit_positions("shop|9876543211|main road", 1000, 7)
+
+
+def test_dedup_batch_falls_back_to_full_batch_when_redis_fails(monkeypatch):
+    def broken_filter():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(etl_tasks, "get_dedup_filter", broken_filter)
+    batch = [{"name": "a"}, {"name": "b"}]
+    assert etl_tasks.dedup_batch(batch) == batch
+
+
+@pytest.fixture
+def raw_table(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'raw.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {etl_tasks.RAW_TABLE} (name TEXT, address TEXT, phone_number TEXT)"))
+    monkeypatch.setattr(etl_tasks, "engine", engine)
+
+    def store(*rows):
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {etl_tasks.RAW_TABLE} VALUES (:name, :address, :phone_number)"), list(rows))
+    return store
+
+
+class FakeFilter:
+    def might_contain_many(self, signatures):
+        return [sig.startswith("seen") for sig in signatures]
+
+    def add_many(self, signatures):
+        raise AssertionError("the pre-screen must not record signatures")
+
+
+def _row(name):
+    return {"name": name, "address": "Main Rd", "phone_number": "98765"}
+
+
+def test_dedup_batch_drops_only_confirmed_duplicates(raw_table, monkeypatch):
+    monkeypatch.setattr(etl_tasks, "get_dedup_filter", lambda: FakeFilter())
+    raw_table(_row("seen stored"))
+    batch = [_row("new"), _row("seen stored"), _row("seen false positive")]
+    # The false positive is not in MySQL, so it is kept
+    assert etl_tasks.dedup_batch(batch) == [_row("new"), _row("seen false positive")]
+
+
+def test_dedup_batch_skips_mysql_when_filter_has_no_hits(monkeypatch):
+    def no_lookup(rows):
+        raise AssertionError("nothing to confirm")
+
+    monkeypatch.setattr(etl_tasks, "get_dedup_filter", lambda: FakeFilter())
+    monkeypatch.setattr(etl_tasks, "find_stored_keys", no_lookup)
+    batch = [_row("a"), _row("b")]
+    assert etl_tasks.dedup_batch(batch) == batch
+
+
+def test_dedup_batch_keeps_rows_when_confirmation_fails(monkeypatch):
+    def broken_lookup(rows):
+        raise ConnectionError("mysql down")
+
+    monkeypatch.setattr(etl_tasks, "get_dedup_filter", lambda: FakeFilter())
+    monkeypatch.setattr(etl_tasks, "find_stored_keys", broken_lookup)
+    batch = [_row("seen 1"), _row("seen 2")]
+    assert etl_tasks.dedup_batch(batch) == batch
+
+
+@pytest.fixture
+def bloom():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisBloomFilter(fakeredis.FakeRedis(), "test_bloom", capacity=1000, error_rate=0.01, window_seconds=3600)
+
+
+def test_test_is_read_only_and_add_records(bloom):
+    sigs = ["a|1|x", "b|2|y"]
+    assert bloom.might_contain_many(sigs, now=7200) == [False, False]
+    assert bloom.might_contain_many(sigs, now=7200) == [False, False]
+    assert bloom.add_many(sigs[:1], now=7200) == [True]
+    assert bloom.might_contain_many(sigs, now=7200) == [True, False]
+    # Still remembered through the next window (previous generation), forgotten after that
+    assert bloom.might_contain_many(sigs, now=10800) == [True, False]
+    assert bloom.might_contain_many(sigs, now=14400) == [False, False]
+
+
+def test_failed_write_does_not_mark_rows_seen(bloom, raw_table, monkeypatch):
+    monkeypatch.setattr(etl_tasks, "get_dedup_filter", lambda: bloom)
+    monkeypatch.setattr(etl_tasks, "prepare_batch", lambda batch, task_id=None: batch)
+    rows = [{"name": "Shop", "phone_number": "98765", "address": "Main Rd"}]
+    signature = etl_tasks.row_signature(rows[0])
+
+    def failing_write(batch):
+        raise etl_tasks.BatchWriteError("Lost connection")
+
+    monkeypatch.setattr(etl_tasks, "write_batch", failing_write)
+    with pytest.raises(etl_tasks.BatchWriteError):
+        etl_tasks.commit_batch(list(rows))
+    assert bloom.might_contain_many([signature]) == [False]
+
+    # The retry is not filtered out, and only its commit records the row
+    def write(batch):
+        if batch:
+            raw_table(*batch)
+        return len(batch)
+
+    monkeypatch.setattr(etl_tasks, "write_batch", write)
+    assert etl_tasks.commit_batch(list(rows)) == 1
+    assert bloom.might_contain_many([signature]) == [True]
+    # Seen and confirmed in MySQL: dropped before the INSERT
+    assert etl_tasks.commit_batch(list(rows)) == 0
@@ -0,0 +1,132 @@
+import pytest
+
+from tasks.gdrive_task import etl_tasks
+from model.robust_gdrive_etl_v2 import SmallFilePacker
+from test_drive_stream import FakeDownloader
+
+
+class MultiFileService:
+    def __init__(self, files):
+        self._files = files
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        if fileId not in self._files:
+            raise RuntimeError(f"404 {fileId}")
+        return self._files[fileId]
+
+
+def _csv(prefix, rows):
+    lines = ["name,phone"] + [f"{prefix} {i},9{i:09d}" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _file(file_id, size=100):
+    return dict(file_id=file_id, file_name=f"{file_id}.csv", folder_id="d", folder_name="D",
+                path="/p", modified_time="2024-01-01T00:00:00Z", file_size=size)
+
+
+def test_packer_flushes_on_count_and_bytes(monkeypatch):
+    sent = []
+    monkeypatch.setattr(SmallFilePacker, "_dispatch", staticmethod(lambda pack, callbacks: sent.append(pack) if pack else None))
+    packer = SmallFilePacker(max_files=3, max_bytes=1000, publisher=None)
+    for i in range(4):
+        packer.add(_file(f"f{i}"))
+    packer.add(_file("big", size=950))
+    packer.flush()
+    packer.flush()
+    assert [[f["file_id"] for f in p] for p in sent] == [["f0", "f1", "f2"], ["f3", "big"]]
+
+
+@pytest.fixture
+def batch_env(monkeypatch):
+    state = {"writes": [], "status": []}
+    monkeypatch.setattr(etl_tasks, "MediaIoBaseDownload", FakeDownloader)
+    monkeypatch.setattr(etl_tasks, "_SA_FILE_OK", True)
+    monkeypatch.setattr(etl_tasks, "BATCH_SIZE", 500)
+    monkeypatch.setattr(etl_tasks, "bulk_load_enabled", lambda: False)
+    monkeypatch.setattr(etl_tasks, "dedup_batch", lambda rows: rows)
+    monkeypatch.setattr(etl_tasks, "remember_batch", lambda rows: None)
+    monkeypatch.setattr(etl_tasks, "write_batch", lambda rows: state["writes"].append(len(rows)) or len(rows))
+    monkeypatch.setattr(etl_tasks, "update_files_status", lambda entries: state["status"].append(entries))
+    monkeypatch.setattr(etl_tasks, "trigger_stats_refresh", lambda: None)
+    return state
+
+
+def test_batch_task_coalesces_rows_and_tracks_each_file(batch_env, monkeypatch):
+    data = {f"f{i}": _csv(f"Shop{i}", 200) for i in range(4)}
+    monkeypatch.setattr(etl_tasks, "get_service", lambda: MultiFileService(data))
+    done_hash = etl_tasks.get_file_hash("f3", "2024-01-01 00:00:00")
+    monkeypatch.setattr(etl_tasks, "get_files_status", lambda ids: {"f3": ("PROCESSED", done_hash)})
+
+    files = [_file(f"f{i}") for i in range(4)] + [_file("missing")]
+    res = etl_tasks.process_csv_batch_task.apply(kwargs={"files": files})
+
+    assert res.result == "Processed pack: 3/5 files, 600 read, 600 inserted"
+    # 3 x 200 rows go out as one full batch plus the remainder, not 3 small inserts
+    assert batch_env["writes"] == [500, 100]
+    (entries,) = batch_env["status"]
+    by_id = {e["file_id"]: e for e in entries}
+    assert set(by_id) == {"f0", "f1", "f2", "missing"}
+    assert by_id["f0"]["status"] == "PROCESSED" and by_id["f0"]["row_number"] == 200
+    assert by_id["f0"]["byte_offset"] == len(data["f0"])
+    assert by_id["missing"]["status"] == "ERROR"
+
+
+def test_batch_task_skips_known_and_repeated_content(batch_env, monkeypatch):
+    data = {f"f{i}": _csv("Same", 10) for i in range(3)}
+    fetched = []
+    service = MultiFileService(data)
+    monkeypatch.setattr(service, "get_media", lambda fileId: fetched.append(fileId) or data[fileId])
+    monkeypatch.setattr(etl_tasks, "get_service", lambda: service)
+    monkeypatch.setattr(etl_tasks, "get_files_status", lambda ids: {})
+    monkeypatch.setattr(etl_tasks, "get_processed_checksums", lambda sums: {"old": "orig"} if "old" in sums else {})
+
+    files = [dict(_file("f0"), md5_checksum="old"), dict(_file("f1"), md5_checksum="new"),
+             dict(_file("f2"), md5_checksum="new")]
+    etl_tasks.process_csv_batch_task.apply(kwargs={"files": files})
+
+    assert fetched == ["f1"]
+    (entries,) = batch_env["status"]
+    notes = {e["file_id"]: (e["status"], e.get("error_msg"), e["md5_checksum"]) for e in entries}
+    assert notes == {"f0": ("PROCESSED", "Same content as orig", "old"),
+                     "f1": ("PROCESSED", None, "new"),
+                     "f2": ("PROCESSED", "Same content as f1", "new")}
+
+
+def test_folders_marked_done_only_after_their_small_files_are_sent(monkeypatch):
+    import threading
+    from model.robust_gdrive_etl_v2 import GDriveHighSpeedIngestor, TreeWalk
+    from test_queue_routing import _fake_producers
+
+    _fake_producers(monkeypatch)
+    events = []
+    monkeypatch.setattr(etl_tasks.process_csv_batch_task, "apply_async",
+                        lambda **kw: events.append(("sent", [f["file_id"] for f in kw["kwargs"]["files"]])))
+
+    ing = GDriveHighSpeedIngestor.__new__(GDriveHighSpeedIngestor)
+    ing.publisher = etl_tasks.TaskPublisher(max_messages=500, max_delay=60)
+    ing.small_files = SmallFilePacker(max_files=50, max_bytes=10 ** 9, publisher=ing.publisher)
+    ing.small_file_max_bytes = 1024
+    ing.folder_registry, ing.folder_child_counts = {}, {}
+    ing.folder_paths = type("Paths", (), {"put": lambda self, *a: None})()
+    ing.shutdown_event, ing.stats_lock = threading.Event(), threading.Lock()
+    ing.total_scanned_folders = ing.total_dispatched_files = 0
+    tree = {d: [{"id": f"{d}s{i}", "name": f"{d}s{i}.csv", "mimeType": "text/csv", "size": "100",
+                 "modifiedTime": "2024-01-01T00:00:00Z"} for i in range(3)] for d in ("d1", "d2")}
+    ing.list_children = lambda ids: {fid: tree[fid] for fid in ids}
+    ing.filter_changed = lambda items: items
+    ing.register_folder = lambda fid, *a, **k: events.append(("done", fid))
+
+    walk = TreeWalk()
+    walk.add("d1", "D1", "")
+    walk.add("d2", "D2", "")
+    ing._scan_folders(walk, [walk.frontier.get()])
+    ing._scan_folders(walk, [walk.frontier.get()])
+    # Each batch's files wait in the shared pack: nothing is sent or marked DONE per batch
+    assert events == []
+
+    ing.flush_dispatch()
+    assert events == [("sent", ["d1s0", "d1s1", "d1s2", "d2s0", "d2s1", "d2s2"]), ("done", "d1"), ("done", "d2")]
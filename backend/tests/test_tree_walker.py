@@ -0,0 +1,222 @@
+import re
+import threading
+
+import pytest
+
+from model import robust_gdrive_etl_v2 as etl_v2
+from tasks.gdrive_task.etl_tasks import TaskPublisher
+from utils.circuit_breaker import CircuitBreaker
+
+FOLDER = 'application/vnd.google-apps.folder'
+
+
+class FakeDrive:
+    """files().list over an in-memory tree; pages of `page_size`, multi-parent queries."""
+    def __init__(self, tree, page_size=2, fail=(), search=None):
+        self.tree = tree
+        self.search = search or {}  # 'folder' / 'csv' -> results of a modifiedTime query
+        self.page_size = page_size
+        self.fail = set(fail)
+        self.queries = []
+        self.gets = []
+        self.folders = {}  # files().get metadata by ID
+
+    def files(self):
+        return self
+
+    def list(self, q, pageToken=None, **kwargs):
+        parents = re.findall(r"'([^']+)' in parents", q)
+        if pageToken is None:
+            self.queries.append(parents)
+        if self.fail & set(parents):
+            raise RuntimeError("500 backend error")
+        if parents:
+            items = [dict(item, parents=[p]) for p in parents for item in self.tree.get(p, [])]
+        else:
+            items = self.search['folder' if 'google-apps.folder' in q else 'csv']
+        start = int(pageToken or 0)
+        page = items[start:start + self.page_size]
+        res = {'files': page}
+        if start + self.page_size < len(items):
+            res['nextPageToken'] = str(start + self.page_size)
+        self._res = res
+        return self
+
+    def get(self, fileId, **kwargs):
+        self.gets.append(fileId)
+        self._res = self.folders[fileId]
+        return self
+
+    def execute(self):
+        return self._res
+
+
+def _folder(fid, modified='2024-01-01T00:00:00Z'):
+    return {'id': fid, 'name': fid, 'mimeType': FOLDER, 'modifiedTime': modified}
+
+
+def _csv(fid):
+    return {'id': fid, 'name': f'{fid}.csv', 'mimeType': 'text/csv', 'modifiedTime': '2024-01-01T00:00:00Z'}
+
+
+@pytest.fixture
+def ingestor(monkeypatch):
+    monkeypatch.setattr(etl_v2.config, "SCAN_THREADS", 3)
+    monkeypatch.setattr(etl_v2.config, "SCAN_PARENTS_PER_QUERY", 4)
+    ing = etl_v2.GDriveHighSpeedIngestor.__new__(etl_v2.GDriveHighSpeedIngestor)
+    ing.shutdown_event = threading.Event()
+    ing.stats_lock = threading.Lock()
+    ing.api_breaker = CircuitBreaker(name="test", failure_threshold=100)
+    ing.folder_registry = {'old': '2024-01-01 00:00:00'}
+    ing.folder_child_counts = {}
+    ing.folder_paths = etl_v2.FolderPathCache(etl_v2.ROOT_FOLDER_ID)
+    ing.total_scanned_folders = ing.total_dispatched_files = ing.scan_api_calls = 0
+    ing.dispatched, ing.registered, ing.newest_child = [], [], {}
+    ing.small_files = etl_v2.SmallFilePacker(50, 10 ** 9, publisher=TaskPublisher())
+    ing.flush_dispatch = lambda: None
+    ing.filter_changed = lambda items: items
+    ing.dispatch_file = lambda item, fid, name, path: ing.dispatched.append((item['id'], path))
+
+    def register_folder(fid, name, mod, n, parent_id=None, child_count=None, newest_child_at=None):
+        ing.registered.append(fid)
+        ing.newest_child[fid] = newest_child_at
+        ing.folder_registry[fid] = mod
+        ing.folder_child_counts[fid] = child_count
+    ing.register_folder = register_folder
+    return ing
+
+
+def test_walk_follows_pages_batches_parents_and_registers_bottom_up(ingestor):
+    tree = {
+        'a': [_folder('a1'), _folder('a2'), _folder('old')] + [_csv(f'a{i}') for i in range(5)],
+        'b': [_folder('a1'), _csv('b0')],  # a1 has two parents
+        'a1': [_csv('x')],
+        'a2': [_folder('a2x')],
+        'a2x': [_csv('y')],
+        'old': [_csv('never')],
+    }
+    drive = FakeDrive(tree)
+    ingestor.get_service = lambda: drive
+    ingestor.walk_tree([('a', 'a', None, None), ('b', 'b', None, None)], "ROOT")
+
+    assert sorted(d[0] for d in ingestor.dispatched) == ['a0', 'a1', 'a2', 'a3', 'a4', 'b0', 'x', 'y']
+    assert ('y', 'ROOT/a/a2/a2x') in ingestor.dispatched
+    assert sorted(ingestor.registered) == ['a', 'a1', 'a2', 'a2x', 'b']
+    # Parents are only registered after their whole subtree
+    assert ingestor.registered.index('a2x') < ingestor.registered.index('a2') < ingestor.registered.index('a')
+    assert any(len(parents) > 1 for parents in drive.queries)
+    assert ingestor.scan_api_calls > len(drive.queries)  # pagination was followed
+    assert ingestor.total_scanned_folders == 5  # "old" is already indexed
+
+
+def test_failed_listing_leaves_ancestors_unregistered(ingestor, monkeypatch):
+    monkeypatch.setattr(etl_v2.config, "SCAN_PARENTS_PER_QUERY", 1)
+    tree = {'r': [_folder('ok'), _folder('bad')], 'ok': [_csv('1')], 'bad': [_csv('2')]}
+    ingestor.get_service = lambda: FakeDrive(tree, fail={'bad'})
+    ingestor.walk_tree([('r', 'r', None, None)], "ROOT")
+    assert ingestor.registered == ['ok']
+
+
+def test_rescan_descends_only_into_moved_subtrees(ingestor):
+    tree = {
+        'a': [_folder('a1'), _folder('a2')],
+        'a1': [_csv('x')],
+        'a2': [_folder('a2x')],
+        'a2x': [_csv('y')],
+    }
+    drive = FakeDrive(tree)
+    ingestor.get_service = lambda: drive
+    ingestor.walk_tree([('a', 'a', '2024-01-01T00:00:00Z', None)], "ROOT")
+    assert ingestor.total_scanned_folders == 4
+
+    # Nothing moved -> nothing is listed
+    drive.queries.clear()
+    ingestor.walk_tree([('a', 'a', '2024-01-01T00:00:00Z', None)], "ROOT")
+    assert drive.queries == []
+
+    # a1 moved -> only a1 is listed below a
+    tree['a'][0] = _folder('a1', '2024-02-01T00:00:00Z')
+    ingestor.walk_tree([('a', 'a', '2024-02-01T00:00:00Z', None)], "ROOT")
+    assert sorted(sum(drive.queries, [])) == ['a', 'a1']
+
+    # A new subfolder changes a's child count -> every subfolder is re-listed, deeper ones still skipped
+    drive.queries.clear()
+    tree['a'].append(_folder('a3'))
+    tree['a3'] = [_csv('z')]
+    ingestor.walk_tree([('a', 'a', '2024-03-01T00:00:00Z', None)], "ROOT")
+    assert sorted(sum(drive.queries, [])) == ['a', 'a1', 'a2', 'a3']
+    assert ('z', 'ROOT/a/a3') in ingestor.dispatched
+    # The folder's own time drives rescans; drive_modified_at keeps the newest child's time
+    assert ingestor.folder_registry['a'] == '2024-03-01 00:00:00'
+    assert ingestor.newest_child['a'] == '2024-02-01 00:00:00'
+
+
+def test_reconcile_walks_moved_folders_and_dispatches_missed_csvs(ingestor, monkeypatch):
+    monkeypatch.setattr(etl_v2, "ROOT_FOLDER_ID", "root")
+    ingestor.folder_registry.update({'a': '2024-01-01 00:00:00', 'b': '2024-01-01 00:00:00'})
+    ingestor.reconcile_since = '2024-01-01T00:00:00'
+    ingestor.save_reconcile_mark = lambda started: None
+    tree = {'a': [_csv('in_a')], 'new': [_csv('in_new')]}
+    drive = FakeDrive(tree, search={
+        'folder': [dict(_folder('a', '2024-02-01T00:00:00Z'), parents=['root']),
+                   dict(_folder('new', '2024-02-01T00:00:00Z'), parents=['b']),
+                   dict(_folder('elsewhere', '2024-02-01T00:00:00Z'), parents=['other'])],
+        'csv': [dict(_csv('in_a'), parents=['a']), dict(_csv('in_b'), parents=['b']),
+                dict(_csv('outside'), parents=['other'])],
+    })
+    ingestor.get_service = lambda: drive
+    ingestor.reconcile()
+
+    assert sorted(sum(drive.queries, [])) == ['a', 'new']
+    # in_a came from listing a (not twice), in_b from the modifiedTime query, outside is ignored
+    assert sorted(d[0] for d in ingestor.dispatched) == ['in_a', 'in_b', 'in_new']
+
+
+def test_change_lineage_from_walk_and_lazy_parent_lookup(ingestor, monkeypatch):
+    monkeypatch.setattr(etl_v2, "ROOT_FOLDER_ID", "root")
+    ingestor.folder_paths = etl_v2.FolderPathCache("root")
+    drive = FakeDrive({'root': [_folder('a')], 'a': [_folder('b')], 'b': []})
+    ingestor.get_service = lambda: drive
+    ingestor.walk_tree(ingestor._roots([dict(_folder('a'), parents=['root'])]), "ROOT")
+
+    # Folders seen by the walk resolve without any API call
+    assert ingestor.lineage_of({'parents': ['b']}) == ('b', 'b', 'ROOT/a/b')
+    # An unseen folder is looked up once by ID, then cached
+    drive.folders['c'] = {'id': 'c', 'name': 'C', 'parents': ['b']}
+    assert ingestor.lineage_of({'parents': ['c']}) == ('c', 'C', 'ROOT/a/b/C')
+    assert ingestor.lineage_of({'parents': ['c']}) == ('c', 'C', 'ROOT/a/b/C')
+    assert drive.gets == ['c']
+    # Outside ROOT -> no lineage
+    drive.folders['x'] = {'id': 'x', 'name': 'X'}
+    assert ingestor.lineage_of({'parents': ['x']}) is None
+    assert drive.queries == [['a'], ['b']]
+
+
+def test_processed_file_index_and_bulk_filter(ingestor, tmp_path):
+    from sqlalchemy import create_engine, text
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE file_registry (drive_file_id TEXT, file_hash TEXT, status TEXT, "
+                          "md5_checksum TEXT, processed_at TEXT)"))
+        for fid, status, md5 in [('done', 'PROCESSED', 'c' * 32), ('failed', 'ERROR', None)]:
+            conn.execute(text("INSERT INTO file_registry VALUES (:id, :h, :s, :m, '2024-01-01')"), {
+                "id": fid, "h": etl_v2.GDriveHighSpeedIngestor.get_file_hash(fid, 'T1'), "s": status, "m": md5})
+    del ingestor.filter_changed
+    ingestor.engine = engine
+    items = [
+        {'id': 'done', 'modifiedTime': 'T1'},                              # unchanged -> skip
+        {'id': 'done', 'modifiedTime': 'T2'},                              # touched -> process
+        {'id': 'failed', 'modifiedTime': 'T1'},                            # not processed -> process
+        {'id': 'reupload', 'modifiedTime': 'T1', 'md5Checksum': 'c' * 32},  # same bytes -> skip
+    ]
+    expected = [items[1], items[2]]
+
+    ingestor.file_index = None  # 'query' mode: one IN query per call
+    assert ingestor.filter_changed(items) == expected
+
+    ingestor.file_index = etl_v2.ProcessedFileIndex()
+    with engine.connect() as conn:
+        ingestor.sync_file_index(conn)
+    assert len(ingestor.file_index) == 1
+    ingestor.engine = None  # memory mode must not touch the DB
+    assert ingestor.filter_changed(items) == expected
@@ -0,0 +1,51 @@
+import hashlib
+
+from model.robust_gdrive_etl_v2 import ValidationQualityProcessor
+
+
+class FakeConn:
+    def __init__(self, stored, has_column=True):
+        self.stored = stored  # dedup_sig values in raw_clean_google_map_data
+        self.has_column = has_column
+        self.queries = []
+
+    def execute(self, query, params):
+        sql = str(query)
+        self.queries.append(sql)
+        if "dedup_sig IN" in sql:
+            if not self.has_column:
+                raise RuntimeError("(1054, \"Unknown column 'dedup_sig' in 'where clause'\")")
+            return [(h,) for h in params["sigs"] if h in self.stored]
+        return FakeResult([])
+
+
+class FakeResult(list):
+    def fetchall(self):
+        return list(self)
+
+
+def _processor():
+    return ValidationQualityProcessor(engine=None, shutdown_event=None)
+
+
+def test_signature_hash_matches_the_generated_column_expression():
+    # MD5(CONCAT_WS('|', phone, LOWER(TRIM(name)), LOWER(TRIM(address)), LOWER(TRIM(city))))
+    expected = hashlib.md5("9876543210|cafe one|1 main st|pune".encode()).digest()
+    assert ValidationQualityProcessor.signature_hash(("9876543210", " Cafe One ", "1 Main St", "PUNE")) == expected
+
+
+def test_duplicates_are_found_with_one_indexed_lookup():
+    known = ("9876543210", "cafe one", "1 main st", "pune")
+    fresh = ("9000000000", "new shop", "2 side rd", "pune")
+    conn = FakeConn({ValidationQualityProcessor.signature_hash(known)})
+    assert _processor().check_duplicates_batch({known, fresh}, conn) == {known}
+    assert len(conn.queries) == 1 and "LOWER(" not in conn.queries[0]
+
+
+def test_falls_back_to_scan_before_the_migration():
+    processor = _processor()
+    conn = FakeConn(set(), has_column=False)
+    sig = ("9876543210", "cafe one", "1 main st", "pune")
+    assert processor.check_duplicates_batch({sig}, conn) == set()
+    assert not processor._dedup_sig_column
+    assert "LOWER(TRIM(name))" in conn.queries[-1]
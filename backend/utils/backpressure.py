@@ -0,0 +1,118 @@
+"""
+Broker backpressure for the GDrive scanner.
+
+The broker Redis is small and runs allkeys-lru, so an unbounded backlog can get
+queued task messages evicted. Before publishing a batch the scanner asks whether
+the cluster is keeping up: it pauses once queue depth, Redis memory use or worker
+lag passes its high-water mark, and resumes only when every signal is back under
+its low-water mark (hysteresis, so it does not flap around one threshold).
+"""
+import json
+import logging
+import threading
+import time
+
+from config import config
+from utils.metrics import backpressure_signal, scanner_throttle_seconds, scanner_throttled
+from utils.redis_pool import get_redis
+
+logger = logging.getLogger("Backpressure")
+
+
+def _enqueued_at(raw):
+    """etl_enqueued_at header of a raw kombu message (None if absent / unparsable)."""
+    if not raw:
+        return None
+    try:
+        return float(json.loads(raw)["headers"]["etl_enqueued_at"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class BrokerBackpressure:
+    def __init__(self, client, queues, queue_high, queue_low, mem_high, mem_low,
+                 lag_high, lag_low, poll_seconds=5.0, stop_event=None):
+        self.client = client
+        self.queues = tuple(queues)
+        self.high = {"queue_depth": queue_high, "redis_memory": mem_high, "worker_lag": lag_high}
+        self.low = {"queue_depth": queue_low, "redis_memory": mem_low, "worker_lag": lag_low}
+        self.poll_seconds = poll_seconds
+        self.stop_event = stop_event or threading.Event()
+        self.throttled = False
+        self.reason = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    @classmethod
+    def from_config(cls, queues, stop_event=None):
+        return cls(
+            get_redis(), queues,
+            config.BACKPRESSURE_QUEUE_HIGH, config.BACKPRESSURE_QUEUE_LOW,
+            config.BACKPRESSURE_REDIS_MEM_HIGH, config.BACKPRESSURE_REDIS_MEM_LOW,
+            config.BACKPRESSURE_LAG_HIGH_SECONDS, config.BACKPRESSURE_LAG_LOW_SECONDS,
+            config.BACKPRESSURE_POLL_SECONDS, stop_event,
+        )
+
+    def sample(self):
+        """{signal: value}: queued messages, Redis used/maxmemory, age of the oldest queued ETL task."""
+        pipe = self.client.pipeline(transaction=False)
+        for queue_name in self.queues:
+            pipe.llen(queue_name)
+            pipe.lindex(queue_name, -1)  # Workers BRPOP from the right: this is the oldest message
+        results = pipe.execute()
+        now = time.time()
+        ages = [now - t for t in map(_enqueued_at, results[1::2]) if t]
+        info = self.client.info("memory")
+        maxmemory = int(info.get("maxmemory") or 0)
+        return {
+            "queue_depth": sum(int(n) for n in results[0::2]),
+            "redis_memory": int(info.get("used_memory", 0)) / maxmemory if maxmemory else None,
+            "worker_lag": max(ages) if ages else 0.0,
+        }
+
+    def check(self, force=False):
+        """Current throttle state, re-sampled at most every poll_seconds. Fails open on Redis errors."""
+        with self._lock:
+            if not force and time.monotonic() - self._checked_at < self.poll_seconds:
+                return self.throttled
+            self._checked_at = time.monotonic()
+            try:
+                signals = self.sample()
+            except Exception as e:
+                logger.warning(f"⚠️ Backpressure check failed ({e}); not throttling")
+                self.throttled, self.reason = False, None
+                scanner_throttled.set(0)
+                return False
+            for name, value in signals.items():
+                if value is not None:
+                    backpressure_signal.labels(signal=name).set(value)
+
+            def over(limits):
+                return [f"{name}={value:.2f}" if isinstance(value, float) else f"{name}={value}"
+                        for name, value in signals.items()
+                        if value is not None and limits[name] and value > limits[name]]
+
+            if not self.throttled:
+                above_high = over(self.high)
+                if above_high:
+                    self.throttled, self.reason = True, ", ".join(above_high)
+            else:
+                still_high = over(self.low)
+                self.throttled = bool(still_high)
+                self.reason = ", ".join(still_high) or None
+            scanner_throttled.set(1 if self.throttled else 0)
+            return self.throttled
+
+    def wait(self):
+        """Block while throttled (or until stop_event is set). Returns the seconds paused."""
+        if not self.check():
+            return 0.0
+        start = time.monotonic()
+        logger.warning(f"⏸️ Scanner paused by backpressure: {self.reason}")
+        while not self.stop_event.wait(self.poll_seconds):
+            if not self.check():  # Scanner threads waiting together share one sample per poll
+                break
+        paused = time.monotonic() - start
+        scanner_throttle_seconds.inc(paused)
+        logger.info(f"▶️ Scanner resumed after {paused:.0f}s")
+        return paused
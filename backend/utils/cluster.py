@@ -0,0 +1,103 @@
+"""
+Redis-lease membership, leader election and folder sharding for gdrive-orchestrator.
+
+Every orchestrator instance heartbeats its membership lease; one of them also holds the
+leader lease and runs the singleton duties (change feed, reconciliation, validation).
+Top-level Drive folders are spread over the live members with a consistent-hash ring,
+so instances on different nodes scan disjoint subtrees. A node that stops heartbeating
+drops out once its lease expires and the survivors' rings take over its folders.
+"""
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from utils.redis_lease import RELEASE_LUA, RENEW_LUA
+
+logger = logging.getLogger("Cluster")
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes: a member joining or leaving moves only ~1/N of the keys."""
+    def __init__(self, nodes, replicas=64):
+        self.nodes = sorted(set(nodes))
+        self._ring = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._points = [point for point, _ in self._ring]
+
+    def owner(self, key):
+        if not self._ring:
+            return None
+        i = bisect.bisect(self._points, _hash(key)) % len(self._ring)
+        return self._ring[i][1]
+
+
+class ClusterMembership:
+    def __init__(self, client, lease_seconds=60, prefix="etl:orchestrator", node_id=None):
+        self.client = client
+        self.lease_seconds = lease_seconds
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.members_key = f"{prefix}:members"
+        self.leader_key = f"{prefix}:leader"
+        self.is_leader = False
+        self._renewed_at = 0.0
+        self._renew = client.register_script(RENEW_LUA)
+        self._release = client.register_script(RELEASE_LUA)
+
+    def heartbeat(self):
+        """Renew this node's membership lease and keep (or try to take) the leader lease."""
+        now = time.time()
+        ms = int(self.lease_seconds * 1000)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(self.members_key, {self.node_id: now + self.lease_seconds})
+        pipe.zremrangebyscore(self.members_key, "-inf", now)  # Expired leases = dead nodes
+        pipe.execute()
+        was_leader = self.is_leader
+        if self.is_leader:
+            self.is_leader = bool(self._renew(keys=[self.leader_key], args=[self.node_id, ms]))
+        if not self.is_leader:
+            self.is_leader = bool(self.client.set(self.leader_key, self.node_id, nx=True, px=ms))
+        self._renewed_at = time.monotonic()
+        if self.is_leader != was_leader:
+            logger.info(f"👑 {self.node_id} {'is now' if self.is_leader else 'is no longer'} the orchestrator leader")
+
+    def members(self):
+        """Live node ids (membership lease not expired)."""
+        return sorted(m.decode() if isinstance(m, bytes) else m
+                      for m in self.client.zrangebyscore(self.members_key, time.time(), "+inf"))
+
+    def ring(self):
+        return HashRing(self.members() or [self.node_id])
+
+    def start(self, stop_event):
+        """Heartbeat now, then every lease/3 in a daemon thread until stop_event is set."""
+        self.heartbeat()
+
+        def loop():
+            while not stop_event.wait(self.lease_seconds / 3):
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    logger.warning(f"⚠️ Cluster heartbeat failed: {e}")
+                    if self.is_leader and time.monotonic() - self._renewed_at > self.lease_seconds:
+                        # Our lease has expired by now: someone else may be leading
+                        self.is_leader = False
+                        logger.warning(f"👑 {self.node_id} dropped leadership (lease not renewed)")
+
+        threading.Thread(target=loop, name="ClusterHeartbeat", daemon=True).start()
+
+    def leave(self):
+        """Give up both leases so the survivors take over without waiting for expiry."""
+        try:
+            self.client.zrem(self.members_key, self.node_id)
+            self._release(keys=[self.leader_key], args=[self.node_id])
+        except Exception as e:
+            logger.warning(f"Failed to leave cluster cleanly: {e}")
+        self.is_leader = False
@@ -0,0 +1,37 @@
+"""
+Which Drive uploads the ETL ingests: plain CSVs and compressed ones.
+
+.csv.gz / .gz are gunzipped while the download streams; a .zip is ingested member by
+member (every .csv inside it). Rows from any of them keep the Drive file's lineage.
+"""
+import posixpath
+
+# For Drive `name contains` queries (prefix match on name tokens)
+NAME_TOKENS = ('.csv', '.gz', '.zip')
+
+
+def archive_format(file_name):
+    """'gzip', 'zip' or None (plain CSV) from the Drive file name."""
+    name = (file_name or '').lower()
+    if name.endswith('.zip'):
+        return 'zip'
+    if name.endswith('.gz'):
+        return 'gzip'
+    return None
+
+
+def is_ingestible(file_name):
+    """.csv, .csv.gz, bare .gz (e.g. shops.gz) or .zip; not other gzipped types such as .json.gz."""
+    name = (file_name or '').lower()
+    if name.endswith(('.csv', '.zip', '.csv.gz')):
+        return True
+    if name.endswith('.gz'):
+        return '.' not in name[:-3]
+    return False
+
+
+def is_csv_member(member_name):
+    """CSV members of a .zip, skipping directories and macOS resource forks."""
+    base = posixpath.basename(member_name)
+    return (member_name.lower().endswith('.csv') and not member_name.startswith('__MACOSX/')
+            and not base.startswith('._'))
@@ -4,6 +4,12 @@ from extensions import db
 
 logger = logging.getLogger(__name__)
 
+# Duplicate signature of a clean row; ValidationQualityProcessor.signature_hash computes the same digest
+DEDUP_SIG_EXPR = (
+    "UNHEX(MD5(CONCAT_WS('|', COALESCE(phone_number, ''), LOWER(TRIM(COALESCE(name, ''))), "
+    "LOWER(TRIM(COALESCE(address, ''))), LOWER(TRIM(COALESCE(city, ''))))))"
+)
+
 
 def _table_exists(engine, table_name):
     """Check if a table exists using SQLAlchemy inspect (no open transaction needed)."""
@@ -38,6 +44,39 @@ def run_pending_migrations(app):
                     except Exception as e:
                         logger.warning(f"⚠️ drive_folder_registry migration skipped: {e}")
                         raise
+
+                # Folder-tree index: parent link, direct child count and the folder's own Drive
+                # modifiedTime drive incremental rescans (drive_modified_at keeps the newest child's time)
+                tree_columns = [
+                    ("parent_id", "VARCHAR(200)"),
+                    ("child_count", "INT"),
+                    ("folder_modified_at", "VARCHAR(100)"),
+                ]
+                for col_name, col_type in tree_columns:
+                    with engine.begin() as conn:
+                        try:
+                            col_check = text("""
+                                SELECT COUNT(*) FROM information_schema.COLUMNS
+                                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'drive_folder_registry' AND COLUMN_NAME = :col
+                            """)
+                            if conn.execute(col_check, {"col": col_name}).scalar() == 0:
+                                conn.execute(text(f"ALTER TABLE drive_folder_registry ADD COLUMN {col_name} {col_type}"))
+                                logger.info(f"✅ Column `{col_name}` added to drive_folder_registry.")
+                        except Exception as e:
+                            logger.error(f"❌ Failed to add `{col_name}` to drive_folder_registry: {e}")
+
+                with engine.begin() as conn:
+                    try:
+                        idx_check = text("""
+                            SELECT COUNT(1) FROM INFORMATION_SCHEMA.STATISTICS
+                            WHERE table_schema = DATABASE() AND table_name = 'drive_folder_registry'
+                            AND index_name = 'idx_folder_parent'
+                        """)
+                        if conn.execute(idx_check).scalar() == 0:
+                            conn.execute(text("CREATE INDEX idx_folder_parent ON drive_folder_registry(parent_id)"))
+                            logger.info("✅ Created index: idx_folder_parent")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to create index idx_folder_parent: {e}")
             else:
                 logger.warning("⏩ Table `drive_folder_registry` does not exist yet. Skipping ENUM update.")
 
@@ -110,6 +149,40 @@ def run_pending_migrations(app):
                     except Exception as e:
                         logger.error(f"❌ Failed to add `file_hash` to file_registry: {e}")
                         raise
+
+                # Row/byte resume checkpoints written after every committed batch
+                checkpoint_columns = [
+                    ("last_processed_row", "INT DEFAULT 0"),
+                    ("last_processed_byte", "BIGINT DEFAULT 0"),
+                    # Drive content identity: byte-identical re-uploads are skipped by checksum
+                    ("md5_checksum", "VARCHAR(32)"),
+                    ("file_size", "BIGINT"),
+                ]
+                for col_name, col_type in checkpoint_columns:
+                    with engine.begin() as conn:
+                        try:
+                            col_check = text("""
+                                SELECT COUNT(*) FROM information_schema.COLUMNS
+                                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'file_registry' AND COLUMN_NAME = :col
+                            """)
+                            if conn.execute(col_check, {"col": col_name}).scalar() == 0:
+                                conn.execute(text(f"ALTER TABLE file_registry ADD COLUMN {col_name} {col_type}"))
+                                logger.info(f"✅ Column `{col_name}` added to file_registry.")
+                        except Exception as e:
+                            logger.error(f"❌ Failed to add `{col_name}` to file_registry: {e}")
+
+                with engine.begin() as conn:
+                    try:
+                        idx_check = text("""
+                            SELECT COUNT(1) FROM INFORMATION_SCHEMA.STATISTICS
+                            WHERE table_schema = DATABASE() AND table_name = 'file_registry'
+                            AND index_name = 'idx_file_registry_md5'
+                        """)
+                        if conn.execute(idx_check).scalar() == 0:
+                            conn.execute(text("CREATE INDEX idx_file_registry_md5 ON file_registry(md5_checksum, status)"))
+                            logger.info("✅ Created index: idx_file_registry_md5")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to create index idx_file_registry_md5: {e}")
             else:
                 logger.warning("⏩ Table `file_registry` does not exist yet. Skipping column update.")
 
@@ -167,6 +240,14 @@ def run_pending_migrations(app):
                                 valid_count INT, duplicate_count INT, cleaned_count INT, last_id BIGINT, timestamp DATETIME
                             );
                         """),
+                        ("validation_range_lease", """
+                            CREATE TABLE IF NOT EXISTS validation_range_lease (
+                                start_id BIGINT PRIMARY KEY, end_id BIGINT NOT NULL,
+                                status ENUM('LEASED', 'DONE') NOT NULL DEFAULT 'LEASED',
+                                owner VARCHAR(100), lease_expires DOUBLE,
+                                INDEX idx_range_status (status, lease_expires)
+                            ) ENGINE=InnoDB;
+                        """),
                         ("invalid_google_map_data", """
                             CREATE TABLE IF NOT EXISTS invalid_google_map_data (
                                 id BIGINT AUTO_INCREMENT PRIMARY KEY, raw_id BIGINT,
@@ -192,6 +273,40 @@ def run_pending_migrations(app):
                 except Exception as e:
                     logger.error(f"❌ Failed to ensure validation tables exist: {e}")
 
+            # === ISSUE 7: Indexed duplicate signature on raw_clean_google_map_data ===
+            # ValidationQualityProcessor looks duplicates up by this hash (one indexed IN) instead of
+            # scanning LOWER(TRIM(...)) predicates. The column is VIRTUAL, so adding it is metadata-only
+            # and every writer fills it implicitly; the online index build (INPLACE, LOCK=NONE) is the
+            # backfill and keeps the table writable meanwhile.
+            if _table_exists(engine, 'raw_clean_google_map_data'):
+                with engine.begin() as conn:
+                    try:
+                        col_check = text("""
+                            SELECT COUNT(*) FROM information_schema.COLUMNS
+                            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'raw_clean_google_map_data' AND COLUMN_NAME = 'dedup_sig'
+                        """)
+                        if conn.execute(col_check).scalar() == 0:
+                            conn.execute(text(f"""
+                                ALTER TABLE raw_clean_google_map_data
+                                ADD COLUMN dedup_sig BINARY(16) AS ({DEDUP_SIG_EXPR}) VIRTUAL,
+                                ALGORITHM=INPLACE, LOCK=NONE
+                            """))
+                            logger.info("✅ Column `dedup_sig` added to raw_clean_google_map_data.")
+                        idx_check = text("""
+                            SELECT COUNT(1) FROM INFORMATION_SCHEMA.STATISTICS
+                            WHERE table_schema = DATABASE() AND table_name = 'raw_clean_google_map_data'
+                            AND index_name = 'idx_clean_dedup_sig'
+                        """)
+                        if conn.execute(idx_check).scalar() == 0:
+                            logger.info("⏳ Building idx_clean_dedup_sig online (table stays writable)...")
+                            conn.execute(text("""
+                                ALTER TABLE raw_clean_google_map_data
+                                ADD INDEX idx_clean_dedup_sig (dedup_sig), ALGORITHM=INPLACE, LOCK=NONE
+                            """))
+                            logger.info("✅ Created index: idx_clean_dedup_sig")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to add dedup_sig to raw_clean_google_map_data: {e}")
+
             print("🏁 DB Migrations check complete.")
 
         except Exception as e:
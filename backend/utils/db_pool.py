@@ -0,0 +1,69 @@
+"""
+Process-scoped SQLAlchemy pool for Celery ETL workers.
+One engine per worker process, hard-capped by a connection budget, with
+checkout-wait metrics so pool starvation shows up in Prometheus.
+
+gevent: celery_app monkey-patches threading before any task module is
+imported, so QueuePool's lock/condition are greenlet-aware and a greenlet
+waiting for a connection yields to the hub instead of blocking the process.
+"""
+import time
+import logging
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.pool import QueuePool
+from utils.metrics import db_pool_checkout_wait, db_pool_checked_out, db_pool_size, db_pool_timeouts
+
+logger = logging.getLogger(__name__)
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except sa_exc.TimeoutError:
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start)
+        db_pool_checked_out.inc()
+        return record
+
+    def _do_return_conn(self, record):
+        db_pool_checked_out.dec()
+        super()._do_return_conn(record)
+
+
+def is_prefork(pool_cls):
+    """True if Celery runs tasks in child processes (one task per process at a time)."""
+    name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, '__module__', '')
+    name = (name or 'prefork').lower()
+    return 'prefork' in name or name == 'processes'
+
+
+def pool_size_for(concurrency, budget, prefork=False):
+    """
+    Connections each worker process may hold.
+    gevent/threads: one process runs `concurrency` tasks -> min(concurrency, budget).
+    prefork: `concurrency` processes share the budget, each runs one task at a time.
+    Every process gets at least one connection, so a warning is logged when that overshoots.
+    """
+    concurrency = max(1, int(concurrency or 1))
+    budget = max(1, int(budget))
+    if prefork:
+        size = max(1, min(2, budget // concurrency))
+        if concurrency * size > budget:
+            # Every process needs at least one connection: the budget cannot hold here
+            logger.warning(f"⚠️ {concurrency} prefork processes x {size} connection(s) exceed "
+                           f"ETL_DB_CONNECTION_BUDGET={budget}; lower -c or raise the budget")
+        return size
+    return min(concurrency, budget)
+
+
+def create_pooled_engine(url, pool_size, **kwargs):
+    """Engine on a MeteredQueuePool of exactly `pool_size` connections (no overflow)."""
+    engine = create_engine(url, poolclass=MeteredQueuePool, pool_size=pool_size, max_overflow=0, **kwargs)
+    db_pool_size.set(pool_size)
+    return engine
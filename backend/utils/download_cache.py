@@ -0,0 +1,191 @@
+"""
+Opt-in on-disk cache of downloaded Drive CSVs.
+
+Entries are keyed by Drive md5Checksum (content-addressed: a copy under another file
+ID is a hit too), else by file_id + modifiedTime. A download is written to a temp file
+while it streams and only renamed into place once the whole file was read, so readers
+never see a partial entry. The directory is kept under DOWNLOAD_CACHE_MAX_MB by
+evicting least-recently-used entries (a hit bumps the entry's mtime).
+"""
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from config import config
+
+logger = logging.getLogger("DownloadCache")
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+_SUFFIXES = {"none": ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+_TMP_PREFIX = ".tmp-"
+_STALE_TMP_SECONDS = 3600
+
+
+def download_cache_key(file_id, md5_checksum=None, modified_time=None):
+    if md5_checksum:
+        return md5_checksum.lower()
+    return hashlib.sha1(f"{file_id}|{modified_time or ''}".encode("utf-8")).hexdigest()
+
+
+class _CacheWriter:
+    """Streams one download into a temp file; commit() publishes it atomically, abort() drops it."""
+    def __init__(self, cache, path, compression):
+        self.cache = cache
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=_TMP_PREFIX)
+        self._raw = os.fdopen(fd, "wb")
+        if compression == "gzip":
+            self._f = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=1)
+        elif compression == "zstd":
+            self._f = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        else:
+            self._f = self._raw
+        self.done = False
+
+    def write(self, data):
+        if self.done:
+            return
+        try:
+            self._f.write(data)
+        except OSError as e:
+            # A full or broken cache disk must never fail the ingestion itself
+            logger.warning(f"⚠️ Download cache write failed, not caching {os.path.basename(self.path)}: {e}")
+            self.abort()
+
+    def _close(self):
+        if self._f is not self._raw:
+            self._f.close()
+        self._raw.close()
+
+    def commit(self):
+        if self.done:
+            return
+        try:
+            self._close()
+            os.replace(self.tmp_path, self.path)
+            self.done = True
+        except OSError as e:
+            logger.warning(f"⚠️ Download cache commit failed for {os.path.basename(self.path)}: {e}")
+            self.abort()
+            return
+        self.cache.added(os.path.getsize(self.path))
+
+    def abort(self):
+        self.done = True
+        try:
+            self._close()
+        except OSError:
+            pass
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class DownloadCache:
+    def __init__(self, root, max_bytes, compression="gzip"):
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed. Download cache falls back to gzip.")
+            compression = "gzip"
+        if compression not in _SUFFIXES:
+            raise ValueError(f"Unknown DOWNLOAD_CACHE_COMPRESSION: {compression}")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._added_since_evict = None  # None = not scanned yet in this process
+
+    def _path(self, key, compression):
+        return os.path.join(self.root, key[:2], key + _SUFFIXES[compression])
+
+    def open(self, key):
+        """Decompressed binary reader over a cached download, or None on a miss."""
+        # Entries written under an earlier compression setting stay readable
+        for compression in (self.compression, *(c for c in _SUFFIXES if c != self.compression)):
+            path = self._path(key, compression)
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            try:
+                os.utime(path)  # LRU: eviction drops the least recently read entries first
+            except OSError:
+                pass
+            if compression == "gzip":
+                return gzip.GzipFile(fileobj=f, mode="rb")
+            if compression == "zstd":
+                if not ZSTD_AVAILABLE:
+                    f.close()
+                    continue
+                return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+            return f
+        return None
+
+    def writer(self, key):
+        return _CacheWriter(self, self._path(key, self.compression), self.compression)
+
+    def added(self, size):
+        """Account for a new entry; re-scan the directory once ~5% of the budget was written since the last scan."""
+        with self._lock:
+            due = self._added_since_evict is None or self._added_since_evict + size > self.max_bytes // 20
+            self._added_since_evict = 0 if due else self._added_since_evict + size
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits max_bytes. Returns bytes freed."""
+        entries, total, now = [], 0, time.time()
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue  # Evicted or renamed by another worker meanwhile
+                if name.startswith(_TMP_PREFIX):
+                    if now - st.st_mtime > _STALE_TMP_SECONDS:  # Left behind by a killed worker
+                        self._unlink(path)
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            self._unlink(path)
+            freed += size
+        if freed:
+            logger.debug(f"Download cache evicted {freed / 1048576:.1f} MB")
+        return freed
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_download_cache():
+    """Process-wide cache, or None unless DOWNLOAD_CACHE_DIR is set."""
+    global _cache
+    if _cache is None and config.DOWNLOAD_CACHE_DIR:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DownloadCache(config.DOWNLOAD_CACHE_DIR, config.DOWNLOAD_CACHE_MAX_MB * 1024 * 1024,
+                                       config.DOWNLOAD_CACHE_COMPRESSION)
+    return _cache
@@ -0,0 +1,140 @@
+"""
+Cluster-wide Google Drive API rate limiting.
+
+One Redis token bucket per (service account, API method) is shared by the scanner
+threads and every Celery worker/greenlet, so the fleet spends its Drive quota at a
+steady rate instead of discovering the limit through storms of 429s. Refill and
+take happen in ONE Lua call on Redis' own clock, so hosts never disagree on state.
+
+If Redis is unreachable the limiter fails open for a short while: calls go out
+unthrottled and retry_on_429 / the circuit breaker remain the safety net.
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+import redis
+
+from config import config
+from utils.metrics import drive_rate_tokens, drive_rate_wait
+from utils.redis_pool import get_redis
+
+logger = logging.getLogger("DriveRateLimit")
+
+# KEYS[1] = bucket hash; ARGV[1] = refill rate (tokens/s), ARGV[2] = capacity, ARGV[3] = tokens wanted
+# Returns {granted, wait_ms, tokens_left_milli} (Lua numbers come back as integers)
+_TAKE_LUA = """
+if redis.replicate_commands then redis.replicate_commands() end
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local wanted = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted, wait = 0, 0
+if tokens >= wanted then
+    tokens = tokens - wanted
+    granted = 1
+else
+    wait = (wanted - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return {granted, math.ceil(wait * 1000), math.floor(tokens * 1000)}
+"""
+
+_FAIL_OPEN_SECONDS = 30
+
+
+class RedisTokenBucket:
+    def __init__(self, client, name, rate, capacity):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._script = client.register_script(_TAKE_LUA)
+
+    def try_take(self, tokens=1):
+        """(granted, seconds until enough tokens, tokens left)."""
+        tokens = min(tokens, self.capacity)
+        granted, wait_ms, left = self._script(keys=[self.name], args=[self.rate, self.capacity, tokens])
+        return bool(granted), wait_ms / 1000.0, left / 1000.0
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` were taken; returns (seconds spent waiting, tokens left)."""
+        start = time.perf_counter()
+        while True:
+            granted, wait, left = self.try_take(tokens)
+            if granted:
+                return time.perf_counter() - start, left
+            # Jitter so waiters across the fleet don't all wake on the same millisecond
+            time.sleep(wait * random.uniform(1.0, 1.2))
+
+
+_buckets = {}
+_lock = threading.Lock()
+_account = None
+_unavailable_until = 0.0
+
+
+def _method_rates():
+    return {
+        "list": config.DRIVE_LIST_QPS,
+        "get": config.DRIVE_LIST_QPS,
+        "get_media": config.DRIVE_GET_MEDIA_QPS,
+        "changes": config.DRIVE_CHANGES_QPS,
+    }
+
+
+def service_account_key():
+    """client_email of the service account the quota belongs to ('default' if unreadable)."""
+    global _account
+    if _account is None:
+        try:
+            with open(config.SERVICE_ACCOUNT_FILE) as f:
+                _account = json.load(f).get("client_email") or "default"
+        except (OSError, ValueError):
+            _account = "default"
+    return _account
+
+
+def get_bucket(method):
+    """Shared bucket for a Drive API method, or None if that method is unlimited."""
+    bucket = _buckets.get(method)
+    if bucket is None:
+        rate = _method_rates().get(method, 0)
+        if rate <= 0:
+            return None
+        with _lock:
+            bucket = _buckets.get(method)
+            if bucket is None:
+                bucket = RedisTokenBucket(
+                    get_redis(config.DRIVE_RATE_REDIS_URL),
+                    f"drive_ratelimit:{service_account_key()}:{method}",
+                    rate, rate * config.DRIVE_RATE_BURST_SECONDS,
+                )
+                _buckets[method] = bucket
+    return bucket
+
+
+def acquire_drive_quota(method, tokens=1):
+    """Wait for a cluster-wide slot before a Drive `method` call ('list', 'get', 'get_media', 'changes')."""
+    global _unavailable_until
+    if not config.DRIVE_RATE_LIMIT or time.time() < _unavailable_until:
+        return 0.0
+    bucket = get_bucket(method)
+    if bucket is None:
+        return 0.0
+    try:
+        waited, left = bucket.acquire(tokens)
+    except redis.RedisError as e:
+        _unavailable_until = time.time() + _FAIL_OPEN_SECONDS
+        logger.warning(f"⚠️ Drive rate limiter unavailable ({e}); unthrottled for {_FAIL_OPEN_SECONDS}s")
+        return 0.0
+    drive_rate_wait.labels(method=method).observe(waited)
+    drive_rate_tokens.labels(method=method).set(left)
+    return waited
@@ -0,0 +1,80 @@
+"""
+Process-wide Google Drive API clients.
+
+Service-account credentials are loaded ONCE per process and refreshed ahead of
+expiry, so tasks share one OAuth token instead of each re-reading the key file and
+paying for a token exchange on its first request. The Drive v3 discovery document is
+parsed once from a static file (DRIVE_DISCOVERY_FILE, default: the copy bundled with
+google-api-python-client) and never fetched over the network.
+
+Building a service from the parsed document is cheap, so every caller still gets its
+own client: httplib2 connections must not be shared between threads or greenlets.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import google_auth_httplib2
+import googleapiclient
+import httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build_from_document
+
+from config import config
+
+logger = logging.getLogger("DriveService")
+
+SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+BUNDLED_DISCOVERY_FILE = os.path.join(os.path.dirname(googleapiclient.__file__),
+                                      'discovery_cache', 'documents', 'drive.v3.json')
+
+_lock = threading.Lock()
+_credentials = None
+_document = None
+
+
+def discovery_document():
+    """Parsed Drive v3 discovery document (read from disk once per process)."""
+    global _document
+    if _document is None:
+        with _lock:
+            if _document is None:
+                with open(config.DRIVE_DISCOVERY_FILE or BUNDLED_DISCOVERY_FILE, encoding='utf-8') as f:
+                    _document = json.load(f)
+    return _document
+
+
+def _expires_soon(creds):
+    if not creds.token or creds.expiry is None:
+        return True
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth keeps expiry as naive UTC
+    return creds.expiry - now < timedelta(seconds=config.DRIVE_TOKEN_REFRESH_MARGIN)
+
+
+def credentials():
+    """Shared service-account credentials, refreshed DRIVE_TOKEN_REFRESH_MARGIN seconds before expiry."""
+    global _credentials
+    creds = _credentials
+    if creds is not None and not _expires_soon(creds):
+        return creds
+    with _lock:  # One refresh per process, however many tasks start at the same moment
+        if _credentials is None:
+            if not os.path.exists(config.SERVICE_ACCOUNT_FILE):
+                raise FileNotFoundError(f"Service account file not found at: {config.SERVICE_ACCOUNT_FILE}")
+            _credentials = service_account.Credentials.from_service_account_file(
+                config.SERVICE_ACCOUNT_FILE, scopes=SCOPES
+            )
+        if _expires_soon(_credentials):
+            _credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
+            logger.debug(f"Drive token refreshed (expires {_credentials.expiry:%H:%M:%S} UTC)")
+        return _credentials
+
+
+def build_service(creds=None):
+    """New Drive v3 client on the shared credentials and discovery document."""
+    client_options = {"api_endpoint": config.DRIVE_API_ENDPOINT} if config.DRIVE_API_ENDPOINT else None
+    return build_from_document(discovery_document(), credentials=creds or credentials(),
+                               client_options=client_options)
+
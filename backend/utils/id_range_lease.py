@@ -0,0 +1,102 @@
+"""
+Id-range leases that let several validation workers share raw_google_map_drive_data.
+
+Ranges of `span` ids are handed out consecutively above the watermark
+(etl_metadata.last_processed_id) and recorded in validation_range_lease. A worker
+marks its range DONE in the same transaction as its writes; the watermark then only
+moves across a contiguous run of DONE ranges, so it keeps meaning "everything up to
+here is validated" and a crashed worker's range is re-leased once its lease expires.
+The watermark row doubles as the lock that serializes claims and advances.
+"""
+import logging
+import time
+
+from sqlalchemy import text
+
+logger = logging.getLogger("IdRangeLease")
+
+WATERMARK_KEY = "last_processed_id"
+
+
+class IdRangeLeases:
+    lock_clause = " FOR UPDATE"
+
+    def __init__(self, engine, owner, span=2000, lease_seconds=300,
+                 source_table="raw_google_map_drive_data", initial_watermark=None):
+        self.engine = engine
+        self.owner = owner
+        self.span = span
+        self.lease_seconds = lease_seconds
+        self.source_table = source_table
+        self.initial_watermark = initial_watermark  # callable: cursor to start from if etl_metadata has none
+
+    def _lock_watermark(self, conn):
+        row = conn.execute(text(
+            f"SELECT meta_value FROM etl_metadata WHERE meta_key = :k{self.lock_clause}"), {"k": WATERMARK_KEY}).fetchone()
+        if row is not None and str(row[0]).isdigit():
+            return int(row[0])
+        start = int(self.initial_watermark() if self.initial_watermark else 0)
+        if row is None:
+            conn.execute(text("INSERT INTO etl_metadata (meta_key, meta_value) VALUES (:k, :v)"),
+                         {"k": WATERMARK_KEY, "v": str(start)})
+        else:
+            conn.execute(text("UPDATE etl_metadata SET meta_value = :v WHERE meta_key = :k"),
+                         {"k": WATERMARK_KEY, "v": str(start)})
+        return start
+
+    def claim(self):
+        """(start_id, end_id) now leased to this owner, or None when there is nothing to validate."""
+        now = time.time()
+        with self.engine.begin() as conn:
+            watermark = self._lock_watermark(conn)
+            # A crashed or stalled worker's range comes first: the watermark is waiting on it
+            expired = conn.execute(text("""
+                SELECT start_id, end_id FROM validation_range_lease
+                WHERE status = 'LEASED' AND lease_expires < :now ORDER BY start_id LIMIT 1
+            """), {"now": now}).fetchone()
+            if expired is not None:
+                conn.execute(text("""
+                    UPDATE validation_range_lease SET owner = :owner, lease_expires = :expires WHERE start_id = :start
+                """), {"owner": self.owner, "expires": now + self.lease_seconds, "start": expired[0]})
+                logger.info(f"♻️ {self.owner} took over expired validation range {expired[0]}-{expired[1]}")
+                return int(expired[0]), int(expired[1])
+
+            leased_to = conn.execute(text("SELECT MAX(end_id) FROM validation_range_lease")).scalar()
+            start = max(watermark, int(leased_to or 0)) + 1
+            max_id = conn.execute(text(f"SELECT MAX(id) FROM {self.source_table}")).scalar()
+            if not max_id or start > max_id:
+                return None
+            end = min(start + self.span - 1, int(max_id))
+            conn.execute(text("""
+                INSERT INTO validation_range_lease (start_id, end_id, status, owner, lease_expires)
+                VALUES (:start, :end, 'LEASED', :owner, :expires)
+            """), {"start": start, "end": end, "owner": self.owner, "expires": now + self.lease_seconds})
+            return start, end
+
+    def complete(self, conn, start_id):
+        """Mark a range DONE inside the caller's write transaction. False if the lease was taken over meanwhile."""
+        done = conn.execute(text("""
+            UPDATE validation_range_lease SET status = 'DONE' WHERE start_id = :start AND owner = :owner
+        """), {"start": start_id, "owner": self.owner}).rowcount
+        if not done:
+            # The new holder redoes the range; validation writes are INSERT IGNORE, so that is harmless
+            logger.warning(f"⚠️ Validation range {start_id} was re-leased before {self.owner} finished it")
+        return bool(done)
+
+    def advance(self):
+        """Move the watermark across contiguous DONE ranges (dropping their lease rows). Returns it."""
+        with self.engine.begin() as conn:
+            watermark = start = self._lock_watermark(conn)
+            ranges = conn.execute(text("""
+                SELECT start_id, end_id, status FROM validation_range_lease ORDER BY start_id LIMIT 1000
+            """)).fetchall()
+            for range_start, range_end, status in ranges:
+                if status != 'DONE' or int(range_start) > watermark + 1:
+                    break
+                watermark = max(watermark, int(range_end))
+            if watermark != start:
+                conn.execute(text("DELETE FROM validation_range_lease WHERE status = 'DONE' AND end_id <= :w"),
+                             {"w": watermark})
+                conn.execute(text("UPDATE etl_metadata SET meta_value = :v WHERE meta_key = :k"),
+                             {"k": WATERMARK_KEY, "v": str(watermark)})
+            return watermark
@@ -44,10 +44,68 @@ if PROMETHEUS_AVAILABLE:
     error_count = Counter(
         'gdrive_etl_errors_total', 'Total ETL errors encountered'
     )
+    pipeline_stage_items = Counter(
+        'gdrive_pipeline_stage_items_total', 'Items handled per ingest stage (bytes for download, rows otherwise)', ['stage']
+    )
+    pipeline_stage_seconds = Counter(
+        'gdrive_pipeline_stage_busy_seconds_total', 'Busy time spent in each ingest stage', ['stage']
+    )
+    pipeline_bottleneck = Counter(
+        'gdrive_pipeline_bottleneck_total', 'Files whose slowest ingest stage was this stage', ['stage']
+    )
+    dedup_skipped_duplicates = Counter(
+        'gdrive_rows_dedup_skipped_total', 'Rows the Bloom filter flagged and MySQL confirmed as already stored (not re-inserted)'
+    )
+    db_pool_checkout_wait = Histogram(
+        'gdrive_db_pool_checkout_wait_seconds', 'Time a task waited for a pooled DB connection',
+        buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30]
+    )
+    db_pool_checked_out = Gauge(
+        'gdrive_db_pool_checked_out', 'DB connections currently checked out of the ETL pool'
+    )
+    db_pool_size = Gauge(
+        'gdrive_db_pool_size', 'Configured ETL DB pool size for this worker process'
+    )
+    db_pool_timeouts = Counter(
+        'gdrive_db_pool_timeouts_total', 'Checkouts that gave up waiting for a pooled DB connection'
+    )
+    queue_depth = Gauge(
+        'gdrive_queue_depth', 'Messages waiting in each Celery queue', ['queue']
+    )
+    queue_wait_time = Histogram(
+        'gdrive_queue_wait_seconds', 'Time an ETL task waited in its queue before a worker started it', ['queue'],
+        buckets=[1, 5, 15, 30, 60, 300, 900, 1800, 3600, 7200]
+    )
+    queue_tasks_routed = Counter(
+        'gdrive_queue_routed_total', 'ETL tasks published to each size queue', ['queue']
+    )
+    drive_rate_wait = Histogram(
+        'gdrive_api_rate_wait_seconds', 'Time a Drive API call waited for the cluster-wide token bucket', ['method'],
+        buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30]
+    )
+    drive_rate_tokens = Gauge(
+        'gdrive_api_rate_tokens', 'Tokens left in the Drive API bucket after the last acquire', ['method']
+    )
+    scanner_throttled = Gauge(
+        'gdrive_scanner_throttled', '1 while the scanner is paused by broker backpressure'
+    )
+    scanner_throttle_seconds = Counter(
+        'gdrive_scanner_throttle_seconds_total', 'Scanner thread time spent paused by broker backpressure'
+    )
+    backpressure_signal = Gauge(
+        'gdrive_backpressure_signal', 'Last sampled backpressure input (queue_depth, redis_memory, worker_lag)', ['signal']
+    )
+    file_lease_conflicts = Counter(
+        'gdrive_file_lease_conflicts_total', 'ETL tasks that skipped a file leased by another task'
+    )
+    download_cache_requests = Counter(
+        'gdrive_download_cache_requests_total', 'Download cache lookups by result (hit / miss)', ['result']
+    )
 else:
     # Lightweight no-op stubs
     class _NoOp:
         def inc(self, *a, **kw): pass
+        def dec(self, *a, **kw): pass
         def observe(self, *a, **kw): pass
         def set(self, *a, **kw): pass
         def labels(self, *a, **kw): return self
@@ -60,6 +118,24 @@ else:
 
     batch_size_hist = _NoOp()
     error_count = _NoOp()
+    pipeline_stage_items = _NoOp()
+    pipeline_stage_seconds = _NoOp()
+    pipeline_bottleneck = _NoOp()
+    dedup_skipped_duplicates = _NoOp()
+    db_pool_checkout_wait = _NoOp()
+    db_pool_checked_out = _NoOp()
+    db_pool_size = _NoOp()
+    db_pool_timeouts = _NoOp()
+    queue_depth = _NoOp()
+    queue_wait_time = _NoOp()
+    queue_tasks_routed = _NoOp()
+    drive_rate_wait = _NoOp()
+    drive_rate_tokens = _NoOp()
+    scanner_throttled = _NoOp()
+    scanner_throttle_seconds = _NoOp()
+    backpressure_signal = _NoOp()
+    file_lease_conflicts = _NoOp()
+    download_cache_requests = _NoOp()
 
     files_processed = _NoOp()
     rows_inserted = _NoOp()
@@ -0,0 +1,131 @@
+"""
+Redis-backed Bloom filter for batch row deduplication.
+
+Signatures are stored as bits in a fixed-size Redis string instead of one
+32-char key per row, so memory is bounded by the configured capacity and
+false-positive rate regardless of how many rows pass through. A whole batch
+is tested, or recorded, in ONE Lua call.
+
+A Bloom filter has false positives, so "seen" only ever means "probably seen":
+callers use it to pre-screen and leave the final say to the database.
+
+Filters rotate per time window: a row is checked against the current and the
+previous generation, so it is remembered for between one and two windows.
+"""
+import hashlib
+import logging
+import math
+import time
+
+logger = logging.getLogger("RedisBloom")
+
+# KEYS[1] = current generation, KEYS[2] = previous generation (optional)
+# ARGV[1] = k (bits per item), ARGV[2] = ttl seconds, ARGV[3..] = k bit offsets per item
+_TEST_AND_SET_LUA = """
+local k = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local has_prev = #KEYS > 1
+local n = (#ARGV - 2) / k
+local result = {}
+for i = 0, n - 1 do
+    local base = 2 + i * k
+    local in_cur, in_prev = true, has_prev
+    for j = 1, k do
+        local pos = ARGV[base + j]
+        if in_cur and redis.call('GETBIT', KEYS[1], pos) == 0 then in_cur = false end
+        if in_prev and redis.call('GETBIT', KEYS[2], pos) == 0 then in_prev = false end
+        if not in_cur and not in_prev then break end
+    end
+    if not in_cur then
+        -- New, or only in the previous generation: (re)record it in the current one
+        for j = 1, k do redis.call('SETBIT', KEYS[1], ARGV[base + j], 1) end
+    end
+    if in_cur or in_prev then result[i + 1] = 0 else result[i + 1] = 1 end
+end
+if redis.call('TTL', KEYS[1]) < 0 then redis.call('EXPIRE', KEYS[1], ttl) end
+return result
+"""
+
+# Read-only test against both generations. ARGV[1] = k, ARGV[2..] = k bit offsets per item
+_TEST_LUA = """
+local k = tonumber(ARGV[1])
+local n = (#ARGV - 1) / k
+local result = {}
+for i = 0, n - 1 do
+    local base = 1 + i * k
+    local seen = false
+    for g = 1, #KEYS do
+        seen = true
+        for j = 1, k do
+            if redis.call('GETBIT', KEYS[g], ARGV[base + j]) == 0 then seen = false break end
+        end
+        if seen then break end
+    end
+    if seen then result[i + 1] = 1 else result[i + 1] = 0 end
+end
+return result
+"""
+
+# Redis strings are capped at 512 MB
+_MAX_BITS = 2 ** 32
+
+
+def bloom_parameters(capacity, error_rate):
+    """Optimal (bits, hash_count) for `capacity` items at `error_rate` false positives."""
+    if capacity <= 0 or not 0 < error_rate < 1:
+        raise ValueError("capacity must be > 0 and 0 < error_rate < 1")
+    bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+    bits = min(bits, _MAX_BITS)
+    hashes = max(1, int(round(bits / capacity * math.log(2))))
+    return bits, hashes
+
+
+def bit_positions(signature, bits, hashes):
+    """k bit offsets for a signature using Kirsch-Mitzenmacher double hashing."""
+    digest = hashlib.blake2b(signature.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class RedisBloomFilter:
+    def __init__(self, client, name, capacity, error_rate, window_seconds):
+        self.client = client
+        self.name = name
+        self.window_seconds = int(window_seconds)
+        self.bits, self.hashes = bloom_parameters(capacity, error_rate)
+        self._script = client.register_script(_TEST_AND_SET_LUA)
+        self._test_script = client.register_script(_TEST_LUA)
+        logger.debug(f"Bloom filter '{name}': {self.bits / 8 / 1048576:.1f} MB, k={self.hashes} per generation")
+
+    def _keys(self, now=None):
+        generation = int((now or time.time()) // self.window_seconds)
+        return [f"{self.name}:{generation}", f"{self.name}:{generation - 1}"]
+
+    def _offsets(self, signatures):
+        args = []
+        for sig in signatures:
+            args.extend(bit_positions(sig, self.bits, self.hashes))
+        return args
+
+    def might_contain_many(self, signatures, now=None):
+        """
+        Test a batch of signatures without recording them.
+        Returns a list of booleans: True when the signature was probably seen before.
+        """
+        if not signatures:
+            return []
+        result = self._test_script(keys=self._keys(now), args=[self.hashes] + self._offsets(signatures))
+        return [bool(x) for x in result]
+
+    def add_many(self, signatures, now=None):
+        """
+        Test-and-set a batch of signatures atomically.
+        Returns a list of booleans: True when the signature was NOT seen before
+        (including earlier in the same batch).
+        """
+        if not signatures:
+            return []
+        args = [self.hashes, self.window_seconds * 2] + self._offsets(signatures)
+        result = self._script(keys=self._keys(now), args=args)
+        return [bool(x) for x in result]
@@ -0,0 +1,100 @@
+"""
+Short-lived Redis leases with heartbeat renewal.
+
+A lease is a key SET NX PX holding its owner's id; only that owner can renew or release
+it (compare-and-set in Lua). An owner that dies simply stops renewing and the lease
+expires after `ttl` seconds, so nothing stays locked after a crash.
+"""
+import logging
+import threading
+
+logger = logging.getLogger("RedisLease")
+
+# KEYS[1] = lease key, ARGV[1] = owner, ARGV[2] = ttl ms
+RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('PEXPIRE', KEYS[1], ARGV[2]) end
+return 0
+"""
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+
+class LeaseSet:
+    """
+    Leases held by one owner (e.g. a Celery task id), renewed together every ttl/3 by
+    one heartbeat thread. Re-acquiring a lease the owner already holds succeeds, so a
+    redelivered or retried run of the same task takes over its predecessor's lease.
+    Always release_all() (or use as a context manager) to stop the heartbeat.
+    """
+    def __init__(self, client, owner, ttl, prefix):
+        self.client = client
+        self.owner = owner
+        self.ttl_ms = int(ttl * 1000)
+        self.prefix = prefix
+        self.held = set()
+        self.lost = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+        self._renew = client.register_script(RENEW_LUA)
+        self._release = client.register_script(RELEASE_LUA)
+
+    def _key(self, name):
+        return f"{self.prefix}:{name}"
+
+    def acquire(self, name):
+        """True if this owner now holds the lease on `name`."""
+        key = self._key(name)
+        if not self.client.set(key, self.owner, nx=True, px=self.ttl_ms):
+            if not self._renew(keys=[key], args=[self.owner, self.ttl_ms]):
+                return False
+        with self._lock:
+            self.held.add(name)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._renew_loop, name=f"Lease-{self.owner}", daemon=True)
+                self._heartbeat.start()
+        return True
+
+    def holder(self, name):
+        value = self.client.get(self._key(name))
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.ttl_ms / 3000):
+            with self._lock:
+                names = list(self.held)
+            if not names:
+                continue
+            try:
+                pipe = self.client.pipeline(transaction=False)
+                for name in names:
+                    self._renew(keys=[self._key(name)], args=[self.owner, self.ttl_ms], client=pipe)
+                for name, ok in zip(names, pipe.execute()):
+                    if not ok and name not in self.lost:
+                        self.lost.add(name)
+                        logger.warning(f"⚠️ Lease on {name} lost by {self.owner} (expired before renewal)")
+            except Exception as e:
+                logger.warning(f"⚠️ Lease renewal failed for {self.owner}: {e}")
+
+    def release_all(self):
+        self._stop.set()
+        with self._lock:
+            names, self.held = list(self.held), set()
+        if not names:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for name in names:
+                self._release(keys=[self._key(name)], args=[self.owner], client=pipe)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Lease release failed for {self.owner} (expires in {self.ttl_ms // 1000}s): {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release_all()
+        return False
@@ -0,0 +1,32 @@
+"""
+Process-wide pooled Redis clients.
+One ConnectionPool per URL is shared by every thread/greenlet in the process,
+instead of opening a new client (and TCP connection) per call.
+"""
+import os
+import threading
+import redis
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_redis(url=None, **kwargs):
+    """Return the shared client for `url` (defaults to CELERY_BROKER_URL)."""
+    url = url or os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    client = _clients.get(url)
+    if client is None:
+        with _lock:
+            client = _clients.get(url)
+            if client is None:
+                options = {
+                    "socket_timeout": 5,
+                    "socket_connect_timeout": 5,
+                    "retry_on_timeout": True,
+                    "health_check_interval": 30,
+                }
+                options.update(kwargs)
+                # redis-py pools reset themselves after fork(), so prefork workers are safe too
+                client = redis.Redis(connection_pool=redis.ConnectionPool.from_url(url, **options))
+                _clients[url] = client
+    return client
@@ -1,12 +1,11 @@
 import signal
 import time
 import logging
-import threading
 from logging.handlers import TimedRotatingFileHandler
 import pathlib
 from datetime import datetime
 
-from model.robust_gdrive_etl_v2 import GDriveHighSpeedIngestor, ValidationQualityProcessor
+from model.robust_gdrive_etl_v2 import GDriveHighSpeedIngestor, start_validation
 
 # Set up Log Directory
 log_dir = pathlib.Path(__file__).parent / 'logs' / 'ingestor'
@@ -45,7 +44,8 @@ if not internal_logger.hasHandlers():
 def main() -> None:
     """
     Standalone worker entrypoint for the GDrive ETL engine.
-    Runs a single ingestor loop in this process only.
+    Runs a single ingestor loop in this process only. With ORCHESTRATOR_CLUSTER=true
+    several of these (on any nodes) share the Drive tree between them.
     """
     ingestor = GDriveHighSpeedIngestor()
 
@@ -62,15 +62,14 @@ def main() -> None:
 
     logger.info("Starting GDrive ETL worker loop.")
 
-    # Start the Validation & Quality Pipeline in a background thread
-    validator = ValidationQualityProcessor(ingestor.engine, ingestor.shutdown_event)
-    validator_thread = threading.Thread(
-        target=validator.start_pipeline,
-        name="QualityThread",
-        daemon=True
-    )
-    validator_thread.start()
-    logger.info("Validation & Quality pipeline thread started.")
+    if ingestor.cluster is not None:
+        ingestor.cluster.start(ingestor.shutdown_event)
+        logger.info("Joined orchestrator cluster as %s (leader: %s).", ingestor.cluster.node_id, ingestor.cluster.is_leader)
+
+    # Start the Validation & Quality Pipeline in background thread(s)
+    validator_threads = start_validation(ingestor.engine, ingestor.shutdown_event,
+                                         is_active=ingestor.is_leader if ingestor.cluster is not None else None)
+    logger.info("Validation & Quality pipeline started (%d thread(s)).", len(validator_threads))
 
     try:
         while not ingestor.shutdown_event.is_set():
@@ -91,6 +90,8 @@ def main() -> None:
                 # Back off briefly before retrying
                 time.sleep(10)
     finally:
+        if ingestor.cluster is not None:
+            ingestor.cluster.leave()
         logger.info("GDrive ETL worker exiting.")
 
 
@@ -0,0 +1,83 @@
+import argparse
+import signal
+import logging
+import threading
+from logging.handlers import TimedRotatingFileHandler
+import pathlib
+from datetime import datetime
+
+from sqlalchemy import create_engine
+
+from config import config
+from model.robust_gdrive_etl_v2 import start_range_validators
+
+# Set up Log Directory
+log_dir = pathlib.Path(__file__).parent / 'logs' / 'validation'
+log_dir.mkdir(parents=True, exist_ok=True)
+log_filename = log_dir / f"validation_{datetime.now().strftime('%Y-%m-%d')}.log"
+
+log_format = '%(asctime)s | %(levelname)-8s | [%(name)s] : %(message)s'
+formatter = logging.Formatter(log_format, datefmt='%Y-%m-%d %H:%M:%S')
+
+file_handler = TimedRotatingFileHandler(str(log_filename), when='midnight', backupCount=14, encoding='utf-8')
+file_handler.setFormatter(formatter)
+file_handler.setLevel(logging.INFO)
+
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(formatter)
+stream_handler.setLevel(logging.INFO)
+
+for name in ("GDriveValidationWorker", "GDriveETLv4", "IdRangeLease"):
+    named_logger = logging.getLogger(name)
+    if not named_logger.hasHandlers():
+        named_logger.setLevel(logging.INFO)
+        named_logger.addHandler(file_handler)
+        named_logger.addHandler(stream_handler)
+
+logger = logging.getLogger("GDriveValidationWorker")
+
+
+def main() -> None:
+    """
+    Standalone validation worker (VALIDATION_WORKERS=0 on the orchestrators).
+    Runs --threads id-range workers; start as many of these processes, on as many
+    nodes, as the validation backlog needs.
+    """
+    parser = argparse.ArgumentParser(description="Partitioned validation worker")
+    parser.add_argument("--threads", type=int, default=2, help="Range workers in this process")
+    args = parser.parse_args()
+
+    shutdown_event = threading.Event()
+
+    def _handle_shutdown(signum, frame):
+        logger.info("Shutdown signal received (%s). Stopping validation workers...", signum)
+        shutdown_event.set()
+
+    try:
+        signal.signal(signal.SIGINT, _handle_shutdown)
+        signal.signal(signal.SIGTERM, _handle_shutdown)
+    except (ValueError, OSError):
+        pass
+
+    if config.VALIDATION_WORKERS != 0:
+        # The orchestrators still validate themselves; the single cursor and range leases must not mix
+        logger.warning("VALIDATION_WORKERS=%s: validation runs in the orchestrator. Idling.", config.VALIDATION_WORKERS)
+        shutdown_event.wait()
+        return
+
+    engine = create_engine(config.DATABASE_URI, pool_size=args.threads + 2, max_overflow=2, pool_pre_ping=True,
+                           pool_recycle=1800, pool_timeout=30, isolation_level="READ COMMITTED")
+    threads = start_range_validators(engine, shutdown_event, max(1, args.threads))
+    logger.info("Started %d validation range worker(s).", len(threads))
+
+    # Wake up periodically so signals are handled promptly on every platform
+    while not shutdown_event.wait(timeout=1):
+        pass
+    for thread in threads:
+        thread.join(timeout=30)
+    engine.dispose()
+    logger.info("Validation worker exiting.")
+
+
+if __name__ == "__main__":
+    main()